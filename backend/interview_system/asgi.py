@@ -0,0 +1,12 @@
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'interview_system.settings')
+
+django_application = get_asgi_application()
+
+# 需要在 Django 初始化之后导入
+from interviews.events import EventStreamApp  # noqa: E402
+
+# 面试事件流（SSE）由协程直接处理，不占用线程
+application = EventStreamApp(django_application)
@@ -0,0 +1,76 @@
+import os
+
+# 数据库配置档，由环境变量 DB_PROFILE 选择：
+#   sqlite        持久连接、BEGIN IMMEDIATE、busy_timeout（默认）；DB_SQLITE_WAL=1 时再开启 WAL（单机多 worker 部署）
+#   sqlite-basic  Django 默认配置，仅用于对比和排查问题
+#   postgresql    PostgreSQL，持久连接；前面有 PgBouncer 时设置 DB_PGBOUNCER=1
+
+# 连接建立时执行的 PRAGMA，只对当前连接生效，不改变数据库文件
+SQLITE_PRAGMAS = {
+    # 写锁被占用时等待的毫秒数，而不是立即报 database is locked
+    'busy_timeout': 5000,
+    # 用内存映射读取，减少系统调用
+    'mmap_size': 256 * 1024 * 1024,
+    # 负数表示 KiB，每个连接约 20MB 页缓存
+    'cache_size': -20000,
+    'temp_store': 'MEMORY',
+}
+
+# DB_SQLITE_WAL=1 时追加。journal_mode 会写进数据库文件并在旁边留下 -wal、-shm 文件，
+# 所以默认不开启，避免随手执行 manage.py 就改动仓库里的开发数据库
+SQLITE_WAL_PRAGMAS = {
+    # 读写互不阻塞，多个 worker 可以同时读
+    'journal_mode': 'WAL',
+    # WAL 模式下 NORMAL 不会损坏数据库，只在断电时可能丢失最后的事务
+    'synchronous': 'NORMAL',
+}
+
+
+def env_int(env, name, default):
+    return int(env.get(name, default))
+
+
+def database_settings(base_dir, env=os.environ):
+    """按 DB_PROFILE 生成 DATABASES['default']"""
+    profile = env.get('DB_PROFILE', 'sqlite')
+    if profile == 'postgresql':
+        config = {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': env.get('DB_NAME', 'interview_system'),
+            'USER': env.get('DB_USER', 'postgres'),
+            'PASSWORD': env.get('DB_PASSWORD', ''),
+            'HOST': env.get('DB_HOST', '127.0.0.1'),
+            'PORT': env.get('DB_PORT', '5432'),
+            # Django 3.2 没有内置连接池：每个线程的连接在请求之间保持复用，
+            # 跨进程的连接池交给 PgBouncer
+            'CONN_MAX_AGE': env_int(env, 'DB_CONN_MAX_AGE', 600),
+            'OPTIONS': {'connect_timeout': env_int(env, 'DB_CONNECT_TIMEOUT', 5)},
+        }
+        if env.get('DB_PGBOUNCER') == '1':
+            # 事务级连接池下服务端游标（iterator()）跨事务会失效
+            config['DISABLE_SERVER_SIDE_CURSORS'] = True
+        return config
+
+    name = env.get('DB_PATH', os.path.join(base_dir, 'db.sqlite3'))
+    if profile == 'sqlite-basic':
+        return {'ENGINE': 'django.db.backends.sqlite3', 'NAME': name}
+    if profile != 'sqlite':
+        raise ValueError(f'未知的 DB_PROFILE: {profile}')
+    return {
+        'ENGINE': 'interview_system.db_backends.sqlite3',
+        'NAME': name,
+        'CONN_MAX_AGE': env_int(env, 'DB_CONN_MAX_AGE', 600),
+        # sqlite3 模块自己的等待时间（秒），与 busy_timeout 一致
+        'OPTIONS': {'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000},
+        'PRAGMAS': {**SQLITE_PRAGMAS, **SQLITE_WAL_PRAGMAS} if env.get('DB_SQLITE_WAL') == '1' else SQLITE_PRAGMAS,
+    }
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """connection_created 信号：按配置档设置 SQLite 的 PRAGMA"""
+    pragmas = connection.settings_dict.get('PRAGMAS')
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,12 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    事务以 BEGIN IMMEDIATE 开始：默认的 BEGIN（DEFERRED）先读后写时要把读锁升级为写锁，
+    两个进程同时升级会直接报 database is locked，busy_timeout 也无法重试；
+    一开始就取得写锁时，其他写事务只是在 busy_timeout 内排队等待。
+    """
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 
+from interview_system.database import database_settings
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-your-secret-key-here-for-development'
@@ -22,6 +24,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # 放在最前面，统计的耗时包含其余中间件
+    'interviews.metrics.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -50,11 +54,9 @@ TEMPLATES = [
     },
 ]
 
+# 数据库配置档见 interview_system/database.py，由 DB_PROFILE 环境变量选择
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_settings(BASE_DIR),
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -84,8 +86,69 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# 录音交付方式：django（由 Django 输出并支持 Range）、x-accel（nginx）或 x-sendfile（Apache）
+RECORDING_SERVE_MODE = os.environ.get('RECORDING_SERVE_MODE', 'django')
+# x-accel 模式下 nginx 中 internal location 的前缀，该 location 指向 MEDIA_ROOT
+RECORDING_ACCEL_PREFIX = os.environ.get('RECORDING_ACCEL_PREFIX', '/protected-media/')
+
+# 缓存后端：locmem（开发用，每个进程独立）、file（文件缓存）或 db（数据库缓存，需先执行 createcachetable）；
+# 多个 gunicorn worker 部署时使用 file 或 db，保证各进程看到同一份缓存和失效版本号
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'interview-system',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')),
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'django_cache'),
+    },
+}
+CACHES = {
+    'default': {
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 3000))},
+    }
+}
+# 接口缓存的过期时间（秒），数据变更由版本号失效，这里只用来回收空间
+VIEW_CACHE_TTL = int(os.environ.get('VIEW_CACHE_TTL', 300))
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# WSGI 部署下是否由视图输出事件流（/api/interviews/events/）。每个订阅连接会占用一个工作线程直到超时，
+# 几个看板页面就能占满线程池，因此默认关闭：返回 204，看板改为定时刷新。ASGI 部署由 EventStreamApp 处理，不受影响
+SSE_SYNC_ENABLED = os.environ.get('SSE_SYNC_ENABLED', '') == '1'
+
+# 请求统计（interviews/metrics.py）：单条 SQL 超过 SLOW_QUERY_MS 毫秒记录慢查询日志；
+# 设置 REQUEST_LOG_FILE 后每个请求写一行 JSON（耗时、查询数、SQL 耗时、序列化耗时、响应大小）
+SLOW_QUERY_MS = int(os.environ.get('SLOW_QUERY_MS', 200))
+# /metrics 默认只允许管理员访问；METRICS_TOKEN 为 Prometheus 使用的 Bearer 令牌，
+# METRICS_ALLOWED_IPS（逗号分隔）按来源地址放行，默认为空。经过反向代理部署时来源地址都是代理，不要用地址放行
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+METRICS_ALLOWED_IPS = [ip for ip in os.environ.get('METRICS_ALLOWED_IPS', '').split(',') if ip]
+REQUEST_LOG_FILE = os.environ.get('REQUEST_LOG_FILE')
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+        'request_file': {'class': 'logging.FileHandler', 'filename': REQUEST_LOG_FILE}
+        if REQUEST_LOG_FILE else {'class': 'logging.NullHandler'},
+    },
+    'loggers': {
+        'interviews.requests': {
+            'handlers': ['request_file'],
+            'level': 'INFO' if REQUEST_LOG_FILE else 'WARNING',
+            'propagate': False,
+        },
+        'interviews.slow_queries': {'handlers': ['console', 'request_file'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
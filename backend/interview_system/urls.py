@@ -5,6 +5,8 @@ from django.conf.urls.static import static
 from django.http import JsonResponse
 from django.views.decorators.http import require_GET
 
+from interviews.metrics import metrics_view
+
 @require_GET
 def userinfo_view(request):
     if request.user.is_authenticated:
@@ -21,6 +23,8 @@ urlpatterns = [
     path('api/', include('interviews.urls')),
     path('api-auth/', include('rest_framework.urls')),
     path('api/userinfo/', userinfo_view),
+    # Prometheus 抓取地址
+    path('metrics', metrics_view),
 ]
 
 if settings.DEBUG:
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Company, JobPosition, Interview
+from .models import Company, JobPosition, Interview, BackgroundJob
 from .student_admin import StudentInfoAdmin, EducationHistoryAdmin, CertificateAdmin
 
 @admin.register(Company)
@@ -59,3 +59,9 @@ class InterviewAdmin(admin.ModelAdmin):
             # 已完成且已上传录音的面试不能修改
             return [f.name for f in self.model._meta.fields]
         return self.readonly_fields
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'status', 'progress', 'created_by', 'created_time', 'finished_time']
+    list_filter = ['kind', 'status', 'created_time']
+    readonly_fields = ['created_time', 'updated_time', 'started_time', 'finished_time']
@@ -4,3 +4,13 @@ class InterviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'interviews'
     verbose_name = '面试管理'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from interview_system.database import apply_sqlite_pragmas
+        from . import signals  # noqa: F401
+        from .metrics import install_query_timer, instrument_serializers
+
+        connection_created.connect(apply_sqlite_pragmas)
+        connection_created.connect(install_query_timer)
+        instrument_serializers()
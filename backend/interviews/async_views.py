@@ -0,0 +1,120 @@
+import functools
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .caching import cache_response
+from .date_windows import parse_month_params
+from .models import Interview
+from .query_optimizer import optimize_queryset
+from .serializers import InterviewSerializer
+from .stats import DASHBOARD_STATS_CACHE_TTL, calendar_data, compute_dashboard_stats
+
+# Django 3.2 没有异步 ORM（4.1 才提供 aget/aaggregate 等），DRF 也只支持同步视图。
+# 这里的视图本身是协程：认证、权限、内容协商沿用 DRF 的流程，和数据库查询一样放到线程中执行，
+# 等待期间不占用事件循环；升级 Django 后把 sync_to_async 换成异步 ORM 即可。
+
+
+def async_api_view(methods=('GET',), permission_classes=(IsAuthenticated,)):
+    """把协程包装成 DRF 风格的只读接口，返回值与 api_view 一致"""
+    allowed = [method.upper() for method in methods]
+    if 'GET' in allowed and 'HEAD' not in allowed:
+        allowed.append('HEAD')
+
+    def decorator(handler):
+        view_class = type(handler.__name__, (APIView,), {
+            'permission_classes': list(permission_classes),
+            'http_method_names': [method.lower() for method in allowed] + ['options'],
+        })
+
+        def initial(view, request, args, kwargs):
+            """认证（可能读取会话和用户）、权限检查和内容协商，失败时返回错误响应"""
+            view.args, view.kwargs = args, kwargs
+            request = view.initialize_request(request, *args, **kwargs)
+            view.request = request
+            view.headers = view.default_response_headers
+            try:
+                if request.method not in allowed:
+                    raise MethodNotAllowed(request.method)
+                view.initial(request, *args, **kwargs)
+            except Exception as exc:
+                return request, view.handle_exception(exc)
+            return request, None
+
+        @functools.wraps(handler)
+        async def view(request, *args, **kwargs):
+            api_view = view_class()
+            request, response = await sync_to_async(initial)(api_view, request, args, kwargs)
+            if response is None:
+                try:
+                    response = await handler(request, *args, **kwargs)
+                except Exception as exc:
+                    response = await sync_to_async(api_view.handle_exception)(exc)
+            return api_view.finalize_response(request, response, *args, **kwargs)
+
+        # 与 APIView.as_view 一致，会话认证自己负责 CSRF 校验
+        view.csrf_exempt = True
+        return view
+    return decorator
+
+
+def upcoming_data(request):
+    context = {'request': request}
+    queryset = optimize_queryset(Interview.objects.filter(
+        scheduled_time__gte=timezone.now(),
+        status__in=['scheduled', 'in_progress']
+    ), InterviewSerializer(context=context)).order_by('scheduled_time')[:10]
+    return InterviewSerializer(queryset, many=True, context=context).data
+
+
+@async_api_view()
+@cache_response(('interview',), timeout=DASHBOARD_STATS_CACHE_TTL, per_day=True)
+async def dashboard_stats(request):
+    """获取看板统计数据"""
+    # 其中有“今天”“本周”，缓存按天区分；ETag 由缓存的内容生成，不提供 Last-Modified
+    return Response(await sync_to_async(compute_dashboard_stats)(request.user))
+
+
+@async_api_view()
+@cache_response(('interview',))
+async def interview_calendar(request):
+    """获取面试日历数据"""
+    rows = await sync_to_async(list)(calendar_data(request.user, parse_month_params(request.GET)))
+    return Response([
+        {
+            'scheduled_time__date': row['day'],
+            'count': row['count'],
+            'completed': row['completed'],
+            'scheduled': row['scheduled'],
+        }
+        for row in rows
+    ])
+
+
+@async_api_view()
+# 结果随当前时间变化，只短时间缓存
+@cache_response(('interview', 'company'), timeout=30)
+async def upcoming_interviews(request):
+    """获取即将到来的面试"""
+    return Response(await sync_to_async(upcoming_data)(request))
+
+
+@async_api_view(permission_classes=(AllowAny,))
+async def current_user(request):
+    """获取当前用户信息（用户在认证时已经加载，不再查询数据库）"""
+    user = request.user
+    if user.is_authenticated:
+        return Response({
+            'id': user.id,
+            'username': user.username,
+            'email': user.email,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'is_staff': user.is_staff
+        })
+    return Response({'error': '未登录'}, status=status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,113 @@
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from rest_framework.exceptions import ValidationError
+
+from .caching import bump_namespace
+from .conflicts import batch_conflicts, interview_duration
+from .events import record_created
+from .models import Interview, interval_end
+from .resolvers import resolve_company_ids, resolve_position_ids
+from .rollups import apply_rollups, rollup_state
+from .search import INTERVIEW_INDEX
+from .serializers import InterviewBulkItemSerializer
+
+BULK_SCHEDULE_MAX_ITEMS = 5000
+BULK_CREATE_BATCH_SIZE = 500
+
+
+def validate_items(items, user):
+    """
+    逐条做字段校验（复用同一个序列化器实例），面试官一次查询校验。
+    返回 (通过校验的 [(序号, 数据)], 错误列表)。
+    """
+    serializer = InterviewBulkItemSerializer()
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, serializer.run_validation(item)))
+        except ValidationError as e:
+            errors.append({'index': index, 'errors': e.detail})
+
+    interviewer_ids = {data['interviewer'] for index, data in valid if data.get('interviewer')}
+    existing = set(User.objects.filter(pk__in=interviewer_ids).values_list('pk', flat=True))
+    checked = []
+    for index, data in valid:
+        interviewer_id = data.get('interviewer')
+        if interviewer_id and interviewer_id not in existing:
+            errors.append({'index': index, 'errors': {'interviewer': ['面试官不存在']}})
+        elif interviewer_id and not user.is_staff and interviewer_id != user.pk:
+            errors.append({'index': index, 'errors': {'interviewer': ['只能为自己安排面试']}})
+        else:
+            checked.append((index, data))
+
+    # 与已有面试、与本批前面条目的时间冲突，一次查询完成
+    conflicts = batch_conflicts([
+        (index, data.get('interviewer'), data['scheduled_time'],
+         interval_end(data['scheduled_time'], interview_duration(data)))
+        for index, data in checked
+    ])
+    errors.extend({'index': index, 'errors': {'scheduled_time': [conflicts[index]]}} for index in conflicts)
+    checked = [(index, data) for index, data in checked if index not in conflicts]
+
+    errors.sort(key=lambda error: error['index'])
+    return checked, errors
+
+
+def build_interviews(valid):
+    """按名称集合批量解析公司和职位，生成待插入的面试对象"""
+    company_ids = resolve_company_ids(data['company_name'] for index, data in valid)
+    positions = {}
+    for index, data in valid:
+        key = (company_ids[data['company_name']], data['position_title'])
+        positions.setdefault(key, data.get('position_description', ''))
+    position_ids = resolve_position_ids(positions)
+
+    interviews = []
+    for index, data in valid:
+        data = dict(data)
+        company_id = company_ids[data['company_name']]
+        interviews.append(Interview(
+            company_id=company_id,
+            position_id=position_ids[company_id, data['position_title']],
+            interviewer_id=data.pop('interviewer', None),
+            # 与 Interview.save() 一致：新建的面试没有录音，结束时间由时长计算
+            recording_uploaded=False,
+            end_time=interval_end(data['scheduled_time'], interview_duration(data)),
+            **data
+        ))
+    return interviews
+
+
+def created_pks(interviews, last_pk):
+    """
+    本批新建面试的主键。支持的数据库（PostgreSQL）由 bulk_create 直接返回；
+    SQLite 不返回主键，在插入前最大主键之后的行里按本批的 (面试官, 时间) 找出自己插入的行，
+    排除其他请求并发插入的面试。
+    """
+    if connection.features.can_return_rows_from_bulk_insert:
+        return [interview.pk for interview in interviews]
+    keys = {(interview.interviewer_id, interview.scheduled_time) for interview in interviews}
+    rows = Interview.objects.filter(pk__gt=last_pk).values_list('pk', 'interviewer_id', 'scheduled_time')
+    return [pk for pk, interviewer_id, scheduled_time in rows if (interviewer_id, scheduled_time) in keys]
+
+
+def schedule_interviews(items, user):
+    """批量安排面试：通过校验的条目在一个事务中插入，校验失败的条目按序号返回错误"""
+    valid, errors = validate_items(items, user)
+    if not valid:
+        return {'created_count': 0, 'errors': errors}
+
+    with transaction.atomic():
+        interviews = build_interviews(valid)
+        last_pk = Interview.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        Interview.objects.bulk_create(interviews, batch_size=BULK_CREATE_BATCH_SIZE)
+        # bulk_create 不触发 post_save，手动维护日汇总、搜索索引、事件日志和接口缓存
+        apply_rollups(rollup_state(interview) for interview in interviews)
+        pks = created_pks(interviews, last_pk)
+        for start in range(0, len(pks), BULK_CREATE_BATCH_SIZE):
+            created = Interview.objects.filter(pk__in=pks[start:start + BULK_CREATE_BATCH_SIZE])
+            INTERVIEW_INDEX.index_queryset(created)
+            record_created(created)
+    bump_namespace('interview')
+
+    return {'created_count': len(interviews), 'errors': errors}
@@ -0,0 +1,121 @@
+import asyncio
+import functools
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .conditional import conditional_get
+from .date_windows import today
+
+# 按模型划分的缓存命名空间：interview（面试）、student（学生及其教育经历、证书）、company（公司和职位）
+NAMESPACES = ('interview', 'student', 'company')
+# 版本号递增后旧缓存不会再被读取，过期时间只用来回收空间
+VIEW_CACHE_TTL = getattr(settings, 'VIEW_CACHE_TTL', 300)
+
+
+def namespace_key(name):
+    return f'cache_ns:{name}'
+
+
+def namespace_versions(names):
+    """
+    一次读取多个命名空间的版本号。版本号不存在（从未变更或被缓存淘汰）时用当前时间初始化，
+    不会与淘汰前用过的版本号重复，因此不会读到旧缓存。
+    """
+    keys = [namespace_key(name) for name in names]
+    found = cache.get_many(keys)
+    versions = []
+    for name, key in zip(names, keys):
+        version = found.get(key)
+        if version is None:
+            cache.add(key, time.time_ns(), None)
+            version = cache.get(key, 0)
+        versions.append(f'{name}{version}')
+    return versions
+
+
+def increment(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def bump_namespace(*names):
+    """
+    让这些命名空间下的缓存全部失效。立即递增一次；在事务中时提交后再递增一次，
+    否则提交前其他请求读到的旧数据会以新版本号写入缓存。
+    """
+    def bump():
+        for name in names:
+            increment(namespace_key(name))
+
+    bump()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(bump)
+
+
+def response_cache_key(request, view_name, namespaces, per_day):
+    user = request.user
+    parts = [view_name, *namespace_versions(namespaces), user.pk, user.is_staff, request.get_full_path()]
+    if per_day:
+        parts.append(today())
+    return 'view:' + hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def cacheable(response):
+    # 错误响应（参数错误、无权限等）不缓存
+    return isinstance(response, Response) and response.status_code == 200
+
+
+def cache_response(namespaces, timeout=None, per_day=False):
+    """
+    缓存 GET 接口序列化后的数据（不缓存渲染结果，返回格式仍由内容协商决定）。
+    键包含命名空间版本号、用户和完整地址，不同用户、不同参数互不共享；
+    内容与“今天”有关的接口传 per_day=True。命中时不查询数据库，并按内容生成 ETag 支持 304。
+    可用于函数视图（放在 api_view 之下）、视图集的方法和异步视图。
+    """
+    def decorator(view):
+        view_name = f'{view.__module__}.{view.__qualname__}'
+        ttl = VIEW_CACHE_TTL if timeout is None else timeout
+
+        if asyncio.iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view(request, *args, **kwargs)
+                # 缓存后端可能是数据库，不能在事件循环里直接访问
+                key = await sync_to_async(response_cache_key)(request, view_name, namespaces, per_day)
+                data = await sync_to_async(cache.get)(key)
+                if data is None:
+                    response = await view(request, *args, **kwargs)
+                    if not cacheable(response):
+                        return response
+                    data = response.data
+                    await sync_to_async(cache.set)(key, data, ttl)
+                return conditional_get(request, (data,), None, lambda: Response(data))
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            request = next(arg for arg in args if isinstance(arg, Request))
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+
+            key = response_cache_key(request, view_name, namespaces, per_day)
+            data = cache.get(key)
+            if data is None:
+                response = view(*args, **kwargs)
+                if not cacheable(response):
+                    return response
+                data = response.data
+                cache.set(key, data, ttl)
+            return conditional_get(request, (data,), None, lambda: Response(data))
+        return wrapper
+    return decorator
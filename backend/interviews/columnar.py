@@ -0,0 +1,140 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# 按列返回时单页允许的最大条数：逐列编码比逐条序列化便宜得多，批量拉取时可以用更大的页
+COLUMNAR_MAX_PAGE_SIZE = 5000
+
+# 数据库返回的值可以直接输出的字段类型，其余字段用序列化器字段的 to_representation 逐列转换
+PASSTHROUGH_FIELDS = (
+    serializers.CharField, serializers.IntegerField, serializers.FloatField, serializers.BooleanField,
+    serializers.ChoiceField, serializers.ReadOnlyField, serializers.PrimaryKeyRelatedField,
+)
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """
+    按列组织的 JSON：{"字段": [值, ...], ...}，字段名只出现一次。
+    Accept: application/vnd.interviews.columnar+json 或 ?format=columnar 时使用。
+    """
+    media_type = 'application/vnd.interviews.columnar+json'
+    format = 'columnar'
+
+
+class Column:
+    def __init__(self, name, lookup, convert):
+        self.name = name
+        self.lookup = lookup
+        self.convert = convert
+
+
+def file_url(field, model_field):
+    """与 FileField.to_representation 相同的输出，但输入是数据库里的文件名"""
+    request = field.context.get('request')
+    storage = model_field.storage
+    use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+
+    def convert(name):
+        if not name:
+            return None
+        if not use_url:
+            return name
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return convert
+
+
+def column_lookup(field, model):
+    """字段对应的 (values_list() 查找路径, 模型字段)；不能直接读取列时返回 None"""
+    bits = field.source.split('.')
+    for index, bit in enumerate(bits):
+        try:
+            model_field = model._meta.get_field(bit)
+        except FieldDoesNotExist:
+            return None
+        is_last = index == len(bits) - 1
+        if not model_field.is_relation:
+            return ('__'.join(bits), model_field) if is_last else None
+        if not (model_field.many_to_one or model_field.one_to_one):
+            return None
+        if is_last:
+            # PrimaryKeyRelatedField 只需要外键列本身
+            return ('__'.join(bits), model_field) if isinstance(field, serializers.PrimaryKeyRelatedField) else None
+        model = model_field.related_model
+
+
+def columnar_columns(serializer):
+    """
+    序列化器字段中能直接从 values_list() 读取的列：模型字段，或经外键/一对一关联到的字段。
+    嵌套序列化器、反向关联、方法和属性不能按列读取，不在按列返回的结果中。
+    """
+    columns = []
+    for name, field in serializer.fields.items():
+        if field.write_only or field.source == '*' or isinstance(field, serializers.BaseSerializer):
+            continue
+        found = column_lookup(field, serializer.Meta.model)
+        if found is None:
+            continue
+        lookup, model_field = found
+        if isinstance(field, serializers.FileField):
+            convert = file_url(field, model_field)
+        elif isinstance(field, PASSTHROUGH_FIELDS):
+            convert = None
+        else:
+            convert = field.to_representation
+        columns.append(Column(name, lookup, convert))
+    return columns
+
+
+def columnar_rows(queryset, columns, always=()):
+    """
+    直接用 values_list() 取出各列，不创建模型实例。
+    always 为输出之外还要读取的列（例如游标分页用到的 pk 和排序列），行是具名元组，分页器可以按名称读取。
+    """
+    lookups = list(dict.fromkeys([column.lookup for column in columns] + list(always)))
+    return queryset.prefetch_related(None).values_list(*lookups, named=True), lookups
+
+
+def columnar_data(rows, columns, lookups):
+    """把行转成按列组织的数据；需要转换类型的列（时间、小数、文件）用同一个字段对象逐个转换"""
+    rows = list(rows)
+    data = {}
+    for column in columns:
+        index = lookups.index(column.lookup)
+        values = [row[index] for row in rows]
+        if column.convert is not None:
+            convert = column.convert
+            values = [None if value is None else convert(value) for value in values]
+        data[column.name] = values
+    return data
+
+
+class ColumnarListMixin:
+    """
+    列表接口按列返回（内容协商选中 ColumnarJSONRenderer 时）：直接从 values_list() 取值，
+    不创建模型实例，也不逐条实例化序列化器。返回哪些字段仍由序列化器决定（包括 ?fields= / ?exclude=），
+    权限、筛选、排序和分页与 JSON 相同，单页上限放宽到 COLUMNAR_MAX_PAGE_SIZE。
+    """
+    columnar_actions = ('list',)
+    # 输出之外要读取的列，例如游标分页用到的 pk 和排序列
+    columnar_always = ()
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if getattr(self, 'action', None) in self.columnar_actions:
+            renderers.append(ColumnarJSONRenderer())
+        return renderers
+
+    def list(self, request, *args, **kwargs):
+        if not isinstance(request.accepted_renderer, ColumnarJSONRenderer):
+            return super().list(request, *args, **kwargs)
+        columns = columnar_columns(self.get_serializer())
+        rows, lookups = columnar_rows(self.filter_queryset(self.get_queryset()), columns, self.columnar_always)
+        if self.paginator is not None:
+            self.paginator.max_page_size = COLUMNAR_MAX_PAGE_SIZE
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(columnar_data(page, columns, lookups))
+        return Response(columnar_data(rows, columns, lookups))
@@ -0,0 +1,75 @@
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def queryset_validator(queryset, field='updated_time'):
+    """
+    一次聚合查询得到 (行数, 最后修改时间)：修改会刷新 updated_time，
+    新增和删除会改变行数，两者合起来足以判断结果是否变化。
+    """
+    row = queryset.order_by().aggregate(count=Count('pk'), last_modified=Max(field))
+    return row['count'], row['last_modified']
+
+
+def make_etag(request, *parts):
+    """同一个地址在不同用户、不同参数、不同返回格式下内容不同，都要计入 ETag"""
+    user = request.user
+    source = '|'.join(str(part) for part in (
+        request.get_full_path(), user.pk, user.is_staff, getattr(request, 'accepted_media_type', ''), *parts
+    ))
+    # 弱校验：内容等价即可，不要求字节一致（例如经过压缩）
+    return 'W/"%s"' % hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(int(last_modified.timestamp()))
+    # 浏览器可以保存响应，但每次使用前都要带着 ETag 重新验证
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_get(request, parts, last_modified, build_response):
+    """
+    先用校验值判断客户端的缓存是否仍然有效，有效时直接返回 304，
+    不执行 build_response（不查询数据、不序列化）。
+    """
+    etag = make_etag(request, *parts)
+    if request.method in ('GET', 'HEAD'):
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None
+        )
+        if not_modified is not None:
+            return set_validators(not_modified, etag, last_modified)
+    return set_validators(build_response(), etag, last_modified)
+
+
+class ConditionalGetMixin:
+    """为 ModelViewSet 的 list/retrieve 加上 ETag/Last-Modified 条件请求"""
+
+    def list(self, request, *args, **kwargs):
+        count, last_modified = queryset_validator(self.filter_queryset(self.get_queryset()))
+        return conditional_get(
+            request, (count, last_modified), last_modified,
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = {self.lookup_field: kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        try:
+            count, last_modified = queryset_validator(self.get_queryset().filter(**lookup))
+        except (TypeError, ValueError, ValidationError):
+            # 与 get_object_or_404 相同：格式不对的主键视为不存在
+            raise Http404
+        if not count:
+            return super().retrieve(request, *args, **kwargs)
+        return conditional_get(
+            request, (count, last_modified), last_modified,
+            lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        )
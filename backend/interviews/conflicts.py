@@ -0,0 +1,134 @@
+import bisect
+import datetime
+from collections import defaultdict
+
+from django.utils import timezone
+
+from .models import Interview, interval_end
+
+# 已取消的面试不占用面试官时间
+NON_BLOCKING_STATUSES = ('cancelled',)
+
+# 空闲时段只在工作时间内计算
+WORK_DAY_START = datetime.time(9, 0)
+WORK_DAY_END = datetime.time(18, 0)
+
+
+def interview_duration(data):
+    """校验后的数据未提供时长时使用模型默认值"""
+    return data.get('duration', Interview._meta.get_field('duration').default)
+
+
+def overlapping(queryset, start, end):
+    """与 [start, end) 相交的面试：开始早于区间结束，且结束晚于区间开始"""
+    return queryset.filter(scheduled_time__lt=end, end_time__gt=start).exclude(status__in=NON_BLOCKING_STATUSES)
+
+
+def find_conflict(interviewer_id, start, duration, exclude_pk=None):
+    """返回与该时段冲突的第一场面试，没有冲突时返回 None"""
+    queryset = overlapping(Interview.objects.filter(interviewer_id=interviewer_id), start, interval_end(start, duration))
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    return queryset.only('candidate_name', 'scheduled_time', 'end_time').order_by('scheduled_time').first()
+
+
+def conflict_message(conflict):
+    start = timezone.localtime(conflict.scheduled_time)
+    end = timezone.localtime(conflict.end_time)
+    return f'面试官在 {start:%Y-%m-%d %H:%M}-{end:%H:%M} 已有面试（{conflict.candidate_name}）'
+
+
+class BusyIntervals:
+    """按开始时间排序、互不重叠的区间，用二分查找判断新区间是否冲突"""
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.labels = []
+
+    def add(self, start, end, label):
+        """区间空闲时占用并返回 None，否则返回冲突区间的 label"""
+        # 结束时间同样有序，第一个结束晚于 start 的区间是唯一可能相交的候选
+        i = bisect.bisect_right(self.ends, start)
+        if i < len(self.starts) and self.starts[i] < end:
+            return self.labels[i]
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.labels.insert(i, label)
+        return None
+
+    def merge_existing(self, start, end, label):
+        """载入数据库中已有的面试，已有面试之间的重叠合并为一个区间"""
+        if self.ends and start < self.ends[-1]:
+            self.ends[-1] = max(self.ends[-1], end)
+            return
+        self.starts.append(start)
+        self.ends.append(end)
+        self.labels.append(label)
+
+
+def batch_conflicts(items):
+    """
+    批量检查冲突，items 为 [(序号, 面试官 id, 开始, 结束)]。
+    一次查询取出这些面试官在整批时间范围内的已有面试，批内条目按顺序占用时间，
+    返回 {序号: 冲突说明}。
+    """
+    items = [item for item in items if item[1]]
+    if not items:
+        return {}
+
+    busy = defaultdict(BusyIntervals)
+    existing = overlapping(
+        Interview.objects.filter(interviewer_id__in={item[1] for item in items}),
+        min(item[2] for item in items), max(item[3] for item in items)
+    ).order_by('interviewer_id', 'scheduled_time').values_list('interviewer_id', 'scheduled_time', 'end_time', 'candidate_name')
+    for interviewer_id, start, end, candidate_name in existing:
+        busy[interviewer_id].merge_existing(start, end, f'已有面试（{candidate_name}）')
+
+    conflicts = {}
+    for index, interviewer_id, start, end in items:
+        label = busy[interviewer_id].add(start, end, f'第 {index + 1} 条')
+        if label:
+            conflicts[index] = f'面试官时间冲突：{label}'
+    return conflicts
+
+
+def work_windows(date_from, date_to, now=None):
+    """[date_from, date_to] 每天的工作时间段，已经过去的部分不计入"""
+    now = now or timezone.now()
+    windows = []
+    day = date_from
+    while day <= date_to:
+        start = max(timezone.make_aware(datetime.datetime.combine(day, WORK_DAY_START)), now)
+        end = timezone.make_aware(datetime.datetime.combine(day, WORK_DAY_END))
+        if start < end:
+            windows.append((start, end))
+        day += datetime.timedelta(days=1)
+    return windows
+
+
+def free_slots(interviewer_id, windows, min_duration=datetime.timedelta(minutes=30)):
+    """一次查询取出所有时间段内的面试，按开始时间扫描出不短于 min_duration 的空档"""
+    if not windows:
+        return []
+    busy = list(overlapping(
+        Interview.objects.filter(interviewer_id=interviewer_id), windows[0][0], windows[-1][1]
+    ).order_by('scheduled_time').values_list('scheduled_time', 'end_time'))
+
+    slots = []
+    first = 0
+    for window_start, window_end in windows:
+        # 在本时间段开始前已经结束的面试不会影响之后的时间段
+        while first < len(busy) and busy[first][1] <= window_start:
+            first += 1
+        cursor = window_start
+        i = first
+        while i < len(busy) and busy[i][0] < window_end:
+            start, end = busy[i]
+            if start - cursor >= min_duration:
+                slots.append((cursor, start))
+            cursor = max(cursor, end)
+            i += 1
+        if window_end - cursor >= min_duration:
+            slots.append((cursor, window_end))
+    return slots
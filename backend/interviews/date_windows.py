@@ -0,0 +1,98 @@
+import datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+# 日期参数统一转换成配置时区下的半开区间 [start, end)，直接比较 DateTimeField 原始列，
+# 可以走 scheduled_time 索引，也避免 __date / __year / __month 对每一行做时区转换
+
+
+def local_midnight(day):
+    """当前时区下某一天 00:00 对应的带时区时间"""
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def day_window(day):
+    start = local_midnight(day)
+    return start, local_midnight(day + datetime.timedelta(days=1))
+
+
+def week_bounds(day):
+    """day 所在自然周（周一开始）的 [周一, 下周一)"""
+    monday = day - datetime.timedelta(days=day.weekday())
+    return monday, monday + datetime.timedelta(days=7)
+
+
+def week_window(day):
+    monday, following = week_bounds(day)
+    return local_midnight(monday), local_midnight(following)
+
+
+def month_bounds(year, month):
+    """某月的 [1 日, 下月 1 日)"""
+    first = datetime.date(year, month, 1)
+    if month == 12:
+        return first, datetime.date(year + 1, 1, 1)
+    return first, datetime.date(year, month + 1, 1)
+
+
+def month_window(year, month):
+    first, following = month_bounds(year, month)
+    return local_midnight(first), local_midnight(following)
+
+
+def date_range_window(date_from=None, date_to=None):
+    """闭区间日期 [date_from, date_to] 转换为半开时间区间，任一端可以为空"""
+    start = local_midnight(date_from) if date_from else None
+    end = local_midnight(date_to + datetime.timedelta(days=1)) if date_to else None
+    return start, end
+
+
+def today():
+    return timezone.localdate()
+
+
+def filter_window(queryset, field, window):
+    start, end = window
+    if start is not None:
+        queryset = queryset.filter(**{f'{field}__gte': start})
+    if end is not None:
+        queryset = queryset.filter(**{f'{field}__lt': end})
+    return queryset
+
+
+def parse_date_param(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    day = None
+    try:
+        day = parse_date(value)
+    except ValueError:
+        pass
+    if day is None:
+        raise ValidationError({name: f'日期格式应为 YYYY-MM-DD: {value}'})
+    return day
+
+
+def parse_month_params(params, year_param='year', month_param='month'):
+    """读取 year/month 参数，两者都提供时返回该月的 [1 日, 下月 1 日)"""
+    year, month = params.get(year_param), params.get(month_param)
+    if not (year and month):
+        return None
+    try:
+        return month_bounds(int(year), int(month))
+    except ValueError:
+        raise ValidationError({month_param: f'年月无效: {year}-{month}'})
+
+
+def filter_date_params(queryset, field, params, from_param='date_from', to_param='date_to'):
+    """按 date_from/date_to 查询参数过滤（包含首尾两天）"""
+    window = date_range_window(parse_date_param(params, from_param), parse_date_param(params, to_param))
+    return filter_window(queryset, field, window)
+
+
+def filter_day_bounds(queryset, field, bounds):
+    """对 DateField 按 [start, end) 日期过滤"""
+    return queryset.filter(**{f'{field}__gte': bounds[0], f'{field}__lt': bounds[1]})
@@ -0,0 +1,265 @@
+import asyncio
+import json
+import time
+from importlib import import_module
+from types import SimpleNamespace
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import InterviewEvent
+
+# 这些字段变化时产生事件，顺序即事件状态元组的顺序
+EVENT_FIELDS = ('status', 'result', 'recording_uploaded')
+
+# 轮询事件表的间隔（秒）；事件表按主键递增读取，每次只是一次索引范围查询
+SSE_POLL_INTERVAL = getattr(settings, 'SSE_POLL_INTERVAL', 2)
+# 没有事件时定期发送注释行，防止代理因连接空闲而断开
+SSE_HEARTBEAT_INTERVAL = getattr(settings, 'SSE_HEARTBEAT_INTERVAL', 15)
+# 单个连接的最长时间，到期后由浏览器的 EventSource 带着 Last-Event-ID 自动重连
+SSE_MAX_DURATION = getattr(settings, 'SSE_MAX_DURATION', 300)
+SSE_RETRY_MS = 3000
+SSE_BATCH_SIZE = 100
+# 事件保留天数，过期的事件在写入时顺带清理
+EVENT_RETENTION_DAYS = getattr(settings, 'EVENT_RETENTION_DAYS', 7)
+PRUNE_EVERY = 1000
+
+
+def event_state(instance):
+    """字段未加载（被 only/defer 延迟）时返回 None"""
+    if any(name not in instance.__dict__ for name in EVENT_FIELDS):
+        return None
+    return tuple(instance.__dict__[name] for name in EVENT_FIELDS)
+
+
+def event_data(interview):
+    return {
+        'interview_id': interview.pk,
+        'candidate_name': interview.candidate_name,
+        'scheduled_time': interview.scheduled_time,
+        'status': interview.status,
+        'result': interview.result,
+        'recording_uploaded': interview.recording_uploaded,
+    }
+
+
+def make_event(interview, kind):
+    return InterviewEvent(
+        interview_id=interview.pk, interviewer_id=interview.interviewer_id, kind=kind, data=event_data(interview)
+    )
+
+
+def changed_kinds(old_state, new_state):
+    """保存前后的状态比较出事件类型"""
+    old = dict(zip(EVENT_FIELDS, old_state))
+    new = dict(zip(EVENT_FIELDS, new_state))
+    kinds = []
+    if old['status'] != new['status']:
+        kinds.append('status_changed')
+    if old['result'] != new['result']:
+        kinds.append('result_changed')
+    if new['recording_uploaded'] and not old['recording_uploaded']:
+        kinds.append('recording_uploaded')
+    return kinds
+
+
+def record_events(interview, kinds):
+    for kind in kinds:
+        event = make_event(interview, kind)
+        event.save()
+        if event.pk % PRUNE_EVERY == 0:
+            prune_events()
+
+
+def record_created(interviews):
+    """批量新建面试（bulk_create 不触发信号）后补写 created 事件"""
+    InterviewEvent.objects.bulk_create(
+        (make_event(interview, 'created')
+         for interview in interviews.only('interviewer_id', 'candidate_name', 'scheduled_time', *EVENT_FIELDS)),
+        batch_size=500
+    )
+
+
+def prune_events():
+    InterviewEvent.objects.filter(
+        created_time__lt=timezone.now() - timezone.timedelta(days=EVENT_RETENTION_DAYS)
+    ).delete()
+
+
+def visible_events(user):
+    """管理员收到全部事件，面试官只收到自己的面试的事件"""
+    if user.is_staff:
+        return InterviewEvent.objects.all()
+    return InterviewEvent.objects.filter(interviewer=user)
+
+
+def parse_last_event_id(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def format_event(event_id, kind, data):
+    return f'id: {event_id}\nevent: {kind}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+
+
+class EventCursor:
+    """
+    一个订阅者的读取位置。没有 Last-Event-ID 时从当前最新事件之后开始；
+    续传的位置早于已清理的事件时发送 reset，客户端应重新加载数据。
+    """
+
+    def __init__(self, user, last_event_id=None):
+        self.user = user
+        self.last_id = last_event_id
+
+    def start(self):
+        chunks = [f'retry: {SSE_RETRY_MS}\n\n']
+        latest = InterviewEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        if self.last_id is None:
+            self.last_id = latest
+            return chunks
+        oldest = InterviewEvent.objects.order_by('id').values_list('id', flat=True).first()
+        # 事件已被清理，或者 id 来自重建之前的数据库，都无法续传
+        if self.last_id > latest or (oldest is not None and self.last_id < oldest - 1):
+            self.last_id = latest
+            chunks.append(format_event(latest, 'reset', {}))
+        return chunks
+
+    def poll(self):
+        events = list(
+            visible_events(self.user).filter(id__gt=self.last_id).order_by('id')
+            .values_list('id', 'kind', 'data')[:SSE_BATCH_SIZE]
+        )
+        if events:
+            self.last_id = events[-1][0]
+        return [format_event(*event) for event in events]
+
+
+def event_stream(user, last_event_id=None, max_duration=None):
+    """WSGI 下使用的同步生成器，连接期间占用一个工作线程，到期后结束由客户端重连"""
+    cursor = EventCursor(user, last_event_id)
+    yield from cursor.start()
+    deadline = time.monotonic() + (SSE_MAX_DURATION if max_duration is None else max_duration)
+    last_sent = time.monotonic()
+    while True:
+        chunks = cursor.poll()
+        if chunks:
+            yield ''.join(chunks)
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= SSE_HEARTBEAT_INTERVAL:
+            yield ': keep-alive\n\n'
+            last_sent = time.monotonic()
+        if time.monotonic() >= deadline:
+            return
+        time.sleep(SSE_POLL_INTERVAL)
+
+
+def session_user(session_key):
+    """按会话 cookie 取得用户，与 AuthenticationMiddleware 的结果一致"""
+    engine = import_module(settings.SESSION_ENGINE)
+    return get_user(SimpleNamespace(session=engine.SessionStore(session_key)))
+
+
+def cookie_value(scope, name):
+    for header, value in scope.get('headers', []):
+        if header == b'cookie':
+            for part in value.decode('latin-1').split(';'):
+                key, _, cookie = part.strip().partition('=')
+                if key == name:
+                    return cookie
+    return None
+
+
+def header_value(scope, name):
+    for header, value in scope.get('headers', []):
+        if header == name:
+            return value.decode('latin-1')
+    return None
+
+
+def cors_headers(scope):
+    """请求不经过 Django 的中间件，按 django-cors-headers 的配置补上跨域响应头"""
+    origin = header_value(scope, b'origin')
+    allowed = getattr(settings, 'CORS_ALLOW_ALL_ORIGINS', False) or origin in getattr(settings, 'CORS_ALLOWED_ORIGINS', ())
+    if not origin or not allowed:
+        return []
+    headers = [(b'access-control-allow-origin', origin.encode('latin-1')), (b'vary', b'Origin')]
+    if getattr(settings, 'CORS_ALLOW_CREDENTIALS', False):
+        headers.append((b'access-control-allow-credentials', b'true'))
+    return headers
+
+
+class EventStreamApp:
+    """
+    ASGI 部署下直接处理事件流地址，其余请求交给 Django。
+    Django 3.2 在事件循环里同步迭代流式响应，生成器中既不能等待也不能查询数据库，
+    因此这里用协程实现：等待期间不占线程，查询通过 sync_to_async 执行。
+    浏览器的 EventSource 只能携带 cookie，这里只支持会话认证。
+    """
+
+    def __init__(self, app, path='/api/interviews/events/'):
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] != self.path or scope['method'] != 'GET':
+            return await self.app(scope, receive, send)
+
+        try:
+            user = await sync_to_async(session_user)(cookie_value(scope, settings.SESSION_COOKIE_NAME))
+            if not user.is_authenticated:
+                body = json.dumps({'detail': '身份认证信息未提供。'}, ensure_ascii=False).encode('utf-8')
+                await send({'type': 'http.response.start', 'status': 403,
+                            'headers': [(b'content-type', b'application/json'), *cors_headers(scope)]})
+                await send({'type': 'http.response.body', 'body': body})
+                return
+
+            last_event_id = header_value(scope, b'last-event-id')
+            if last_event_id is None:
+                query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+                last_event_id = query.get('last_event_id', [None])[0]
+            await self.stream(scope, EventCursor(user, parse_last_event_id(last_event_id)), receive, send)
+        finally:
+            await sync_to_async(close_old_connections)()
+
+    async def stream(self, scope, cursor, receive, send):
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream; charset=utf-8'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+            *cors_headers(scope),
+        ]})
+        chunks = await sync_to_async(cursor.start)()
+        await send({'type': 'http.response.body', 'body': ''.join(chunks).encode('utf-8'), 'more_body': True})
+
+        disconnected = asyncio.ensure_future(receive())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + SSE_MAX_DURATION
+        last_sent = loop.time()
+        try:
+            while True:
+                chunks = await sync_to_async(cursor.poll)()
+                if chunks:
+                    last_sent = loop.time()
+                elif loop.time() - last_sent >= SSE_HEARTBEAT_INTERVAL:
+                    chunks = [': keep-alive\n\n']
+                    last_sent = loop.time()
+                if chunks:
+                    await send({'type': 'http.response.body', 'body': ''.join(chunks).encode('utf-8'), 'more_body': True})
+                if loop.time() >= deadline:
+                    break
+                # 客户端断开时立即结束，否则每个间隔查询一次
+                done, _ = await asyncio.wait({disconnected}, timeout=SSE_POLL_INTERVAL)
+                if done:
+                    if disconnected.result()['type'] == 'http.disconnect':
+                        return
+                    disconnected = asyncio.ensure_future(receive())
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            disconnected.cancel()
@@ -0,0 +1,53 @@
+from django.db import models
+from django.contrib.auth.models import User
+
+class BackgroundJob(models.Model):
+    KIND_CHOICES = [
+        ('student_import', '学生导入'),
+        ('student_export', '学生导出'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', '排队中'),
+        ('running', '执行中'),
+        ('succeeded', '已完成'),
+        ('failed', '失败'),
+    ]
+
+    kind = models.CharField(max_length=50, choices=KIND_CHOICES, verbose_name="任务类型")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="状态")
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name="进度(%)")
+    params = models.JSONField(default=dict, blank=True, verbose_name="任务参数")
+    input_file = models.FileField(upload_to='job_files/input/%Y/%m/%d/', null=True, blank=True, verbose_name="输入文件")
+    result_file = models.FileField(upload_to='job_files/result/%Y/%m/%d/', null=True, blank=True, verbose_name="结果文件")
+    result = models.JSONField(null=True, blank=True, verbose_name="执行结果")
+    error = models.TextField(blank=True, verbose_name="错误信息")
+    worker = models.CharField(max_length=100, blank=True, verbose_name="执行进程")
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        verbose_name="创建人",
+        null=True,
+        blank=True
+    )
+
+    # 时间戳（updated_time 兼作执行中任务的心跳）
+    created_time = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
+    updated_time = models.DateTimeField(auto_now=True, verbose_name="更新时间")
+    started_time = models.DateTimeField(null=True, blank=True, verbose_name="开始时间")
+    finished_time = models.DateTimeField(null=True, blank=True, verbose_name="结束时间")
+
+    class Meta:
+        verbose_name = "后台任务"
+        verbose_name_plural = verbose_name
+        ordering = ['-created_time']
+        indexes = [
+            models.Index(fields=['status', 'created_time'], name='background_job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} - {self.get_status_display()}"
+
+    @property
+    def is_finished(self):
+        return self.status in ('succeeded', 'failed')
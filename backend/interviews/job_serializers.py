@@ -0,0 +1,18 @@
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+from .job_models import BackgroundJob
+
+class BackgroundJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BackgroundJob
+        fields = [
+            'id', 'kind', 'status', 'progress', 'result', 'error',
+            'created_time', 'started_time', 'finished_time', 'download_url'
+        ]
+
+    def get_download_url(self, obj):
+        if obj.status != 'succeeded' or not obj.result_file:
+            return None
+        return reverse('backgroundjob-download', args=[obj.pk], request=self.context.get('request'))
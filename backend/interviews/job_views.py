@@ -0,0 +1,40 @@
+import os
+from rest_framework import viewsets, status, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from django.http import FileResponse
+from .job_models import BackgroundJob
+from .job_serializers import BackgroundJobSerializer
+
+class BackgroundJobViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = BackgroundJob.objects.all()
+    serializer_class = BackgroundJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        # 参数只在执行任务时使用，列表不读取；error 会返回给客户端，不能延迟加载
+        queryset = BackgroundJob.objects.defer('params')
+        # 普通用户只能查看自己创建的任务
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(created_by=self.request.user)
+        return queryset
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """下载任务结果文件"""
+        job = self.get_object()
+        if job.status != 'succeeded' or not job.result_file:
+            return Response({'error': '任务尚未完成或没有结果文件'}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(
+            job.result_file.open('rb'),
+            as_attachment=True,
+            filename=os.path.basename(job.result_file.name)
+        )
+
+
+def job_accepted_response(request, job):
+    """异步模式统一返回任务号和查询地址"""
+    data = BackgroundJobSerializer(job, context={'request': request}).data
+    data['status_url'] = reverse('backgroundjob-detail', args=[job.pk], request=request)
+    return Response(data, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,162 @@
+import logging
+import os
+import socket
+import traceback
+
+from django.core.files import File
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .job_models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+# 执行中的任务超过这个时间没有心跳，视为执行进程已退出，可以重新排队
+STALE_JOB_TIMEOUT = timezone.timedelta(minutes=10)
+# 进度回调时至少每隔这么久写一次心跳，即使百分比没有变化（远小于 STALE_JOB_TIMEOUT）
+HEARTBEAT_INTERVAL = timezone.timedelta(seconds=30)
+
+JOB_HANDLERS = {}
+
+
+def job_handler(kind):
+    """注册任务处理函数：handler(job, progress) 返回写入 job.result 的结果"""
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, user=None, params=None, input_file=None):
+    job = BackgroundJob(kind=kind, params=params or {}, created_by=user)
+    if input_file is not None:
+        job.input_file.save(input_file.name, input_file, save=False)
+    job.save()
+    return job
+
+
+class JobLost(Exception):
+    """任务已被当作超时重新排队（可能正由其他进程执行），当前进程应停止执行"""
+
+
+def owned(job):
+    """只匹配仍由当前进程执行的任务行，写入心跳和结果时都以此为条件"""
+    return BackgroundJob.objects.filter(pk=job.pk, status='running', worker=job.worker)
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim_next_job(worker):
+    """用条件 UPDATE 抢占最早排队的任务，多个执行进程并发时只有一个能成功"""
+    while True:
+        job = BackgroundJob.objects.filter(status='pending').order_by('created_time', 'id').first()
+        if job is None:
+            return None
+        claimed = BackgroundJob.objects.filter(pk=job.pk, status='pending').update(
+            status='running', worker=worker, started_time=timezone.now(), updated_time=timezone.now()
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def requeue_stale_jobs():
+    deadline = timezone.now() - STALE_JOB_TIMEOUT
+    return BackgroundJob.objects.filter(status='running', updated_time__lt=deadline).update(
+        status='pending', worker='', progress=0, updated_time=timezone.now()
+    )
+
+
+def report_progress(job, done, total):
+    percent = int(done * 100 / total) if total else 100
+    # 留 1% 给保存结果，避免前端看到 100% 却还拿不到文件
+    percent = min(percent, 99)
+    now = timezone.now()
+    # 百分比不变时也按间隔写心跳，否则进度很慢的长任务会被误判为超时，由另一个进程重复执行
+    if percent == job.progress and now - job.updated_time < HEARTBEAT_INTERVAL:
+        return
+    if not owned(job).update(progress=percent, updated_time=now):
+        raise JobLost(f'后台任务 {job.pk} 已被重新排队')
+    job.progress = percent
+    job.updated_time = now
+
+
+def run_job(job):
+    handler = JOB_HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f'未知的任务类型: {job.kind}')
+        job.result = handler(job, lambda done, total: report_progress(job, done, total))
+        job.status = 'succeeded'
+        job.progress = 100
+    except JobLost:
+        logger.warning('后台任务 %s 已被重新排队，停止执行', job.pk)
+        discard_result_file(job)
+        return job
+    except Exception as e:
+        logger.exception('后台任务 %s 执行失败', job.pk)
+        job.status = 'failed'
+        job.error = f'{e}\n{traceback.format_exc()}'
+    job.finished_time = timezone.now()
+    # 只在任务仍归当前进程时写入结果：超时后被重新排队的任务由新的执行进程负责
+    saved = owned(job).update(
+        status=job.status, progress=job.progress, result=job.result, error=job.error,
+        result_file=job.result_file.name or '', input_file='',
+        finished_time=job.finished_time, updated_time=job.finished_time
+    )
+    if not saved:
+        logger.warning('后台任务 %s 已被重新排队，丢弃本次执行结果', job.pk)
+        discard_result_file(job)
+    elif job.input_file:
+        # 任务结束（成功或失败）后不再需要上传的输入文件；被重新排队时留给新的执行进程
+        job.input_file.delete(save=False)
+    return job
+
+
+def discard_result_file(job):
+    if job.result_file:
+        job.result_file.delete(save=False)
+
+
+def run_pending_jobs(worker=None, limit=None):
+    """依次执行排队中的任务，返回执行的数量"""
+    worker = worker or worker_name()
+    count = 0
+    while limit is None or count < limit:
+        close_old_connections()
+        job = claim_next_job(worker)
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
+
+
+@job_handler('student_import')
+def student_import_job(job, progress):
+    from .student_import import import_students, read_student_file
+
+    with job.input_file.open('rb') as file:
+        df = read_student_file(file)
+    return import_students(df, progress=progress)
+
+
+@job_handler('student_export')
+def student_export_job(job, progress):
+    from .student_export import write_csv, write_xlsx
+    from .student_models import StudentInfo
+    from .student_views import filter_students
+
+    queryset = filter_students(StudentInfo.objects.all(), job.params.get('filters', {}))
+    export_format = job.params.get('export_format', 'xlsx')
+    if export_format == 'csv':
+        output = write_csv(queryset, progress)
+    else:
+        export_format = 'xlsx'
+        output = write_xlsx(queryset, progress)
+
+    with output:
+        job.result_file.save(f'students_{job.pk}.{export_format}', File(output), save=False)
+    return {'export_format': export_format}
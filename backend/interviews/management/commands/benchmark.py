@@ -0,0 +1,275 @@
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+import django
+import pandas as pd
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from interviews.columnar import ColumnarJSONRenderer
+from interviews.models import Interview
+from interviews.student_import import IMPORT_COLUMNS
+from interviews.student_models import StudentInfo
+from interviews.synthetic import SyntheticData
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json')
+BENCH_USER = 'benchmark'
+# 比较基准时，中位数变慢超过该比例或查询数增加视为退化。
+# 用中位数而不是 p95：几十次请求的 p95 受偶发抖动影响太大，容易误报
+DEFAULT_THRESHOLD = 0.25
+# 低于该耗时（毫秒）的差异不算退化，避免计时抖动误报
+NOISE_FLOOR_MS = 2
+
+
+def scenarios(import_file):
+    """
+    (名称, 方法, 地址, 参数, 用户, 次数系数)。用户为 staff（管理员）或 interviewer（只看自己的面试）；
+    导出、导入等重接口按次数系数减少重复次数。*_columnar 与前一个场景地址相同，用 Accept 请求按列返回。
+    """
+    today = timezone.localdate()
+    month = f'year={today.year}&month={today.month}'
+    return [
+        ('interview_list', 'get', '/api/interviews/', None, 'staff', 1),
+        ('interview_list_filtered', 'get', '/api/interviews/?status=completed&page_size=50', None, 'staff', 1),
+        ('interview_list_interviewer', 'get', '/api/interviews/', None, 'interviewer', 1),
+        ('interview_list_deep_page', 'get', '/api/interviews/?page=200', None, 'staff', 1),
+        ('interview_page100', 'get', '/api/interviews/?page_size=100', None, 'staff', 1),
+        ('interview_page100_columnar', 'get', '/api/interviews/?page_size=100', None, 'staff', 1),
+        ('dashboard_stats', 'get', '/api/dashboard/stats/', None, 'staff', 1),
+        ('dashboard_stats_interviewer', 'get', '/api/dashboard/stats/', None, 'interviewer', 1),
+        ('interview_calendar', 'get', f'/api/interview_calendar/?{month}', None, 'staff', 1),
+        ('upcoming_interviews', 'get', '/api/interviews/upcoming_interviews/', None, 'staff', 1),
+        ('student_list', 'get', '/api/students/', None, 'staff', 1),
+        ('student_list_columnar', 'get', '/api/students/', None, 'staff', 1),
+        ('student_list_nested', 'get', '/api/students/?nested=true', None, 'staff', 0.5),
+        ('student_list_nested_columnar', 'get', '/api/students/?nested=true', None, 'staff', 0.5),
+        ('student_export_csv', 'get', '/api/students/export_students/?export_format=csv', None, 'staff', 0.3),
+        ('student_export_xlsx', 'get', '/api/students/export_students/', None, 'staff', 0.2),
+        ('student_import', 'post', '/api/students/import_students/', import_file, 'staff', 0.3),
+    ]
+
+
+def import_workbook(rows, seed):
+    """导入用的 Excel：身份证号在生成器不会用到的区段，第一次导入新建，之后都是更新"""
+    generator = SyntheticData(seed)
+    students = generator.student_rows(rows, 9_000_000)
+    fields = {field: header for header, field in IMPORT_COLUMNS.items()}
+    df = pd.DataFrame([
+        {header: getattr(student, field) for field, header in fields.items()}
+        for student in students
+    ])
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def parse_time(body, content_type, repeat=5):
+    """客户端解析 JSON 响应的耗时（毫秒，取中位数），不是 JSON 的响应返回 None"""
+    if 'json' not in content_type:
+        return None
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        json.loads(body)
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 2)
+
+
+def slower(base, result, threshold):
+    return result['p50_ms'] - base['p50_ms'] > max(base['p50_ms'] * threshold, NOISE_FLOOR_MS)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=settings.BASE_DIR, timeout=5).stdout.strip() or None
+    except OSError:
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        '在当前数据库上对主要接口做基准测试，报告延迟分位数和查询数，并与保存的基准比较。\n'
+        '先用 generate_data 生成数据，例如：\n'
+        '  DB_PATH=/tmp/bench.sqlite3 python manage.py generate_data --interviews 10000\n'
+        '  DB_PATH=/tmp/bench.sqlite3 python manage.py benchmark --compare'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30, help='每个场景的请求次数（重接口按比例减少）')
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--only', action='append', help='只运行指定的场景，可重复指定')
+        parser.add_argument('--import-rows', type=int, default=500, help='导入场景每次上传的行数')
+        parser.add_argument('--warm-cache', action='store_true', help='保留接口缓存（默认每次请求前清空，测的是未命中缓存的耗时）')
+        parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE, help='把结果保存为基准')
+        parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, help='与基准比较，有退化时返回错误')
+        parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='中位数允许变慢的比例')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if not Interview.objects.exists():
+            raise CommandError('数据库中没有面试数据，请先运行 generate_data')
+        clients = self.clients()
+        import_file = import_workbook(options['import_rows'], options['seed'])
+        selected = [
+            scenario for scenario in scenarios(import_file)
+            if not options['only'] or scenario[0] in options['only']
+        ]
+        if not selected:
+            raise CommandError('没有匹配的场景')
+
+        baseline = self.load_baseline(options['compare']) if options['compare'] else None
+        self.stdout.write(f'{"场景":<30}{"次数":>6}{"p50(ms)":>10}{"p95(ms)":>10}{"p99(ms)":>10}{"查询数":>8}{"响应(KB)":>10}{"解析(ms)":>10}')
+        results = {}
+        # 与生产环境一致：DEBUG 下每条 SQL 都会被记录，耗时偏高
+        with override_settings(DEBUG=False):
+            for scenario in selected:
+                results[scenario[0]] = self.run_scenario(clients, scenario, options)
+            if baseline:
+                # 单核或共享的机器上偶尔整体变慢，比基准慢的场景复测一次，取较快的结果
+                for scenario in selected:
+                    base = baseline['results'].get(scenario[0])
+                    if base and slower(base, results[scenario[0]], options['threshold']):
+                        retry = self.run_scenario(clients, scenario, options, label='（复测）')
+                        results[scenario[0]] = min(results[scenario[0]], retry, key=lambda result: result['p50_ms'])
+
+        report = {'meta': self.meta(options), 'results': results}
+        if baseline:
+            self.compare(report, baseline, options['compare'], options['threshold'])
+        if options['save_baseline']:
+            os.makedirs(os.path.dirname(options['save_baseline']), exist_ok=True)
+            with open(options['save_baseline'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+                file.write('\n')
+            self.stdout.write(self.style.SUCCESS(f'基准已保存到 {options["save_baseline"]}'))
+
+    def clients(self):
+        staff, _ = User.objects.get_or_create(username=BENCH_USER, defaults={'is_staff': True})
+        # 面试最多的面试官，代表数据量最大的普通用户
+        interviewer_id = (
+            Interview.objects.exclude(interviewer=None).order_by().values('interviewer')
+            .annotate(total=Count('id')).order_by('-total').values_list('interviewer', flat=True).first()
+        )
+        clients = {}
+        for role, user in (('staff', staff), ('interviewer', User.objects.get(pk=interviewer_id))):
+            client = Client()
+            client.force_login(user)
+            clients[role] = client
+        return clients
+
+    def request(self, client, method, path, upload, accept='application/json'):
+        if method == 'post':
+            upload_file = io.BytesIO(upload)
+            upload_file.name = 'students.xlsx'
+            # 写入在事务中回滚：每次导入的工作量相同，也不改变后续场景和下一次运行的数据
+            with transaction.atomic():
+                response = client.post(path, {'file': upload_file}, HTTP_ACCEPT=accept)
+                transaction.set_rollback(True)
+        else:
+            response = client.get(path, HTTP_ACCEPT=accept)
+        # 流式响应（CSV 导出）读完才算结束
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        if response.status_code != 200:
+            raise CommandError(f'{path} 返回 {response.status_code}: {body[:200]!r}')
+        return body, response.get('Content-Type', '')
+
+    def run_scenario(self, clients, scenario, options, label=''):
+        name, method, path, upload, user, factor = scenario
+        client = clients[user]
+        iterations = max(5, int(options['iterations'] * factor))
+        accept = ColumnarJSONRenderer.media_type if name.endswith('_columnar') else 'application/json'
+
+        def once():
+            if not options['warm_cache']:
+                cache.clear()
+            start = time.perf_counter()
+            body, _ = self.request(client, method, path, upload, accept)
+            return (time.perf_counter() - start) * 1000, len(body)
+
+        for _ in range(options['warmup']):
+            once()
+        latencies = [once()[0] for _ in range(iterations)]
+        # 查询数单独测一次，记录 SQL 的开销不计入耗时
+        if not options['warm_cache']:
+            cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            body, content_type = self.request(client, method, path, upload, accept)
+        result = {
+            'p50_ms': round(statistics.median(latencies), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'queries': len(queries),
+            'response_bytes': len(body),
+            # 客户端解析响应的耗时，比较 JSON 和按列返回时有用
+            'parse_ms': parse_time(body, content_type),
+        }
+        parse_ms = '-' if result['parse_ms'] is None else f'{result["parse_ms"]:.2f}'
+        self.stdout.write(
+            f'{name + label:<30}{iterations:>6}{result["p50_ms"]:>10.1f}{result["p95_ms"]:>10.1f}{result["p99_ms"]:>10.1f}'
+            f'{result["queries"]:>8}{result["response_bytes"] / 1024:>10.1f}{parse_ms:>10}'
+        )
+        return result
+
+    def meta(self, options):
+        return {
+            'created': timezone.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'interviews': Interview.objects.count(),
+            'students': StudentInfo.objects.count(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'iterations': options['iterations'],
+            'warm_cache': options['warm_cache'],
+        }
+
+    def load_baseline(self, path):
+        try:
+            with open(path, encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            raise CommandError(f'基准文件不存在：{path}，先用 --save-baseline 生成')
+
+    def compare(self, report, baseline, path, threshold):
+        base_meta, meta = baseline['meta'], report['meta']
+        for key in ('interviews', 'students', 'database', 'warm_cache'):
+            if base_meta.get(key) != meta.get(key):
+                self.stdout.write(self.style.WARNING(
+                    f'数据规模或环境与基准不同：{key} 基准为 {base_meta.get(key)}，当前为 {meta.get(key)}'
+                ))
+
+        self.stdout.write(f'\n与基准比较（{path}，版本 {base_meta.get("revision")}）：')
+        regressions = []
+        for name, result in report['results'].items():
+            base = baseline['results'].get(name)
+            if base is None:
+                self.stdout.write(f'{name:<30}（基准中没有该场景）')
+                continue
+            change = (result['p50_ms'] - base['p50_ms']) / base['p50_ms'] if base['p50_ms'] else 0
+            line = (f'{name:<30}p50 {base["p50_ms"]:.1f} -> {result["p50_ms"]:.1f}ms ({change:+.0%})  '
+                    f'p95 {base["p95_ms"]:.1f} -> {result["p95_ms"]:.1f}ms  查询 {base["queries"]} -> {result["queries"]}')
+            if slower(base, result, threshold) or result['queries'] > base['queries']:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        if regressions:
+            raise CommandError(f'以下场景出现退化：{", ".join(regressions)}')
+        self.stdout.write(self.style.SUCCESS('没有发现退化'))
@@ -0,0 +1,131 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, transaction
+from django.utils import timezone
+
+from interviews.models import Interview
+
+PROFILES = ('sqlite-basic', 'sqlite', 'postgresql')
+BENCH_USER = 'benchmark_writer'
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def write_once(interviewer, worker, number):
+    """
+    一次写操作与接口的写入路径相同：新建面试，或修改自己上一条面试的状态。
+    保存时的信号会先读后写日汇总、写事件日志和搜索索引，都在同一个事务里。
+    """
+    with transaction.atomic():
+        interview = Interview.objects.filter(interviewer=interviewer, candidate_phone=str(worker)).order_by('-id').first()
+        if interview is not None and number % 2:
+            interview.status = 'completed' if interview.status == 'scheduled' else 'scheduled'
+            interview.save()
+            return
+        Interview.objects.create(
+            candidate_name=f'压测候选人{worker}-{number}',
+            candidate_phone=str(worker),
+            candidate_email=f'bench{worker}@example.com',
+            company_name='压测公司',
+            position_title='压测职位',
+            interview_method='video',
+            interview_round='first',
+            scheduled_time=timezone.now() + timezone.timedelta(days=number % 30),
+            interviewer=interviewer,
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        '比较不同数据库配置档（DB_PROFILE）的并发写入吞吐量。每个配置档启动若干个进程同时写入，'
+        '模拟多 worker 部署。SQLite 配置档使用临时数据库文件；postgresql 配置档写入 DB_NAME 指定的数据库，'
+        '请指向专用的测试库。'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', action='append', choices=PROFILES,
+                            help='要比较的配置档，可重复指定（默认 sqlite-basic 和 sqlite）')
+        parser.add_argument('--workers', type=int, default=4, help='并发写入的进程数')
+        parser.add_argument('--duration', type=float, default=10, help='每个配置档的写入时间（秒）')
+        # 以下参数由主进程启动子进程时使用
+        parser.add_argument('--worker', type=int, help='（内部使用）写入进程编号')
+        parser.add_argument('--start-at', type=float)
+        parser.add_argument('--seed', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            User.objects.get_or_create(username=BENCH_USER)
+            return
+        if options['worker'] is not None:
+            return self.run_worker(options['worker'], options['start_at'], options['duration'])
+
+        self.stdout.write(f'{"配置档":<16}{"写入":>8}{"锁错误":>8}{"写入/秒":>10}{"p50(ms)":>10}{"p95(ms)":>10}{"p99(ms)":>10}')
+        for profile in options['profile'] or PROFILES[:2]:
+            with tempfile.TemporaryDirectory() as directory:
+                env = {**os.environ, 'DB_PROFILE': profile, 'DB_PATH': os.path.join(directory, 'bench.sqlite3')}
+                if profile == 'postgresql':
+                    env.pop('DB_PATH')
+                results = self.run_profile(env, options['workers'], options['duration'])
+            self.report(profile, results, options['duration'])
+
+    def manage(self, env, *args, **kwargs):
+        return subprocess.Popen(
+            [sys.executable, sys.argv[0], 'benchmark_writes', *args], env=env, **kwargs
+        )
+
+    def run_profile(self, env, workers, duration):
+        migrate = subprocess.run([sys.executable, sys.argv[0], 'migrate', '-v', '0'], env=env)
+        if migrate.returncode or self.manage(env, '--seed').wait():
+            raise CommandError(f'初始化数据库失败（DB_PROFILE={env["DB_PROFILE"]}）')
+        # 子进程启动和加载 Django 需要时间，约定一个共同的开始时刻
+        start_at = time.time() + 3
+        processes = [
+            self.manage(env, '--worker', str(worker), '--start-at', str(start_at), '--duration', str(duration),
+                        stdout=subprocess.PIPE, text=True)
+            for worker in range(workers)
+        ]
+        results = []
+        for process in processes:
+            output, _ = process.communicate()
+            if process.returncode:
+                raise CommandError(f'写入进程异常退出（DB_PROFILE={env["DB_PROFILE"]}）')
+            results.append(json.loads(output.strip().splitlines()[-1]))
+        return results
+
+    def run_worker(self, worker, start_at, duration):
+        interviewer = User.objects.get(username=BENCH_USER)
+        time.sleep(max(0, start_at - time.time()))
+        deadline = start_at + duration
+        latencies, errors, number = [], 0, 0
+        while time.time() < deadline:
+            start = time.perf_counter()
+            try:
+                write_once(interviewer, worker, number)
+                latencies.append((time.perf_counter() - start) * 1000)
+            except OperationalError:
+                # database is locked：等待写锁超时或锁升级冲突
+                errors += 1
+            number += 1
+        self.stdout.write(json.dumps({'latencies': latencies, 'errors': errors}))
+
+    def report(self, profile, results, duration):
+        latencies = [latency for result in results for latency in result['latencies']]
+        errors = sum(result['errors'] for result in results)
+        if not latencies:
+            self.stdout.write(self.style.ERROR(f'{profile:<16}{0:>8}{errors:>8}'))
+            return
+        self.stdout.write(
+            f'{profile:<16}{len(latencies):>8}{errors:>8}{len(latencies) / duration:>10.1f}'
+            f'{statistics.median(latencies):>10.1f}{percentile(latencies, 95):>10.1f}{percentile(latencies, 99):>10.1f}'
+        )
@@ -0,0 +1,130 @@
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.request import Request
+
+from interviews.conflicts import overlapping
+from interviews.date_windows import month_bounds
+from interviews.models import Interview
+from interviews.rollups import user_daily_stats
+from interviews.stats import calendar_data
+from interviews.views import InterviewViewSet
+
+# SQLite: "SCAN interviews_interview"（不带 USING INDEX）；PostgreSQL: "Seq Scan on interviews_interview"
+SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(?P<table>\w+)(?P<rest>.*)$')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (?P<table>\w+)')
+TEMP_SORT = re.compile(r'USE TEMP B-TREE FOR (?P<clause>.+)$')
+
+
+def find_full_scans(plan):
+    """从 EXPLAIN 输出中找出全表扫描的表"""
+    tables = []
+    for line in plan.splitlines():
+        match = SQLITE_SCAN.search(line)
+        if match and 'INDEX' not in match.group('rest'):
+            tables.append(match.group('table'))
+            continue
+        match = POSTGRES_SCAN.search(line)
+        if match:
+            tables.append(match.group('table'))
+    return tables
+
+
+def find_index_scans(plan):
+    """找出没有范围条件、遍历整个索引的扫描（常见于列被函数包裹的过滤）"""
+    return [
+        match.group('table') + match.group('rest')
+        for match in map(SQLITE_SCAN.search, plan.splitlines())
+        if match and 'INDEX' in match.group('rest') and 'COVERING' not in match.group('rest')
+    ]
+
+
+def find_temp_sorts(plan):
+    return [match.group('clause') for match in map(TEMP_SORT.search, plan.splitlines()) if match]
+
+
+def viewset_queryset(user, action, params=None):
+    """按接口实际使用的 get_queryset 构造查询"""
+    request = Request(RequestFactory().get('/', params or {}))
+    request.user = user
+    view = InterviewViewSet(request=request, action=action, format_kwarg=None, args=(), kwargs={})
+    return view.get_queryset()
+
+
+def endpoint_queries(user):
+    """
+    各接口的代表性查询，与视图中的过滤条件保持一致。
+    返回 (名称, 查询集, 是否允许全表扫描)，管理员视角的全量聚合本身就要读取整张表。
+    """
+    now = timezone.now()
+    today_start = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    return [
+        ('interviews.list', viewset_queryset(user, 'list'), False),
+        ('interviews.list?status', viewset_queryset(user, 'list', {'status': 'scheduled'}), False),
+        ('interviews.list?date_from&date_to', viewset_queryset(user, 'list', {
+            'date_from': today_start.date().isoformat(),
+            'date_to': (today_start + timezone.timedelta(days=7)).date().isoformat(),
+        }), False),
+        ('interviews.my_interviews', Interview.objects.filter(interviewer=user).order_by('-scheduled_time', '-id'), False),
+        ('interviews.upcoming_interviews', Interview.objects.filter(
+            scheduled_time__gte=now, status__in=['scheduled', 'in_progress']
+        ).order_by('scheduled_time')[:10], False),
+        ('dashboard.stats', user_daily_stats(user).values('day', 'total_count'), user.is_staff),
+        ('calendar', calendar_data(user, month_bounds(today_start.year, today_start.month)), False),
+        ('interviews.conflict', overlapping(
+            Interview.objects.filter(interviewer=user), now, now + timezone.timedelta(hours=1)
+        ), False),
+    ]
+
+
+class Command(BaseCommand):
+    help = '对各接口使用的查询执行 EXPLAIN，报告全表扫描和临时排序'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='以指定用户身份构造查询（默认同时检查管理员和普通面试官视角）')
+        parser.add_argument('--verbose-plan', action='store_true', help='输出完整的执行计划')
+        parser.add_argument('--fail-on-scan', action='store_true', help='发现全表扫描时返回非零退出码')
+
+    def get_users(self, username):
+        if username:
+            try:
+                return [User.objects.get(username=username)]
+            except User.DoesNotExist:
+                raise CommandError(f'用户不存在: {username}')
+        # 不需要真实用户，只用来生成查询条件
+        return [User(pk=0, username='<staff>', is_staff=True), User(pk=0, username='<interviewer>')]
+
+    def handle(self, *args, **options):
+        full_scans = []
+
+        for user in self.get_users(options['user']):
+            self.stdout.write(self.style.MIGRATE_HEADING(f'用户视角: {user.username}'))
+            for name, queryset, allow_scan in endpoint_queries(user):
+                plan = queryset.explain()
+                scans = find_full_scans(plan)
+                index_scans = find_index_scans(plan)
+                sorts = find_temp_sorts(plan)
+
+                if scans and allow_scan:
+                    self.stdout.write(f'  [全量聚合] {name}: {", ".join(scans)}')
+                elif scans:
+                    full_scans.append((user.username, name, scans))
+                    self.stdout.write(self.style.ERROR(f'  [全表扫描] {name}: {", ".join(scans)}'))
+                elif index_scans:
+                    self.stdout.write(self.style.WARNING(f'  [索引全扫描] {name}: {", ".join(index_scans)}'))
+                elif sorts:
+                    self.stdout.write(self.style.WARNING(f'  [临时排序] {name}: {", ".join(sorts)}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'  [OK] {name}'))
+
+                if options['verbose_plan']:
+                    for line in plan.splitlines():
+                        self.stdout.write(f'      {line}')
+
+        self.stdout.write(f'共发现 {len(full_scans)} 个全表扫描')
+        if full_scans and options['fail_on_scan']:
+            raise CommandError('存在全表扫描的查询')
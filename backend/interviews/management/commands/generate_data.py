@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from interviews.synthetic import GENERATE_BATCH_SIZE, SyntheticData
+
+
+class Command(BaseCommand):
+    help = (
+        '批量生成压测数据（面试官、公司、职位、面试、学生），例如：\n'
+        '  DB_PATH=/tmp/bench.sqlite3 python manage.py migrate\n'
+        '  DB_PATH=/tmp/bench.sqlite3 python manage.py generate_data --interviews 100000'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interviews', type=int, default=10000, help='面试数量（1 万到 100 万）')
+        parser.add_argument('--students', type=int, help='学生数量（默认为面试数量的十分之一）')
+        parser.add_argument('--companies', type=int, help='公司数量（默认为面试数量的五十分之一，至少 20 家）')
+        parser.add_argument('--interviewers', type=int, help='面试官数量（默认每 2000 场面试一名，至少 5 名）')
+        parser.add_argument('--seed', type=int, default=42, help='随机种子，相同的种子生成相同的数据')
+        parser.add_argument('--batch-size', type=int, default=GENERATE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        interviews = options['interviews']
+        if interviews < 0:
+            raise CommandError('面试数量不能为负数')
+        students = options['students'] if options['students'] is not None else interviews // 10
+        companies = options['companies'] or max(20, interviews // 50)
+        interviewers = options['interviewers'] or max(5, interviews // 2000)
+
+        start = time.perf_counter()
+        self.verbosity = options['verbosity']
+        generator = SyntheticData(options['seed'], options['batch_size'], log=self.log_progress)
+        generator.generate(interviews, students, companies, interviewers)
+        self.stdout.write(self.style.SUCCESS(
+            f'已生成 {interviews} 场面试、{students} 名学生、{companies} 家公司、{interviewers} 名面试官，'
+            f'用时 {time.perf_counter() - start:.1f} 秒'
+        ))
+
+    def log_progress(self, message):
+        if self.verbosity >= 2:
+            self.stdout.write(message)
@@ -0,0 +1,145 @@
+import http.client
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = (
+    '/api/dashboard/stats/',
+    '/api/interview_calendar/',
+    '/api/interviews/upcoming_interviews/',
+    '/api/auth/user/',
+)
+
+
+def response_cookies(response):
+    cookies = SimpleCookie()
+    for header in response.headers.get_all('Set-Cookie') or []:
+        cookies.load(header)
+    return {name: morsel.value for name, morsel in cookies.items()}
+
+
+def login(host, port, username, password):
+    """
+    通过 DRF 的登录页面取得会话 cookie。不用 Basic 认证：它每个请求都要计算一次密码哈希，
+    耗时会远远超过接口本身。
+    """
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    connection.request('GET', '/api-auth/login/')
+    response = connection.getresponse()
+    response.read()
+    csrf_token = response_cookies(response).get('csrftoken')
+    if not csrf_token:
+        raise CommandError('未取得 CSRF token，请确认 /api-auth/login/ 可以访问')
+
+    body = urlencode({'username': username, 'password': password, 'csrfmiddlewaretoken': csrf_token})
+    connection.request('POST', '/api-auth/login/', body=body, headers={
+        'Content-Type': 'application/x-www-form-urlencoded',
+        'Cookie': f'csrftoken={csrf_token}',
+    })
+    response = connection.getresponse()
+    response.read()
+    connection.close()
+    session_id = response_cookies(response).get('sessionid')
+    if not session_id:
+        raise CommandError('登录失败，请检查用户名和密码')
+    return session_id
+
+
+def slow_upload(host, port, headers, stop, size=64 * 1024, chunk=1024, interval=0.2):
+    """模拟慢速上传：按固定间隔一点点发送请求体，占住服务端读取请求的线程"""
+    while not stop.is_set():
+        connection = http.client.HTTPConnection(host, port, timeout=60)
+        try:
+            connection.putrequest('POST', '/api/interviews/')
+            for name, value in {**headers, 'Content-Type': 'application/octet-stream', 'Content-Length': size}.items():
+                connection.putheader(name, value)
+            connection.endheaders()
+            for _ in range(size // chunk):
+                if stop.is_set():
+                    break
+                connection.send(b'0' * chunk)
+                time.sleep(interval)
+            else:
+                connection.getresponse().read()
+        except (OSError, http.client.HTTPException):
+            pass
+        finally:
+            connection.close()
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        '对运行中的服务做并发压测，比较 WSGI 与 ASGI 部署，例如：\n'
+        '  gunicorn interview_system.wsgi -w 4 --threads 8\n'
+        '  gunicorn interview_system.asgi -w 4 -k uvicorn.workers.UvicornWorker'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='服务地址')
+        parser.add_argument('--path', action='append', help='压测的接口路径，可重复指定（默认为看板等只读接口）')
+        parser.add_argument('--user', required=True, help='用户名')
+        parser.add_argument('--password', required=True)
+        parser.add_argument('--requests', type=int, default=500, help='每个接口的请求数')
+        parser.add_argument('--concurrency', type=int, default=20, help='并发连接数')
+        parser.add_argument('--slow-clients', type=int, default=0, help='同时保持的慢速上传连接数，模拟长时间占用的请求')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError(f'只支持 http 地址: {options["url"]}')
+        session_id = login(url.hostname, url.port or 80, options['user'], options['password'])
+        headers = {'Cookie': f'sessionid={session_id}', 'Accept': 'application/json'}
+        local = threading.local()
+
+        def fetch(path):
+            # 每个线程复用一条长连接，与浏览器的行为一致
+            if getattr(local, 'connection', None) is None:
+                local.connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+            start = time.perf_counter()
+            try:
+                local.connection.request('GET', path, headers=headers)
+                response = local.connection.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                local.connection.close()
+                local.connection = None
+                ok = False
+            return ok, time.perf_counter() - start
+
+        stop = threading.Event()
+        slow_clients = [
+            threading.Thread(target=slow_upload, args=(url.hostname, url.port or 80, headers, stop), daemon=True)
+            for _ in range(options['slow_clients'])
+        ]
+        for client in slow_clients:
+            client.start()
+        # 等慢速连接都建立起来再开始计时
+        time.sleep(1 if slow_clients else 0)
+
+        self.stdout.write(f'{"接口":<40}{"成功":>8}{"失败":>6}{"请求/秒":>10}{"p50(ms)":>10}{"p95(ms)":>10}{"p99(ms)":>10}')
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            for path in options['path'] or DEFAULT_PATHS:
+                start = time.perf_counter()
+                results = list(pool.map(fetch, [path] * options['requests']))
+                elapsed = time.perf_counter() - start
+                latencies = [seconds * 1000 for ok, seconds in results if ok]
+                failures = len(results) - len(latencies)
+                if not latencies:
+                    self.stdout.write(self.style.ERROR(f'{path:<40}{0:>8}{failures:>6}'))
+                    continue
+                self.stdout.write(
+                    f'{path:<40}{len(latencies):>8}{failures:>6}{len(latencies) / elapsed:>10.1f}'
+                    f'{statistics.median(latencies):>10.1f}{percentile(latencies, 95):>10.1f}{percentile(latencies, 99):>10.1f}'
+                )
+        stop.set()
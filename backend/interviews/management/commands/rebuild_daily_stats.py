@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from interviews.caching import bump_namespace
+from interviews.rollups import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = '从面试表全量重建面试日汇总表（批量导入或直接 update 之后使用）'
+
+    def handle(self, *args, **options):
+        count = rebuild_daily_stats()
+        bump_namespace('interview')
+        self.stdout.write(self.style.SUCCESS(f'已重建 {count} 条日汇总记录'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from interviews.models import Interview
+from interviews.search import INTERVIEW_INDEX, STUDENT_INDEX, search_available
+from interviews.student_models import StudentInfo
+
+
+class Command(BaseCommand):
+    help = '全量重建学生和面试的全文搜索索引（直接 update 或恢复数据之后使用）'
+
+    def handle(self, *args, **options):
+        if not search_available():
+            raise CommandError('当前数据库不支持 FTS5 搜索索引')
+        with transaction.atomic():
+            students = STUDENT_INDEX.rebuild(StudentInfo.objects.all())
+            interviews = INTERVIEW_INDEX.rebuild(Interview.objects.all())
+        self.stdout.write(self.style.SUCCESS(f'已索引 {students} 名学生、{interviews} 场面试'))
@@ -0,0 +1,36 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from interviews.jobs import requeue_stale_jobs, run_pending_jobs, worker_name
+
+logger = logging.getLogger('interviews.jobs')
+
+
+class Command(BaseCommand):
+    help = '启动本地后台任务执行进程，从数据库任务表中领取并执行导入导出任务'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='执行完当前排队的任务后退出')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='队列为空时的轮询间隔（秒）')
+
+    def handle(self, *args, **options):
+        worker = worker_name()
+        self.stdout.write(f'任务执行进程 {worker} 已启动')
+        while True:
+            try:
+                requeued = requeue_stale_jobs()
+                if requeued:
+                    self.stdout.write(self.style.WARNING(f'重新排队 {requeued} 个超时未完成的任务'))
+                count = run_pending_jobs(worker)
+                if count:
+                    self.stdout.write(f'执行了 {count} 个任务')
+            except DatabaseError:
+                # 数据库暂时不可用（例如 SQLite 写锁等待超时）时不退出，丢弃连接后下一轮重试
+                logger.exception('领取后台任务时数据库出错')
+                close_old_connections()
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
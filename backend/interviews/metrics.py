@@ -0,0 +1,276 @@
+import asyncio
+import contextvars
+import hmac
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from rest_framework import serializers
+
+logger = logging.getLogger('interviews.requests')
+slow_query_logger = logging.getLogger('interviews.slow_queries')
+
+# 单条 SQL 超过该耗时（毫秒）时记录慢查询日志
+SLOW_QUERY_MS = getattr(settings, 'SLOW_QUERY_MS', 200)
+# /metrics 默认只允许管理员访问。Prometheus 抓取时带 Authorization: Bearer <METRICS_TOKEN>；
+# 按地址放行需显式配置 METRICS_ALLOWED_IPS，经过反向代理时所有请求都来自代理地址，不要填 127.0.0.1
+METRICS_TOKEN = getattr(settings, 'METRICS_TOKEN', None)
+METRICS_ALLOWED_IPS = getattr(settings, 'METRICS_ALLOWED_IPS', ())
+
+# 当前请求的统计，数据库查询和序列化时累加。用 contextvar 而不是线程变量：
+# 异步视图的查询在 sync_to_async 的线程中执行，contextvar 会随之传递
+current_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    def __init__(self, request):
+        self.request = request
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializing = False
+
+
+class Histogram:
+    """Prometheus 风格的直方图，按标签分组，只保存在本进程内"""
+
+    def __init__(self, name, help_text, buckets, label_names=('view',)):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.label_names = label_names
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self.lock:
+            series = self.series.setdefault(labels, [[0] * len(self.buckets), 0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            series = sorted((labels, [list(counts), total, count]) for labels, (counts, total, count) in self.series.items())
+        for labels, (counts, total, count) in series:
+            label_text = format_labels(self.label_names, labels)
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{format_labels(self.label_names + ("le",), labels + (format_value(bound),))} {bucket_count}')
+            lines.append(f'{self.name}_bucket{format_labels(self.label_names + ("le",), labels + ("+Inf",))} {count}')
+            lines.append(f'{self.name}_sum{label_text} {format_value(total)}')
+            lines.append(f'{self.name}_count{label_text} {count}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self.lock:
+            self.series[labels] = self.series.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self.lock:
+            series = sorted(self.series.items())
+        for labels, value in series:
+            lines.append(f'{self.name}{format_labels(self.label_names, labels)} {format_value(value)}')
+        return lines
+
+
+def format_labels(names, values):
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in values)
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, escaped)) + '}'
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+REQUESTS = Counter('http_requests_total', '请求数', ('view', 'method', 'status'))
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', '请求处理时间（秒）',
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+DB_QUERIES = Histogram('http_request_db_queries', '每个请求的数据库查询数', (0, 1, 2, 5, 10, 20, 50, 100, 200))
+SQL_SECONDS = Histogram(
+    'http_request_sql_duration_seconds', '每个请求的 SQL 总耗时（秒）',
+    (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+SERIALIZER_SECONDS = Histogram(
+    'http_request_serializer_duration_seconds', '每个请求的序列化耗时（秒）',
+    (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+RESPONSE_BYTES = Histogram(
+    'http_response_size_bytes', '响应体大小（字节，流式响应按 Content-Length，未知时不计）',
+    (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+)
+METRICS = (REQUESTS, REQUEST_SECONDS, DB_QUERIES, SQL_SECONDS, SERIALIZER_SECONDS, RESPONSE_BYTES)
+
+
+def render_metrics():
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def time_query(execute, sql, params, many, context):
+    """数据库连接的 execute_wrapper：统计当前请求的查询数和耗时，并记录慢查询"""
+    stats = current_stats.get()
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        # 只统计请求内的查询，管理命令等离线任务不记录
+        if stats is not None:
+            stats.queries += 1
+            stats.sql_seconds += elapsed
+            if elapsed * 1000 >= SLOW_QUERY_MS:
+                slow_query_logger.warning(json.dumps({
+                    'view': view_label(stats.request),
+                    'duration_ms': round(elapsed * 1000, 1),
+                    'sql': sql,
+                }, ensure_ascii=False))
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """connection_created 信号：每个线程的连接第一次连接时挂上计时器"""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def timed_data(prop):
+    def data(serializer):
+        stats = current_stats.get()
+        # 嵌套的 .data（例如序列化器方法里再序列化）只计最外层
+        if stats is None or stats.serializing:
+            return prop.fget(serializer)
+        stats.serializing = True
+        start = time.perf_counter()
+        try:
+            return prop.fget(serializer)
+        finally:
+            stats.serializer_seconds += time.perf_counter() - start
+            stats.serializing = False
+    return property(data)
+
+
+def instrument_serializers():
+    """
+    统计序列化耗时。所有接口的序列化都经过 Serializer.data / ListSerializer.data，
+    在这里计时就不用修改每个序列化器。
+    """
+    for serializer_class in (serializers.Serializer, serializers.ListSerializer):
+        prop = serializer_class.__dict__['data']
+        if not getattr(prop.fget, 'timed', False):
+            timed = timed_data(prop)
+            timed.fget.timed = True
+            serializer_class.data = timed
+
+
+def view_label(request):
+    # 未匹配路由（404）的地址不作为标签，避免标签数量无限增长
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else 'unmatched'
+
+
+def response_size(response):
+    if response.streaming:
+        length = response.get('Content-Length')
+        return int(length) if length else None
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    """
+    记录每个请求的耗时、查询数、SQL 耗时、序列化耗时和响应大小，
+    写入结构化日志（interviews.requests）和 /metrics 的直方图。
+    同时支持同步和异步调用，异步视图不会因为这个中间件被切换到线程中执行。
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # 与 Django 的 MiddlewareMixin 一样把自己标记为协程函数
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        stats = RequestStats(request)
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        self.record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats(request)
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        self.record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    def record(self, request, response, stats, elapsed):
+        view = view_label(request)
+        size = response_size(response)
+        labels = (view,)
+        REQUESTS.inc((view, request.method, str(response.status_code)))
+        REQUEST_SECONDS.observe(labels, elapsed)
+        DB_QUERIES.observe(labels, stats.queries)
+        SQL_SECONDS.observe(labels, stats.sql_seconds)
+        SERIALIZER_SECONDS.observe(labels, stats.serializer_seconds)
+        if size is not None:
+            RESPONSE_BYTES.observe(labels, size)
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        logger.info(json.dumps({
+            'view': view,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(elapsed * 1000, 1),
+            'db_queries': stats.queries,
+            'sql_ms': round(stats.sql_seconds * 1000, 1),
+            'serializer_ms': round(stats.serializer_seconds * 1000, 1),
+            'response_bytes': size,
+        }, ensure_ascii=False))
+
+
+def metrics_access_allowed(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_staff:
+        return True
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    if METRICS_TOKEN and authorization.startswith('Bearer '):
+        return hmac.compare_digest(authorization[len('Bearer '):].encode(), METRICS_TOKEN.encode())
+    return request.META.get('REMOTE_ADDR') in METRICS_ALLOWED_IPS
+
+
+def metrics_view(request):
+    """Prometheus 抓取地址。每个 worker 进程的统计各自独立，多进程部署时逐个进程抓取或按实例汇总"""
+    if not metrics_access_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0002_certificate_educationhistory_studentinfo'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['scheduled_time', 'id'], name='interview_time_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['interviewer', 'scheduled_time'], name='interview_interviewer_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['status', 'scheduled_time'], name='interview_status_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(condition=models.Q(('recording_uploaded', False), ('status', 'completed')), fields=['interviewer'], name='interview_need_recording_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:07
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def build_daily_stats(apps, schema_editor):
+    """按面试表生成初始日汇总（与 interviews.rollups.rebuild_daily_stats 相同，迁移中保留一份不随代码变化）"""
+    Interview = apps.get_model('interviews', 'Interview')
+    InterviewDailyStat = apps.get_model('interviews', 'InterviewDailyStat')
+    rows = Interview.objects.order_by().annotate(
+        day=TruncDate('scheduled_time')
+    ).values('day', 'interviewer_id').annotate(
+        total_count=Count('id'),
+        scheduled_count=Count('id', filter=Q(status='scheduled')),
+        in_progress_count=Count('id', filter=Q(status='in_progress')),
+        completed_count=Count('id', filter=Q(status='completed')),
+        cancelled_count=Count('id', filter=Q(status='cancelled')),
+        need_recording_count=Count('id', filter=Q(status='completed', recording_uploaded=False)),
+    )
+    InterviewDailyStat.objects.bulk_create([InterviewDailyStat(**row) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('interviews', '0003_interview_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterviewDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='日期')),
+                ('total_count', models.IntegerField(default=0, verbose_name='面试总数')),
+                ('scheduled_count', models.IntegerField(default=0, verbose_name='已安排')),
+                ('in_progress_count', models.IntegerField(default=0, verbose_name='面试中')),
+                ('completed_count', models.IntegerField(default=0, verbose_name='已完成')),
+                ('cancelled_count', models.IntegerField(default=0, verbose_name='已取消')),
+                ('need_recording_count', models.IntegerField(default=0, verbose_name='待上传录音')),
+                ('interviewer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='面试官')),
+            ],
+            options={
+                'verbose_name': '面试日统计',
+                'verbose_name_plural': '面试日统计',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='interviewdailystat',
+            index=models.Index(fields=['day'], name='interview_daily_stat_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='interviewdailystat',
+            constraint=models.UniqueConstraint(fields=('interviewer', 'day'), name='interview_daily_stat_unique'),
+        ),
+        migrations.RunPython(build_daily_stats, migrations.RunPython.noop),
+    ]
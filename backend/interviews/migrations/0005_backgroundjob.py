@@ -0,0 +1,45 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('interviews', '0004_interviewdailystat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('student_import', '学生导入'), ('student_export', '学生导出')], max_length=50, verbose_name='任务类型')),
+                ('status', models.CharField(choices=[('pending', '排队中'), ('running', '执行中'), ('succeeded', '已完成'), ('failed', '失败')], default='pending', max_length=20, verbose_name='状态')),
+                ('progress', models.PositiveSmallIntegerField(default=0, verbose_name='进度(%)')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='任务参数')),
+                ('input_file', models.FileField(blank=True, null=True, upload_to='job_files/input/%Y/%m/%d/', verbose_name='输入文件')),
+                ('result_file', models.FileField(blank=True, null=True, upload_to='job_files/result/%Y/%m/%d/', verbose_name='结果文件')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='执行结果')),
+                ('error', models.TextField(blank=True, verbose_name='错误信息')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='执行进程')),
+                ('created_time', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_time', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('started_time', models.DateTimeField(blank=True, null=True, verbose_name='开始时间')),
+                ('finished_time', models.DateTimeField(blank=True, null=True, verbose_name='结束时间')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='创建人')),
+            ],
+            options={
+                'verbose_name': '后台任务',
+                'verbose_name_plural': '后台任务',
+                'ordering': ['-created_time'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='backgroundjob',
+            index=models.Index(fields=['status', 'created_time'], name='background_job_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('interviews', '0005_backgroundjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecordingUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name='文件名')),
+                ('total_size', models.BigIntegerField(verbose_name='文件大小')),
+                ('received_size', models.BigIntegerField(default=0, verbose_name='已接收大小')),
+                ('checksum', models.CharField(blank=True, max_length=64, verbose_name='SHA-256 校验值')),
+                ('status', models.CharField(choices=[('uploading', '上传中'), ('completed', '已完成')], default='uploading', max_length=20, verbose_name='状态')),
+                ('created_time', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_time', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='上传人')),
+                ('interview', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recording_uploads', to='interviews.interview', verbose_name='面试')),
+            ],
+            options={
+                'verbose_name': '录音分片上传',
+                'verbose_name_plural': '录音分片上传',
+            },
+        ),
+    ]
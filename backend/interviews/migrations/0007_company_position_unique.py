@@ -0,0 +1,44 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:16
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicates(apps, schema_editor):
+    """加唯一约束前合并同名公司、同公司同名职位，关联数据指向保留的最早一条"""
+    Company = apps.get_model('interviews', 'Company')
+    JobPosition = apps.get_model('interviews', 'JobPosition')
+    Interview = apps.get_model('interviews', 'Interview')
+
+    duplicates = Company.objects.values('name').annotate(keep=Min('id'), n=Count('id')).filter(n__gt=1)
+    for row in duplicates:
+        others = Company.objects.filter(name=row['name']).exclude(id=row['keep'])
+        JobPosition.objects.filter(company__in=others).update(company_id=row['keep'])
+        Interview.objects.filter(company__in=others).update(company_id=row['keep'])
+        others.delete()
+
+    duplicates = JobPosition.objects.values('company', 'title').annotate(keep=Min('id'), n=Count('id')).filter(n__gt=1)
+    for row in duplicates:
+        others = JobPosition.objects.filter(company=row['company'], title=row['title']).exclude(id=row['keep'])
+        Interview.objects.filter(position__in=others).update(position_id=row['keep'])
+        others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0006_recordingupload'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='company',
+            name='name',
+            field=models.CharField(max_length=200, unique=True, verbose_name='公司名称'),
+        ),
+        migrations.AddConstraint(
+            model_name='jobposition',
+            constraint=models.UniqueConstraint(fields=('company', 'title'), name='jobposition_company_title_uniq'),
+        ),
+    ]
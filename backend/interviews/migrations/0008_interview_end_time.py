@@ -0,0 +1,37 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:20
+
+import datetime
+
+from django.db import migrations, models
+
+
+def fill_end_time(apps, schema_editor):
+    Interview = apps.get_model('interviews', 'Interview')
+    batch = []
+    for interview in Interview.objects.only('scheduled_time', 'duration').iterator(chunk_size=2000):
+        interview.end_time = interview.scheduled_time + datetime.timedelta(minutes=interview.duration)
+        batch.append(interview)
+        if len(batch) >= 2000:
+            Interview.objects.bulk_update(batch, ['end_time'])
+            batch = []
+    Interview.objects.bulk_update(batch, ['end_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0007_company_position_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interview',
+            name='end_time',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='结束时间'),
+        ),
+        migrations.RunPython(fill_end_time, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['interviewer', 'end_time'], name='interview_interviewer_end_idx'),
+        ),
+    ]
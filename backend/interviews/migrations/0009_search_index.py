@@ -0,0 +1,30 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from interviews.search import INTERVIEW_INDEX, STUDENT_INDEX
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for index in (STUDENT_INDEX, INTERVIEW_INDEX):
+        schema_editor.execute(index.create_sql())
+    STUDENT_INDEX.rebuild(apps.get_model('interviews', 'StudentInfo').objects.all())
+    INTERVIEW_INDEX.rebuild(apps.get_model('interviews', 'Interview').objects.all())
+
+
+def drop_search_index(apps, schema_editor):
+    from interviews.search import INTERVIEW_INDEX, STUDENT_INDEX
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for index in (STUDENT_INDEX, INTERVIEW_INDEX):
+        schema_editor.execute(index.drop_sql())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0008_interview_end_time'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
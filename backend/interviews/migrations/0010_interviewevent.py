@@ -0,0 +1,40 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:43
+
+from django.conf import settings
+from django.db import migrations, models
+import django.core.serializers.json
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('interviews', '0009_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InterviewEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('interview_id', models.BigIntegerField(verbose_name='面试ID')),
+                ('kind', models.CharField(choices=[('created', '新建'), ('status_changed', '状态变更'), ('result_changed', '结果变更'), ('recording_uploaded', '录音已上传'), ('deleted', '删除')], max_length=30, verbose_name='事件类型')),
+                ('data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='事件内容')),
+                ('created_time', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('interviewer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='面试官')),
+            ],
+            options={
+                'verbose_name': '面试事件',
+                'verbose_name_plural': '面试事件',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='interviewevent',
+            index=models.Index(fields=['interviewer', 'id'], name='interview_event_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interviewevent',
+            index=models.Index(fields=['created_time'], name='interview_event_time_idx'),
+        ),
+    ]
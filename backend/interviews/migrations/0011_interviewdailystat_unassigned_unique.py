@@ -0,0 +1,38 @@
+# Generated by Django 3.2.16 on 2026-10-18 23:10
+
+from django.db import migrations, models
+
+COUNTER_COLUMNS = (
+    'total_count', 'scheduled_count', 'in_progress_count', 'completed_count',
+    'cancelled_count', 'need_recording_count',
+)
+
+
+def merge_unassigned_duplicates(apps, schema_editor):
+    """并发创建可能留下同一天多条未分配面试官的行，加约束前合并"""
+    InterviewDailyStat = apps.get_model('interviews', 'InterviewDailyStat')
+    seen = {}
+    for row in InterviewDailyStat.objects.filter(interviewer__isnull=True).order_by('day', 'id'):
+        kept = seen.get(row.day)
+        if kept is None:
+            seen[row.day] = row
+            continue
+        for column in COUNTER_COLUMNS:
+            setattr(kept, column, getattr(kept, column) + getattr(row, column))
+        kept.save(update_fields=COUNTER_COLUMNS)
+        row.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interviews', '0010_interviewevent'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_unassigned_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='interviewdailystat',
+            constraint=models.UniqueConstraint(condition=models.Q(('interviewer__isnull', True)), fields=('day',), name='interview_daily_stat_unassigned_unique'),
+        ),
+    ]
@@ -1,11 +1,20 @@
 # 在文件顶部添加
 from .student_models import StudentInfo, EducationHistory, Certificate
+from .job_models import BackgroundJob
+import datetime
+import uuid
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+def interval_end(start, duration):
+    """面试结束时间，duration 单位为分钟"""
+    return start + datetime.timedelta(minutes=duration or 0)
+
 class Company(models.Model):
-    name = models.CharField(max_length=200, verbose_name="公司名称")
+    name = models.CharField(max_length=200, unique=True, verbose_name="公司名称")
     description = models.TextField(blank=True, verbose_name="公司描述")
     website = models.URLField(blank=True, verbose_name="官网")
     created_time = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
@@ -29,6 +38,9 @@ class JobPosition(models.Model):
     class Meta:
         verbose_name = "职位"
         verbose_name_plural = verbose_name
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'title'], name='jobposition_company_title_uniq'),
+        ]
 
     def __str__(self):
         return f"{self.company.name} - {self.title}"
@@ -93,6 +105,8 @@ class Interview(models.Model):
     interview_round = models.CharField(max_length=10, choices=INTERVIEW_ROUND_CHOICES, verbose_name="面试轮次")
     scheduled_time = models.DateTimeField(verbose_name="面试时间")
     duration = models.PositiveIntegerField(default=60, verbose_name="预计时长(分钟)")
+    # 由 scheduled_time + duration 计算，供时间冲突的区间查询使用
+    end_time = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="结束时间")
 
     # 面试官信息
     interviewer = models.ForeignKey(
@@ -133,10 +147,34 @@ class Interview(models.Model):
         verbose_name = "面试"
         verbose_name_plural = verbose_name
         ordering = ['-scheduled_time']
+        indexes = [
+            # 列表按 (scheduled_time, id) 排序与游标分页
+            models.Index(fields=['scheduled_time', 'id'], name='interview_time_id_idx'),
+            # 面试官只看自己的面试，并按时间过滤/排序
+            models.Index(fields=['interviewer', 'scheduled_time'], name='interview_interviewer_time_idx'),
+            # 面试官时间冲突检查：与 interviewer_time_idx 一起覆盖区间的两端
+            models.Index(fields=['interviewer', 'end_time'], name='interview_interviewer_end_idx'),
+            # 状态筛选与即将到来的面试
+            models.Index(fields=['status', 'scheduled_time'], name='interview_status_time_idx'),
+            # 已完成但未上传录音的面试（看板提醒）
+            models.Index(
+                fields=['interviewer'],
+                name='interview_need_recording_idx',
+                condition=models.Q(status='completed', recording_uploaded=False),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.candidate_name} - {self.company_name} - {self.position_title}"
 
+    def clean(self):
+        # 管理后台保存时检查面试官时间冲突
+        from .conflicts import conflict_message, find_conflict
+        if self.interviewer_id and self.scheduled_time and self.status != 'cancelled':
+            conflict = find_conflict(self.interviewer_id, self.scheduled_time, self.duration, exclude_pk=self.pk)
+            if conflict:
+                raise ValidationError({'scheduled_time': conflict_message(conflict)})
+
     def can_complete(self):
         """检查是否可以完成面试（必须上传录音）"""
         return self.status == 'completed' and self.recording_uploaded
@@ -148,32 +186,115 @@ class Interview(models.Model):
         else:
             self.recording_uploaded = False
 
+        if self.scheduled_time:
+            self.end_time = interval_end(self.scheduled_time, self.duration)
+
         # 如果状态变为已完成，记录完成时间
         if self.status == 'completed' and not self.completed_time:
             from django.utils import timezone
             self.completed_time = timezone.now()
 
-        # 自动关联公司和职位（可选）
+        # 自动关联公司和职位：名称解析走进程内缓存，命中时不查询数据库
+        from .resolvers import resolve_company_id, resolve_position_id
         if not self.company_id and self.company_name:
-            company, created = Company.objects.get_or_create(
-                name=self.company_name,
-                defaults={'description': f'{self.company_name} - 自动创建'}
-            )
-            self.company = company
-
-        if not self.position_id and self.position_title:
-            # 如果有关联公司，使用关联公司创建职位
-            company = self.company if self.company else None
-            if company:
-                position, created = JobPosition.objects.get_or_create(
-                    title=self.position_title,
-                    company=company,
-                    defaults={
-                        'description': self.position_description or f'{self.position_title} - 自动创建',
-                        'requirements': '暂无要求信息',
-                        'level': '未指定'
-                    }
-                )
-                self.position = position
+            self.company_id = resolve_company_id(self.company_name)
+
+        if not self.position_id and self.position_title and self.company_id:
+            self.position_id = resolve_position_id(self.company_id, self.position_title, self.position_description)
 
         super().save(*args, **kwargs)
+
+class InterviewDailyStat(models.Model):
+    """按天、按面试官汇总的面试数量，由信号增量维护，供日历和看板读取"""
+    day = models.DateField(verbose_name="日期")
+    interviewer = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="面试官",
+        null=True,
+        blank=True
+    )
+    total_count = models.IntegerField(default=0, verbose_name="面试总数")
+    scheduled_count = models.IntegerField(default=0, verbose_name="已安排")
+    in_progress_count = models.IntegerField(default=0, verbose_name="面试中")
+    completed_count = models.IntegerField(default=0, verbose_name="已完成")
+    cancelled_count = models.IntegerField(default=0, verbose_name="已取消")
+    need_recording_count = models.IntegerField(default=0, verbose_name="待上传录音")
+
+    class Meta:
+        verbose_name = "面试日统计"
+        verbose_name_plural = verbose_name
+        constraints = [
+            models.UniqueConstraint(fields=['interviewer', 'day'], name='interview_daily_stat_unique'),
+            # 上面的约束不限制 interviewer 为空的行（NULL 互不相等），未分配面试官的行单独约束
+            models.UniqueConstraint(
+                fields=['day'], condition=models.Q(interviewer__isnull=True),
+                name='interview_daily_stat_unassigned_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='interview_daily_stat_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} - {self.interviewer_id} - {self.total_count}"
+
+class InterviewEvent(models.Model):
+    """面试变更事件日志，自增 id 即 SSE 的事件 id，客户端断线后按 Last-Event-ID 续传"""
+    KIND_CHOICES = [
+        ('created', '新建'),
+        ('status_changed', '状态变更'),
+        ('result_changed', '结果变更'),
+        ('recording_uploaded', '录音已上传'),
+        ('deleted', '删除'),
+    ]
+
+    # 不使用外键：面试删除后事件仍需推送
+    interview_id = models.BigIntegerField(verbose_name="面试ID")
+    interviewer = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        verbose_name="面试官",
+        null=True,
+        blank=True
+    )
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES, verbose_name="事件类型")
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder, verbose_name="事件内容")
+    created_time = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
+
+    class Meta:
+        verbose_name = "面试事件"
+        verbose_name_plural = verbose_name
+        indexes = [
+            # 面试官只订阅自己的事件，按 id 续传
+            models.Index(fields=['interviewer', 'id'], name='interview_event_user_idx'),
+            models.Index(fields=['created_time'], name='interview_event_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.id} - {self.kind} - {self.interview_id}"
+
+class RecordingUpload(models.Model):
+    """分片上传中的面试录音，分片直接追加写入 MEDIA_ROOT 下的临时文件"""
+    STATUS_CHOICES = [
+        ('uploading', '上传中'),
+        ('completed', '已完成'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    interview = models.ForeignKey(Interview, on_delete=models.CASCADE, related_name='recording_uploads', verbose_name="面试")
+    filename = models.CharField(max_length=255, verbose_name="文件名")
+    total_size = models.BigIntegerField(verbose_name="文件大小")
+    received_size = models.BigIntegerField(default=0, verbose_name="已接收大小")
+    checksum = models.CharField(max_length=64, blank=True, verbose_name="SHA-256 校验值")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading', verbose_name="状态")
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="上传人")
+    created_time = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
+    updated_time = models.DateTimeField(auto_now=True, verbose_name="更新时间")
+
+    class Meta:
+        verbose_name = "录音分片上传"
+        verbose_name_plural = verbose_name
+
+    def __str__(self):
+        return f"{self.filename} ({self.received_size}/{self.total_size})"
@@ -0,0 +1,210 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class StandardPagination(PageNumberPagination):
+    """页码分页，count=false 时跳过 COUNT(*) 查询"""
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    count_query_param = 'count'
+
+    def include_count(self, request):
+        value = request.query_params.get(self.count_query_param, '')
+        return value.lower() not in ('false', '0', 'none', 'no')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.with_count = self.include_count(request)
+        if self.with_count:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+            if self.page_number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+
+        # 多取一行用来判断是否还有下一页，避免 COUNT(*)
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_next_page = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_next_link(self):
+        if self.with_count:
+            return super().get_next_link()
+        if not self.has_next_page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.with_count:
+            return super().get_previous_link()
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.page.paginator.count if self.with_count else None),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class KeysetPagination(BasePagination):
+    """
+    游标分页：按 (ordering_field, id) 定位，不使用 OFFSET 也不计算总数。
+    游标中记录上一页边界行的排序值和 id，翻页时转换为范围条件。
+    """
+    ordering_field = 'scheduled_time'
+    descending = True
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = '游标无效'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def encode_cursor(self, instance, reverse=False):
+        value = getattr(instance, self.ordering_field)
+        payload = {'v': value.isoformat(), 'i': instance.pk}
+        if reverse:
+            payload['r'] = 1
+        raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        cursor = base64.urlsafe_b64encode(raw).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            value = parse_datetime(payload['v'])
+            pk = int(payload['i'])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk, bool(payload.get('r'))
+
+    def get_ordering(self, reverse=False):
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        return (prefix + self.ordering_field, prefix + 'id')
+
+    def filter_after(self, queryset, value, pk, reverse=False):
+        # 先用 <= / >= 限定排序列的范围，保证可以走 (ordering_field, id) 索引
+        descending = self.descending != reverse
+        op = 'lt' if descending else 'gt'
+        field = self.ordering_field
+        queryset = queryset.filter(**{'%s__%se' % (field, op): value})
+        return queryset.filter(
+            Q(**{'%s__%s' % (field, op): value}) | Q(**{'id__%s' % op: pk})
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size_value = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor[2])
+
+        queryset = queryset.order_by(*self.get_ordering(reverse))
+        if cursor:
+            queryset = self.filter_after(queryset, cursor[0], cursor[1], reverse)
+
+        rows = list(queryset[:self.page_size_value + 1])
+        has_more = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        if reverse:
+            rows.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.page = rows
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class InterviewPagination(BasePagination):
+    """面试列表分页：默认页码模式，带 cursor 参数或 pagination=cursor 时切换为游标模式"""
+    mode_query_param = 'pagination'
+
+    def __init__(self):
+        self.page_number_paginator = StandardPagination()
+        self.keyset_paginator = KeysetPagination()
+        self.active = self.page_number_paginator
+
+    @property
+    def max_page_size(self):
+        return self.active.max_page_size
+
+    @max_page_size.setter
+    def max_page_size(self, value):
+        self.page_number_paginator.max_page_size = value
+        self.keyset_paginator.max_page_size = value
+
+    def use_keyset(self, request):
+        params = request.query_params
+        return (
+            self.keyset_paginator.cursor_query_param in params
+            or params.get(self.mode_query_param) == 'cursor'
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset(request):
+            self.active = self.keyset_paginator
+        else:
+            self.active = self.page_number_paginator
+        return self.active.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.active.get_paginated_response(data)
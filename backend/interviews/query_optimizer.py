@@ -0,0 +1,95 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+class QueryPlan:
+    """根据序列化器字段收集到的 select_related / prefetch_related / only 参数"""
+
+    def __init__(self):
+        self.select_related = set()
+        self.prefetch_related = set()
+        self.only = set()
+        # 序列化器读取了非数据库字段（方法、属性、source='*'）时不能裁剪列
+        self.restrict_columns = True
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*sorted(self.prefetch_related))
+        if self.restrict_columns and self.only:
+            queryset = queryset.only(*sorted(self.only))
+        return queryset
+
+
+def _is_single_relation(model_field):
+    return model_field.many_to_one or model_field.one_to_one
+
+
+def _collect(serializer, model, prefix, plan):
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            plan.restrict_columns = False
+            continue
+
+        bits = field.source.split('.')
+        current_model = model
+        path = list(prefix)
+
+        for index, bit in enumerate(bits):
+            try:
+                model_field = current_model._meta.get_field(bit)
+            except FieldDoesNotExist:
+                plan.restrict_columns = False
+                break
+
+            lookup = '__'.join(path + [bit])
+            is_last = index == len(bits) - 1
+
+            if not model_field.is_relation:
+                plan.only.add(lookup)
+                break
+
+            if not _is_single_relation(model_field):
+                # 反向外键/多对多只能通过 prefetch_related 批量加载，预取层级不再裁剪列
+                if isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)) or is_last:
+                    plan.prefetch_related.add(lookup)
+                else:
+                    plan.restrict_columns = False
+                break
+
+            if is_last and not isinstance(field, serializers.BaseSerializer):
+                # PrimaryKeyRelatedField 之类只需要外键列本身
+                plan.only.add(lookup)
+                break
+
+            plan.select_related.add(lookup)
+            plan.only.add(lookup)
+            path.append(bit)
+            current_model = model_field.related_model
+        else:
+            if isinstance(field, serializers.BaseSerializer) and not isinstance(field, serializers.ListSerializer):
+                _collect(field, current_model, path, plan)
+
+
+def build_query_plan(serializer):
+    """分析序列化器声明的字段来源，生成查询计划"""
+    if isinstance(serializer, type):
+        serializer = serializer()
+    plan = QueryPlan()
+    _collect(serializer, serializer.Meta.model, [], plan)
+    return plan
+
+
+def optimize_queryset(queryset, serializer, always=()):
+    """
+    按序列化器实际读取的字段为查询集加上 select_related / prefetch_related / only，
+    避免列表序列化时逐行访问关联对象造成的 N+1 查询。
+    传入按 ?fields= 裁剪过的序列化器实例时，只读取剩下的字段需要的列；
+    always 为序列化之外还会用到的列（例如游标分页的排序列）。
+    """
+    plan = build_query_plan(serializer)
+    plan.only.update(always)
+    return plan.apply(queryset)
@@ -0,0 +1,102 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.encoding import escape_uri_path
+
+RANGE_HEADER = re.compile(r'^bytes=(?P<start>\d*)-(?P<end>\d*)$')
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """
+    解析单个字节区间，返回闭区间 (start, end)；没有 Range 或格式不支持时返回 None（按完整文件返回）。
+    """
+    if not header:
+        return None
+    match = RANGE_HEADER.match(header.strip())
+    if not match or (not match.group('start') and not match.group('end')):
+        return None
+
+    if not match.group('start'):
+        # bytes=-500 表示最后 500 字节
+        length = int(match.group('end'))
+        if length == 0:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+
+    start = int(match.group('start'))
+    end = int(match.group('end')) if match.group('end') else size - 1
+    if start >= size or end < start:
+        raise RangeNotSatisfiable
+    return start, min(end, size - 1)
+
+
+def iter_file_range(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            block = file.read(min(STREAM_BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def content_type_for(name):
+    return mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+def serve_recording(request, recording):
+    """按配置的交付方式返回录音文件，调用前必须已经完成权限检查"""
+    # 交付方式 settings.RECORDING_SERVE_MODE：
+    #   'django'       由 Django 输出，完整请求走 FileResponse（服务器支持时使用 sendfile），Range 请求返回 206
+    #   'x-accel'      只做权限检查，交给 nginx 通过 X-Accel-Redirect 输出，Range 由 nginx 处理
+    #   'x-sendfile'   同上，适用于 Apache / lighttpd 的 X-Sendfile
+    mode = getattr(settings, 'RECORDING_SERVE_MODE', 'django')
+    name = recording.name
+    path = recording.path
+    content_type = content_type_for(name)
+    disposition = "inline; filename*=UTF-8''%s" % escape_uri_path(os.path.basename(name))
+
+    if mode == 'x-accel':
+        # RECORDING_ACCEL_PREFIX 是 nginx 中配置为 internal、指向 MEDIA_ROOT 的 location
+        prefix = getattr(settings, 'RECORDING_ACCEL_PREFIX', '/protected-media/')
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = escape_uri_path(prefix + name)
+        response['Content-Disposition'] = disposition
+        return response
+
+    if mode == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+        response['Content-Disposition'] = disposition
+        return response
+
+    size = os.path.getsize(path)
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size)
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            iter_file_range(path, start, end - start + 1), status=206, content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = disposition
+    return response
@@ -0,0 +1,146 @@
+import hashlib
+import os
+import re
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import RecordingUpload
+
+RECORDING_DIR = 'interview_recordings'
+STREAM_BLOCK_SIZE = 64 * 1024
+CONTENT_RANGE = re.compile(r'^bytes (?P<start>\d+)-(?P<end>\d+)/(?P<total>\d+|\*)$')
+
+
+class UploadError(Exception):
+    """分片上传协议错误，status 为返回给客户端的 HTTP 状态码"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def partial_path(upload):
+    return os.path.join(settings.MEDIA_ROOT, RECORDING_DIR, 'partial', f'{upload.pk}.part')
+
+
+def stored_size(upload):
+    path = partial_path(upload)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def parse_offset(request):
+    """分片起始位置：优先读取 Content-Range，其次是 offset 查询参数"""
+    content_range = request.headers.get('Content-Range')
+    if content_range:
+        match = CONTENT_RANGE.match(content_range.strip())
+        if not match:
+            raise UploadError('Content-Range 格式应为 bytes start-end/total')
+        return int(match.group('start'))
+    try:
+        return int(request.query_params.get('offset', 0))
+    except ValueError:
+        raise UploadError('offset 必须是整数')
+
+
+def write_chunk(upload, stream, offset):
+    """
+    把请求体按块追加到临时文件，不在内存中缓存整个分片。
+    offset 必须等于已接收的字节数；连接中断时已写入的部分保留，客户端可以从新的位置续传。
+    """
+    if upload.status != 'uploading':
+        raise UploadError('上传已完成', status=409)
+
+    received = stored_size(upload)
+    if offset != received:
+        raise UploadError(f'分片位置不连续，应从 {received} 开始', status=409)
+
+    path = partial_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    remaining = upload.total_size - received
+    try:
+        with open(path, 'ab') as output:
+            while True:
+                block = stream.read(STREAM_BLOCK_SIZE)
+                if not block:
+                    break
+                if len(block) > remaining:
+                    raise UploadError('上传内容超过声明的文件大小')
+                output.write(block)
+                remaining -= len(block)
+    finally:
+        upload.received_size = stored_size(upload)
+        upload.save(update_fields=['received_size', 'updated_time'])
+    return upload.received_size
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(STREAM_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def discard_partial(upload):
+    path = partial_path(upload)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def finalize_upload(upload, checksum=''):
+    """校验完整性后把临时文件移动到录音目录，并关联到面试"""
+    if upload.status != 'uploading':
+        raise UploadError('上传已完成', status=409)
+
+    received = stored_size(upload)
+    if received != upload.total_size:
+        raise UploadError(f'文件尚未上传完整: {received}/{upload.total_size}', status=409)
+
+    expected = (checksum or upload.checksum).lower()
+    if not expected:
+        raise UploadError('缺少 SHA-256 校验值')
+    path = partial_path(upload)
+    try:
+        matched = file_checksum(path) == expected
+    except FileNotFoundError:
+        # 并发的另一次 finalize 已经移走了临时文件
+        raise UploadError('临时文件不存在，上传可能已完成', status=404)
+    if not matched:
+        # 内容已损坏，清空后需要从头上传
+        discard_partial(upload)
+        upload.received_size = 0
+        upload.save(update_fields=['received_size', 'updated_time'])
+        raise UploadError('文件校验失败，请重新上传')
+
+    name = default_storage.get_available_name(os.path.join(
+        RECORDING_DIR, timezone.localdate().strftime('%Y/%m/%d'), default_storage.get_valid_name(upload.filename)
+    ))
+    final_path = default_storage.path(name)
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+
+    with transaction.atomic():
+        # 条件更新同时加上行锁：并发的 finalize 只有一个能把状态从 uploading 改掉，其余返回 409
+        claimed = RecordingUpload.objects.filter(pk=upload.pk, status='uploading').update(
+            checksum=expected, status='completed', updated_time=timezone.now()
+        )
+        if not claimed:
+            raise UploadError('上传已完成', status=409)
+
+        interview = upload.interview
+        interview.recording.name = name
+        # Interview.save() 会根据录音文件设置 recording_uploaded
+        interview.save()
+
+        # 最后移动文件：失败时事务回滚，上传仍是 uploading 状态
+        try:
+            os.replace(path, final_path)
+        except FileNotFoundError:
+            raise UploadError('临时文件不存在，上传可能已完成', status=404)
+
+    upload.checksum = expected
+    upload.status = 'completed'
+    return interview
@@ -0,0 +1,159 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from .caching import bump_namespace, increment
+from .models import Company, JobPosition
+
+# 每个进程缓存的名称 -> id 条目上限，超出后淘汰最久未使用的条目
+RESOLVER_CACHE_SIZE = getattr(settings, 'RESOLVER_CACHE_SIZE', 1024)
+# 批量解析时每条 IN 查询的参数个数
+RESOLVE_BATCH_SIZE = 500
+# 公司或职位变更时递增，其他进程读到新版本后清空本地缓存
+RESOLVER_VERSION_KEY = 'company_resolver:version'
+
+
+class LRUCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.data:
+                return None
+            self.data.move_to_end(key)
+            return self.data[key]
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+
+company_ids = LRUCache(RESOLVER_CACHE_SIZE)
+position_ids = LRUCache(RESOLVER_CACHE_SIZE)
+seen_version = None
+
+
+def check_version():
+    """其他进程修改过公司或职位时，丢弃本进程的缓存"""
+    global seen_version
+    version = cache.get(RESOLVER_VERSION_KEY, 0)
+    if version != seen_version:
+        company_ids.clear()
+        position_ids.clear()
+        seen_version = version
+
+
+def batches(items, size=RESOLVE_BATCH_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def cache_on_commit(lru, found):
+    def store():
+        for key, pk in found.items():
+            lru.set(key, pk)
+    transaction.on_commit(store)
+
+
+def upsert_id(model, lookup, defaults):
+    """按唯一键查 id，不存在时创建；并发创建撞上唯一约束时改为读取对方写入的行"""
+    pk = model.objects.filter(**lookup).values_list('pk', flat=True).first()
+    if pk is not None:
+        return pk
+    try:
+        with transaction.atomic():
+            return model.objects.create(**lookup, **defaults).pk
+    except IntegrityError:
+        return model.objects.filter(**lookup).values_list('pk', flat=True).get()
+
+
+def resolve_company_id(name):
+    check_version()
+    pk = company_ids.get(name)
+    if pk is None:
+        pk = upsert_id(Company, {'name': name}, {'description': f'{name} - 自动创建'})
+        # 事务回滚后新建的行不存在，提交后才写入缓存
+        cache_on_commit(company_ids, {name: pk})
+    return pk
+
+
+def resolve_position_id(company_id, title, description=''):
+    check_version()
+    key = (company_id, title)
+    pk = position_ids.get(key)
+    if pk is None:
+        pk = upsert_id(JobPosition, {'company_id': company_id, 'title': title}, {
+            'description': description or f'{title} - 自动创建',
+            'requirements': '暂无要求信息',
+            'level': '未指定',
+        })
+        cache_on_commit(position_ids, {key: pk})
+    return pk
+
+
+def resolve_company_ids(names):
+    """批量解析公司名称：未命中的名称一次查询、一次 bulk_create，返回 {名称: id}"""
+    check_version()
+    result = {name: company_ids.get(name) for name in set(names)}
+    missing = [name for name, pk in result.items() if pk is None]
+    found = {}
+    for chunk in batches(missing):
+        # 已存在的名称被唯一约束忽略，再查一次拿到所有 id
+        Company.objects.bulk_create(
+            [Company(name=name, description=f'{name} - 自动创建') for name in chunk], ignore_conflicts=True
+        )
+        found.update(Company.objects.filter(name__in=chunk).values_list('name', 'pk'))
+    if missing:
+        # bulk_create 不触发信号，公司列表的缓存需要手动失效
+        bump_namespace('company')
+    result.update(found)
+    cache_on_commit(company_ids, found)
+    return result
+
+
+def resolve_position_ids(positions):
+    """批量解析职位，positions 为 {(company_id, title): description}，返回 {(company_id, title): id}"""
+    check_version()
+    result = {key: position_ids.get(key) for key in positions}
+    missing = [key for key, pk in result.items() if pk is None]
+    found = {}
+    for chunk in batches(missing):
+        JobPosition.objects.bulk_create([
+            JobPosition(
+                company_id=company_id, title=title,
+                description=positions[company_id, title] or f'{title} - 自动创建',
+                requirements='暂无要求信息', level='未指定',
+            )
+            for company_id, title in chunk
+        ], ignore_conflicts=True)
+        wanted = set(chunk)
+        rows = JobPosition.objects.filter(
+            company_id__in={company_id for company_id, title in chunk},
+            title__in={title for company_id, title in chunk},
+        ).values_list('company_id', 'title', 'pk')
+        found.update(((company_id, title), pk) for company_id, title, pk in rows if (company_id, title) in wanted)
+    if missing:
+        bump_namespace('company')
+    result.update(found)
+    cache_on_commit(position_ids, found)
+    return result
+
+
+def invalidate_resolvers():
+    """公司或职位改名、删除后递增版本号，所有进程下次解析时清空本地缓存"""
+    # 版本号被淘汰后不会回到某个进程见过的旧值
+    increment(RESOLVER_VERSION_KEY)
@@ -0,0 +1,126 @@
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Interview, InterviewDailyStat
+
+# 汇总表需要的面试字段，顺序即 rollup 状态元组的顺序
+ROLLUP_FIELDS = ('scheduled_time', 'interviewer_id', 'status', 'recording_uploaded')
+
+STATUS_COLUMNS = {
+    'scheduled': 'scheduled_count',
+    'in_progress': 'in_progress_count',
+    'completed': 'completed_count',
+    'cancelled': 'cancelled_count',
+}
+
+
+def rollup_state(instance):
+    """面试在汇总表中的位置和计数；字段未加载（被 only/defer 延迟）时返回 None"""
+    if any(name not in instance.__dict__ for name in ROLLUP_FIELDS):
+        return None
+    return tuple(instance.__dict__[name] for name in ROLLUP_FIELDS)
+
+
+def stored_rollup_state(pk):
+    """从数据库读取面试保存前的状态"""
+    return Interview.objects.filter(pk=pk).values_list(*ROLLUP_FIELDS).first()
+
+
+COUNTER_COLUMNS = (
+    'total_count', 'scheduled_count', 'in_progress_count', 'completed_count',
+    'cancelled_count', 'need_recording_count',
+)
+
+
+def rollup_counters(state, sign):
+    scheduled_time, interviewer_id, status, recording_uploaded = state
+    counters = {'total_count': sign}
+    if status in STATUS_COLUMNS:
+        counters[STATUS_COLUMNS[status]] = sign
+    if status == 'completed' and not recording_uploaded:
+        counters['need_recording_count'] = sign
+    return counters
+
+
+def add_counters(day, interviewer_id, counters):
+    changes = {column: F(column) + value for column, value in counters.items()}
+    rows = InterviewDailyStat.objects.filter(day=day, interviewer_id=interviewer_id)
+    if rows.update(**changes) or counters['total_count'] < 0:
+        return
+    try:
+        with transaction.atomic():
+            InterviewDailyStat.objects.create(day=day, interviewer_id=interviewer_id, **counters)
+    except IntegrityError:
+        # 并发创建了同一行，改为累加
+        rows.update(**changes)
+
+
+def apply_rollup(state, sign):
+    """把一条面试的计数加到（sign=1）或从（sign=-1）对应的日汇总行"""
+    if state is None or state[0] is None:
+        return
+    day = timezone.localtime(state[0]).date()
+    add_counters(day, state[1], rollup_counters(state, sign))
+
+
+def apply_rollups(states):
+    """批量新建面试（bulk_create 不触发信号）后合并计数，每个日汇总行只更新一次"""
+    totals = defaultdict(Counter)
+    for state in states:
+        if state is None or state[0] is None:
+            continue
+        totals[timezone.localtime(state[0]).date(), state[1]].update(rollup_counters(state, 1))
+    for (day, interviewer_id), counters in totals.items():
+        add_counters(day, interviewer_id, dict(counters))
+
+
+def fold_interviewer_stats(interviewer_id):
+    """
+    删除用户前把其日汇总并入未分配面试官（interviewer 为空）的行。
+    面试的外键由删除时的批量 UPDATE 置空，不触发面试的信号，汇总只能在这里调整；
+    用户自己的汇总行随后被级联删除。
+    """
+    rows = InterviewDailyStat.objects.filter(interviewer_id=interviewer_id).values('day', *COUNTER_COLUMNS)
+    for row in rows:
+        day = row.pop('day')
+        if row['total_count']:
+            add_counters(day, None, row)
+
+
+def move_rollup(old_state, new_state):
+    if old_state == new_state:
+        return
+    apply_rollup(old_state, -1)
+    apply_rollup(new_state, 1)
+
+
+def rebuild_daily_stats():
+    """从面试表全量重建日汇总表（数据修复时使用）"""
+    status_counters = {
+        column: Count('id', filter=Q(status=status))
+        for status, column in STATUS_COLUMNS.items()
+    }
+    rows = Interview.objects.order_by().annotate(
+        day=TruncDate('scheduled_time')
+    ).values('day', 'interviewer_id').annotate(
+        total_count=Count('id'),
+        need_recording_count=Count('id', filter=Q(status='completed', recording_uploaded=False)),
+        **status_counters
+    )
+
+    stats = [InterviewDailyStat(**row) for row in rows]
+    with transaction.atomic():
+        InterviewDailyStat.objects.all().delete()
+        InterviewDailyStat.objects.bulk_create(stats, batch_size=1000)
+    return len(stats)
+
+
+def user_daily_stats(user):
+    """与 user_interviews 相同的权限范围"""
+    if user.is_staff:
+        return InterviewDailyStat.objects.all()
+    return InterviewDailyStat.objects.filter(interviewer=user)
@@ -0,0 +1,171 @@
+import re
+
+from django.db import connection
+
+# 按非文字字符切分（与 FTS5 unicode61 分词器一致，下划线也是分隔符），每段再切成二元组
+WORD_RUN = re.compile(r'[^\W_]+')
+SEARCH_BATCH_SIZE = 1000
+
+
+def ngram_tokens(text):
+    """
+    把文本切成连续的二元组，每段末尾再补上最后一个字，保证每个字都是某个词元的开头：
+    '张三丰' -> '张三 三丰 丰'。中文不需要分词，电话、身份证也能按任意片段匹配。
+    """
+    tokens = []
+    for run in WORD_RUN.findall(str(text or '').lower()):
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        tokens.append(run[-1])
+    return ' '.join(tokens)
+
+
+def match_expression(query):
+    """
+    把搜索词转换为 FTS5 查询：每个词转换成二元组短语（要求位置连续，等价于子串匹配），
+    单个字用前缀查询，多个词之间是 AND。没有可搜索的内容时返回 None。
+    """
+    terms = []
+    for run in WORD_RUN.findall(str(query or '').lower()):
+        if len(run) == 1:
+            terms.append(f'"{run}"*')
+        else:
+            terms.append('"%s"' % ' '.join(run[i:i + 2] for i in range(len(run) - 1)))
+    return ' AND '.join(terms) or None
+
+
+def search_page(params, default_limit=20, max_limit=100):
+    """搜索接口的 limit/offset 参数"""
+    try:
+        limit = min(max(int(params.get('limit', default_limit)), 1), max_limit)
+        offset = max(int(params.get('offset', 0)), 0)
+    except ValueError:
+        limit, offset = default_limit, 0
+    return limit, offset
+
+
+def search_available():
+    """FTS5 索引表只在 SQLite 上创建，其他数据库退回到 LIKE 查询"""
+    return connection.vendor == 'sqlite'
+
+
+class SearchIndex:
+    """
+    一张 FTS5 表，rowid 等于模型主键。fields 是需要分词的 {列名: 查询字段}（顺序即 bm25 权重的顺序），
+    filters 是只用于过滤、不参与匹配的列（例如面试官，用来在索引内做权限过滤）。
+    """
+
+    def __init__(self, table, fields, weights, filters=None):
+        self.table = table
+        self.fields = fields
+        self.weights = weights
+        self.filters = filters or {}
+
+    def create_sql(self):
+        columns = list(self.fields) + [f'{name} UNINDEXED' for name in self.filters]
+        return f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5({', '.join(columns)}, tokenize='unicode61')"
+
+    def drop_sql(self):
+        return f'DROP TABLE IF EXISTS {self.table}'
+
+    def value_fields(self):
+        return ['pk', *self.fields.values(), *self.filters.values()]
+
+    def write_rows(self, rows):
+        """rows 为 (pk, *fields, *filters) 元组，已有的行先删除再写入"""
+        rows = [
+            (row[0], *[ngram_tokens(value) for value in row[1:len(self.fields) + 1]], *row[len(self.fields) + 1:])
+            for row in rows
+        ]
+        if not rows:
+            return
+        columns = ['rowid', *self.fields, *self.filters]
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(
+                f"INSERT INTO {self.table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})",
+                rows
+            )
+
+    def index_instance(self, instance):
+        # 关联字段（公司名称等）从数据库读取，与批量重建的结果一致
+        self.index_queryset(type(instance)._default_manager.filter(pk=instance.pk))
+
+    def index_queryset(self, queryset):
+        """按查询集重建这些对象的索引，只读取需要的列"""
+        if not search_available():
+            return 0
+        count = 0
+        batch = []
+        for row in queryset.order_by().values_list(*self.value_fields()).iterator(chunk_size=SEARCH_BATCH_SIZE):
+            batch.append(row)
+            if len(batch) >= SEARCH_BATCH_SIZE:
+                self.write_rows(batch)
+                count += len(batch)
+                batch = []
+        self.write_rows(batch)
+        return count + len(batch)
+
+    def remove(self, pk):
+        if search_available():
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [pk])
+
+    def rebuild(self, queryset):
+        if not search_available():
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+        return self.index_queryset(queryset)
+
+    def where(self, match, filters):
+        sql = f'{self.table} MATCH %s'
+        params = [match]
+        for name, value in filters.items():
+            if value is not None:
+                sql += f' AND {name} = %s'
+                params.append(value)
+        return sql, params
+
+    def matching_ids_sql(self, match, **filters):
+        """子查询形式，供 pk__in=RawSQL(...) 在原查询集上过滤"""
+        sql, params = self.where(match, filters)
+        return f'SELECT rowid FROM {self.table} WHERE {sql}', params
+
+    def ranked_ids(self, match, limit, offset=0, **filters):
+        """按 bm25 相关度排序的主键（bm25 越小越相关）"""
+        sql, params = self.where(match, filters)
+        weights = ', '.join(str(weight) for weight in self.weights)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {self.table} WHERE {sql} '
+                f'ORDER BY bm25({self.table}, {weights}) LIMIT %s OFFSET %s',
+                params + [limit, offset]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def count(self, match, **filters):
+        sql, params = self.where(match, filters)
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {self.table} WHERE {sql}', params)
+            return cursor.fetchone()[0]
+
+
+STUDENT_INDEX = SearchIndex(
+    'student_search',
+    fields={'name': 'name', 'id_card': 'id_card', 'phone': 'phone', 'school_name': 'school_name'},
+    weights=(10.0, 5.0, 5.0, 1.0),
+)
+
+# 公司和职位按关联对象的名称索引，与接口返回的 company_name/position_title 一致
+INTERVIEW_INDEX = SearchIndex(
+    'interview_search',
+    fields={
+        'candidate_name': 'candidate_name',
+        'candidate_phone': 'candidate_phone',
+        'candidate_email': 'candidate_email',
+        'company_name': 'company__name',
+        'position_title': 'position__title',
+    },
+    weights=(10.0, 5.0, 3.0, 2.0, 2.0),
+    filters={'interviewer_id': 'interviewer_id'},
+)
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from .models import Company, JobPosition, Interview
+from .conflicts import conflict_message, find_conflict, interview_duration
 from django.contrib.auth.models import User
+from .sparse_fields import SparseFieldsMixin
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -19,7 +21,7 @@ class JobPositionSerializer(serializers.ModelSerializer):
         model = JobPosition
         fields = '__all__'
 
-class InterviewSerializer(serializers.ModelSerializer):
+class InterviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     company_name = serializers.CharField(source='company.name', read_only=True)
     position_title = serializers.CharField(source='position.title', read_only=True)
     position_description = serializers.CharField(source='position.description', read_only=True)
@@ -44,7 +46,7 @@ class InterviewSerializer(serializers.ModelSerializer):
         return data
 
 class InterviewCreateSerializer(serializers.ModelSerializer):
-    # 新增文本字段（前端直接发送文本而不是外键ID）
+    # 新增文本字段（前端直接发送文本而不是外键ID），保存时由 Interview.save() 关联公司和职位
     company_name = serializers.CharField(write_only=True, max_length=200)
     position_title = serializers.CharField(write_only=True, max_length=200)
     position_description = serializers.CharField(write_only=True, required=False, allow_blank=True)
@@ -55,50 +57,21 @@ class InterviewCreateSerializer(serializers.ModelSerializer):
             'candidate_name', 'candidate_phone', 'candidate_email',
             'company_name', 'position_title', 'position_description',  # 新增文本字段
             'interview_method', 'interview_round', 'scheduled_time',
-            'duration', 'interviewer_notes'
+            'duration', 'interviewer', 'interviewer_notes'
         ]
         extra_kwargs = {
             'interviewer': {'required': False}  # 设为可选
         }
 
-    def create(self, validated_data):
-        # 提取文本字段
-        company_name = validated_data.pop('company_name')
-        position_title = validated_data.pop('position_title')
-        position_description = validated_data.pop('position_description', '')
-
-        # 创建或获取公司
-        company, created = Company.objects.get_or_create(
-            name=company_name,
-            defaults={
-                'description': f'{company_name} - 自动创建',
-                'website': ''
-            }
-        )
-
-        # 创建或获取职位
-        position, created = JobPosition.objects.get_or_create(
-            title=position_title,
-            company=company,
-            defaults={
-                'description': position_description or f'{position_title} - 自动创建',
-                'requirements': '暂无要求信息',
-                'level': '未指定',
-                'salary_range': ''
-            }
-        )
-
-        # 设置外键关系
-        validated_data['company'] = company
-        validated_data['position'] = position
-
-        # 设置默认面试官（如果需要）
-        if 'interviewer' not in validated_data:
-            # 这里可以设置一个默认面试官，或者保持为null（如果模型允许）
-            # 例如：validated_data['interviewer'] = User.objects.first()
-            pass
-
-        return super().create(validated_data)
+    # 批量安排时改为整批一次检查
+    check_conflicts = True
+
+    def validate_interviewer(self, value):
+        # 与批量安排相同：普通用户只能为自己安排面试（批量安排没有 request，由 validate_items 检查）
+        request = self.context.get('request')
+        if value is not None and request is not None and not request.user.is_staff and value != request.user:
+            raise serializers.ValidationError('只能为自己安排面试')
+        return value
 
     def validate(self, data):
         # 验证面试时间不能是过去的时间
@@ -106,8 +79,19 @@ class InterviewCreateSerializer(serializers.ModelSerializer):
             from django.utils import timezone
             if data['scheduled_time'] < timezone.now():
                 raise serializers.ValidationError("面试时间不能是过去的时间")
+
+        # 面试官同一时间只能安排一场面试
+        if self.check_conflicts and data.get('interviewer'):
+            conflict = find_conflict(data['interviewer'].pk, data['scheduled_time'], interview_duration(data))
+            if conflict:
+                raise serializers.ValidationError(conflict_message(conflict))
         return data
 
+class InterviewBulkItemSerializer(InterviewCreateSerializer):
+    # 批量安排时面试官用 id 表示，由批量逻辑一次性校验，避免每条查询一次用户表
+    interviewer = serializers.IntegerField(required=False, allow_null=True)
+    check_conflicts = False
+
 class InterviewUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Interview
@@ -120,4 +104,11 @@ class InterviewUpdateSerializer(serializers.ModelSerializer):
         if 'status' in data and data['status'] == 'completed':
             if not self.instance.recording_uploaded and 'recording' not in data:
                 raise serializers.ValidationError("完成面试前必须上传录音")
+
+        # 恢复已取消的面试时，原时段可能已经安排了别的面试
+        instance = self.instance
+        if instance.status == 'cancelled' and data.get('status', 'cancelled') != 'cancelled' and instance.interviewer_id:
+            conflict = find_conflict(instance.interviewer_id, instance.scheduled_time, instance.duration, exclude_pk=instance.pk)
+            if conflict:
+                raise serializers.ValidationError(conflict_message(conflict))
         return data
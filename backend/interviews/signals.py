@@ -0,0 +1,148 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import bump_namespace
+from .events import EVENT_FIELDS, changed_kinds, event_state, record_events
+from .models import Company, Interview, JobPosition
+from .resolvers import invalidate_resolvers
+from .search import INTERVIEW_INDEX, STUDENT_INDEX
+from .student_models import Certificate, EducationHistory, StudentInfo
+from .rollups import apply_rollup, fold_interviewer_stats, move_rollup, rollup_state, stored_rollup_state
+
+
+@receiver(post_init, sender=Interview)
+def remember_rollup_state(sender, instance, **kwargs):
+    """记录从数据库加载时的状态，保存时据此调整日汇总"""
+    if instance.pk is not None:
+        instance._rollup_state = rollup_state(instance)
+
+
+@receiver(pre_save, sender=Interview)
+def load_rollup_state(sender, instance, **kwargs):
+    # 新建的面试没有旧状态；字段被延迟加载时从数据库补读
+    if instance.pk is None:
+        instance._rollup_state = None
+    elif getattr(instance, '_rollup_state', None) is None:
+        instance._rollup_state = stored_rollup_state(instance.pk)
+
+
+@receiver(post_save, sender=Interview)
+def update_rollup_on_save(sender, instance, **kwargs):
+    new_state = rollup_state(instance) or stored_rollup_state(instance.pk)
+    move_rollup(instance._rollup_state, new_state)
+    instance._rollup_state = new_state
+
+
+@receiver(post_delete, sender=Interview)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    apply_rollup(getattr(instance, '_rollup_state', None) or rollup_state(instance), -1)
+
+
+@receiver(pre_delete, sender=User)
+def fold_deleted_interviewer_rollup(sender, instance, **kwargs):
+    fold_interviewer_stats(instance.pk)
+
+
+@receiver(post_init, sender=Interview)
+def remember_event_state(sender, instance, **kwargs):
+    if instance.pk is not None:
+        instance._event_state = event_state(instance)
+
+
+@receiver(pre_save, sender=Interview)
+def load_event_state(sender, instance, **kwargs):
+    if instance.pk is None:
+        instance._event_state = None
+    elif getattr(instance, '_event_state', None) is None:
+        instance._event_state = Interview.objects.filter(pk=instance.pk).values_list(*EVENT_FIELDS).first()
+
+
+@receiver(post_save, sender=Interview)
+def record_interview_events(sender, instance, created, **kwargs):
+    """新建、状态或结果变化、录音上传时写入事件日志，供 SSE 推送"""
+    new_state = event_state(instance) or Interview.objects.filter(pk=instance.pk).values_list(*EVENT_FIELDS).first()
+    if created:
+        record_events(instance, ['created'])
+    elif instance._event_state is not None:
+        record_events(instance, changed_kinds(instance._event_state, new_state))
+    instance._event_state = new_state
+
+
+@receiver(post_delete, sender=Interview)
+def record_interview_deleted(sender, instance, **kwargs):
+    record_events(instance, ['deleted'])
+
+
+@receiver(post_save, sender=Interview)
+@receiver(post_delete, sender=Interview)
+def interview_changed(sender, instance, **kwargs):
+    """面试数据变更后让面试相关的接口缓存（看板、日历、即将到来的面试）失效"""
+    bump_namespace('interview')
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_save, sender=JobPosition)
+@receiver(post_delete, sender=Company)
+@receiver(post_delete, sender=JobPosition)
+def company_changed(sender, instance, created=False, **kwargs):
+    """
+    新建不会让已缓存的名称失效，只有改名和删除需要清空解析缓存；
+    面试的返回内容包含公司名称和职位名称，改名和删除时面试缓存也要失效
+    """
+    if created:
+        bump_namespace('company')
+    else:
+        invalidate_resolvers()
+        bump_namespace('company', 'interview')
+
+
+@receiver(post_save, sender=Interview)
+def index_interview(sender, instance, **kwargs):
+    INTERVIEW_INDEX.index_instance(instance)
+
+
+@receiver(post_save, sender=StudentInfo)
+def index_student(sender, instance, **kwargs):
+    STUDENT_INDEX.index_instance(instance)
+
+
+@receiver(post_delete, sender=Interview)
+def unindex_interview(sender, instance, **kwargs):
+    INTERVIEW_INDEX.remove(instance.pk)
+
+
+@receiver(post_delete, sender=StudentInfo)
+def unindex_student(sender, instance, **kwargs):
+    STUDENT_INDEX.remove(instance.pk)
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_save, sender=JobPosition)
+def reindex_company_interviews(sender, instance, created=False, **kwargs):
+    """公司或职位改名后，关联面试的索引内容随之更新，并刷新 updated_time 让 ETag 失效"""
+    if not created:
+        field = 'company' if sender is Company else 'position'
+        interviews = Interview.objects.filter(**{field: instance})
+        interviews.update(updated_time=timezone.now())
+        INTERVIEW_INDEX.index_queryset(interviews)
+
+
+@receiver(post_save, sender=EducationHistory)
+@receiver(post_save, sender=Certificate)
+@receiver(post_delete, sender=EducationHistory)
+@receiver(post_delete, sender=Certificate)
+def touch_student(sender, instance, **kwargs):
+    """学生详情包含教育经历和证书，它们变化时刷新学生的 updated_time，让条件请求的校验值随之变化"""
+    StudentInfo.objects.filter(pk=instance.student_id).update(updated_time=timezone.now())
+
+
+@receiver(post_save, sender=StudentInfo)
+@receiver(post_delete, sender=StudentInfo)
+@receiver(post_save, sender=EducationHistory)
+@receiver(post_save, sender=Certificate)
+@receiver(post_delete, sender=EducationHistory)
+@receiver(post_delete, sender=Certificate)
+def student_changed(sender, instance, **kwargs):
+    bump_namespace('student')
@@ -0,0 +1,39 @@
+from rest_framework import serializers
+
+FIELDS_QUERY_PARAM = 'fields'
+EXCLUDE_QUERY_PARAM = 'exclude'
+
+
+def parse_field_names(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+class SparseFieldsMixin:
+    """
+    按请求参数裁剪返回字段：?fields=a,b 只返回这些字段，?exclude=a,b 去掉这些字段。
+    只对 GET 请求的顶层序列化器生效（嵌套的序列化器没有 request，不受影响）。
+    视图把裁剪后的序列化器交给 optimize_queryset，SQL 也只读取剩下的列。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return
+        params = getattr(request, 'query_params', request.GET)
+        only = parse_field_names(params.get(FIELDS_QUERY_PARAM))
+        exclude = parse_field_names(params.get(EXCLUDE_QUERY_PARAM))
+        if not only and not exclude:
+            return
+
+        available = list(self.fields)
+        unknown = [name for name in only + exclude if name not in self.fields]
+        if unknown:
+            raise serializers.ValidationError({
+                FIELDS_QUERY_PARAM if unknown[0] in only else EXCLUDE_QUERY_PARAM:
+                    f'未知字段：{", ".join(unknown)}。可选字段：{", ".join(available)}'
+            })
+        keep = set(only or available) - set(exclude)
+        for name in available:
+            if name not in keep:
+                self.fields.pop(name)
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+
+from .date_windows import filter_day_bounds, today, week_bounds
+from .models import Interview
+from .rollups import STATUS_COLUMNS, user_daily_stats
+
+# 看板轮询频繁，短时间缓存即可挡住绝大多数请求
+DASHBOARD_STATS_CACHE_TTL = getattr(settings, 'DASHBOARD_STATS_CACHE_TTL', 10)
+
+
+def user_interviews(user):
+    """管理员看全部面试，面试官只看自己的面试"""
+    if user.is_staff:
+        return Interview.objects.all()
+    return Interview.objects.filter(interviewer=user)
+
+
+def compute_dashboard_stats(user):
+    """从日汇总表用一次条件聚合查询算出看板的全部计数"""
+    current_day = today()
+    week_start, week_end = week_bounds(current_day)
+
+    def total(column, condition=None):
+        return Coalesce(Sum(column, filter=condition), 0)
+
+    status_counters = {
+        f'status_{status}': total(column)
+        for status, column in STATUS_COLUMNS.items()
+    }
+    counts = user_daily_stats(user).aggregate(
+        total_count=total('total_count'),
+        today_count=total('total_count', Q(day=current_day)),
+        week_count=total('total_count', Q(day__gte=week_start, day__lt=week_end)),
+        need_recording=total('need_recording_count'),
+        **status_counters
+    )
+
+    status_stats = [
+        {'status': value, 'count': counts[f'status_{value}']}
+        for value, label in Interview.INTERVIEW_STATUS_CHOICES
+        if counts[f'status_{value}']
+    ]
+
+    return {
+        'today_count': counts['today_count'],
+        'week_count': counts['week_count'],
+        'status_stats': status_stats,
+        'need_recording': counts['need_recording'],
+        'total_count': counts['total_count'],
+    }
+
+
+def calendar_data(user, month_bounds=None):
+    """按天汇总的日历数据，直接读取日汇总表"""
+    rows = user_daily_stats(user)
+    if month_bounds:
+        rows = filter_day_bounds(rows, 'day', month_bounds)
+    return rows.values('day').annotate(
+        count=Sum('total_count'),
+        completed=Sum('completed_count'),
+        scheduled=Sum('scheduled_count'),
+    ).filter(count__gt=0).order_by('day')
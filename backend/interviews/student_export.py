@@ -0,0 +1,106 @@
+import codecs
+import csv
+import tempfile
+
+from django.utils import timezone
+from openpyxl import Workbook
+
+from .student_models import StudentInfo
+
+# (表头, 字段)；带 choices 的字段导出中文名称
+EXPORT_COLUMNS = [
+    ('学生姓名', 'name'),
+    ('身份证', 'id_card'),
+    ('学生电话', 'phone'),
+    ('父亲电话', 'father_phone'),
+    ('母亲电话', 'mother_phone'),
+    ('家庭住址', 'home_address'),
+    ('当前学历', 'education_level'),
+    ('毕业日期', 'graduation_date'),
+    ('毕业院校', 'school_name'),
+    ('专业', 'major'),
+    ('在读状态', 'education_status'),
+    ('项目经理', 'project_manager'),
+    ('就业指导', 'employment_guide'),
+    ('所属市场部', 'marketing_department'),
+    ('所持证书', 'certificates'),
+    ('创建时间', 'created_time'),
+    ('更新时间', 'updated_time'),
+]
+
+EXPORT_CHUNK_SIZE = 2000
+# xlsx 是 zip 容器，目录写在文件末尾，只能整本生成后再发送，无法边查边输出；
+# 超过该行数的同步 xlsx 导出改为后台任务，避免请求长时间没有响应
+XLSX_SYNC_MAX_ROWS = 5000
+
+CHOICE_LABELS = {
+    'education_level': dict(StudentInfo.EDUCATION_LEVEL_CHOICES),
+    'education_status': dict(StudentInfo.STATUS_CHOICES),
+}
+DATETIME_FIELDS = {'created_time', 'updated_time'}
+
+
+def export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    """
+    逐批从数据库读取元组并转换为导出值，不实例化模型对象。
+    传入 progress(done, total) 时先统计总数，每批回调一次。
+    """
+    fields = [field for header, field in EXPORT_COLUMNS]
+    converters = []
+    for field in fields:
+        if field in CHOICE_LABELS:
+            labels = CHOICE_LABELS[field]
+            converters.append(lambda value, labels=labels: labels.get(value, value))
+        elif field in DATETIME_FIELDS:
+            # Excel 不支持带时区的时间，转换为本地时间
+            converters.append(lambda value: timezone.localtime(value).replace(tzinfo=None) if value else value)
+        else:
+            converters.append(None)
+
+    total = queryset.count() if progress else None
+    for done, row in enumerate(queryset.values_list(*fields).iterator(chunk_size=chunk_size), 1):
+        yield [convert(value) if convert else value for convert, value in zip(converters, row)]
+        if progress and done % chunk_size == 0:
+            progress(done, total)
+    if progress:
+        progress(total, total)
+
+
+class Echo:
+    """csv.writer 写入后直接返回内容，配合 StreamingHttpResponse 逐行输出"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset, progress=None):
+    writer = csv.writer(Echo())
+    # 带 BOM，Excel 打开中文不乱码
+    yield codecs.BOM_UTF8.decode('utf-8') + writer.writerow([header for header, field in EXPORT_COLUMNS])
+    for row in export_rows(queryset, progress=progress):
+        yield writer.writerow(row)
+
+
+def write_csv(queryset, progress=None):
+    output = tempfile.TemporaryFile()
+    for line in stream_csv(queryset, progress):
+        output.write(line.encode('utf-8'))
+    output.seek(0)
+    return output
+
+
+def write_xlsx(queryset, progress=None):
+    """
+    只写模式生成 xlsx，行数据落在临时文件里，内存占用不随行数增长。
+    整本写完才能发送第一个字节，需要流式输出时用 stream_csv。
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('学生信息')
+    sheet.append([header for header, field in EXPORT_COLUMNS])
+    for row in export_rows(queryset, progress=progress):
+        sheet.append(row)
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
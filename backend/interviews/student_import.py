@@ -0,0 +1,172 @@
+import datetime
+
+import pandas as pd
+from django.db import transaction
+from django.utils import timezone
+
+from .caching import bump_namespace
+from .search import STUDENT_INDEX
+from .student_models import StudentInfo
+
+# Excel 表头 -> 模型字段
+IMPORT_COLUMNS = {
+    '学生姓名': 'name',
+    '身份证': 'id_card',
+    '学生电话': 'phone',
+    '父亲电话': 'father_phone',
+    '母亲电话': 'mother_phone',
+    '家庭住址': 'home_address',
+    '当前学历': 'education_level',
+    '毕业日期': 'graduation_date',
+    '毕业院校': 'school_name',
+    '专业': 'major',
+    '项目经理': 'project_manager',
+    '就业指导': 'employment_guide',
+    '所属市场部': 'marketing_department',
+    '所持证书': 'certificates',
+}
+
+ID_CARD_PATTERN = r'^\d{17}[\dXx]$'
+PHONE_PATTERN = r'^1[3-9]\d{9}$'
+IMPORT_CHUNK_SIZE = 1000
+# 毕业日期可以是 Excel 日期单元格（按文本读出来带时间部分），也可以是手填的文本
+DATE_FORMATS = ('%Y-%m-%d', '%Y/%m/%d', '%Y.%m.%d', '%Y%m%d')
+
+# 有长度限制的列：表头 -> 最大长度。超长的值在 PostgreSQL 上会让整个导入事务失败，要先逐行报错
+MAX_LENGTHS = {
+    header: StudentInfo._meta.get_field(field).max_length
+    for header, field in IMPORT_COLUMNS.items()
+    if getattr(StudentInfo._meta.get_field(field), 'max_length', None)
+}
+
+# 学历既可以填编码也可以填中文名称
+EDUCATION_LEVELS = {label: value for value, label in StudentInfo.EDUCATION_LEVEL_CHOICES}
+EDUCATION_LEVELS.update({value: value for value, label in StudentInfo.EDUCATION_LEVEL_CHOICES})
+
+
+def read_student_file(file):
+    """按文本读取所有单元格，避免电话、身份证被当成数字"""
+    return pd.read_excel(file, dtype=str)
+
+
+def text_column(df, column):
+    """取出文本列，缺失列和空单元格都视为空字符串"""
+    if column not in df:
+        return pd.Series('', index=df.index, dtype=object)
+    values = df[column]
+    return values.astype(str).str.strip().where(values.notna(), '')
+
+
+def parse_date(value):
+    """逐个单元格解析日期，不依赖 pandas 对整列格式的推断；无法解析时返回 None"""
+    if not isinstance(value, str):
+        return None
+    text = value.strip().split(' ')[0].split('T')[0]
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def normalize(df):
+    """把 Excel 表格整列转换为模型字段值"""
+    data = pd.DataFrame(index=df.index)
+    for header, field in IMPORT_COLUMNS.items():
+        if field == 'graduation_date':
+            continue
+        data[field] = text_column(df, header)
+
+    data['id_card'] = data['id_card'].str.upper()
+    data['education_level'] = data['education_level'].map(EDUCATION_LEVELS)
+
+    if '毕业日期' in df:
+        data['graduation_date'] = df['毕业日期'].map(parse_date).astype(object)
+    else:
+        data['graduation_date'] = datetime.date.today()
+    return data
+
+
+def validate(data):
+    """整列校验，返回 {行号: [错误信息]}"""
+    checks = [
+        (data['name'] == '', '学生姓名不能为空'),
+        (~data['id_card'].str.match(ID_CARD_PATTERN), '身份证号码格式不正确'),
+        (~data['phone'].str.match(PHONE_PATTERN), '学生电话格式不正确'),
+        ((data['father_phone'] != '') & ~data['father_phone'].str.match(PHONE_PATTERN), '父亲电话格式不正确'),
+        ((data['mother_phone'] != '') & ~data['mother_phone'].str.match(PHONE_PATTERN), '母亲电话格式不正确'),
+        (data['education_level'].isna(), '当前学历不在可选范围内'),
+        (data['graduation_date'].isna(), '毕业日期格式不正确'),
+    ]
+    for header, max_length in MAX_LENGTHS.items():
+        field = IMPORT_COLUMNS[header]
+        checks.append((data[field].str.len().gt(max_length), f'{header}不能超过{max_length}个字符'))
+    errors = {}
+    for mask, message in checks:
+        for index in data.index[mask.fillna(True).astype(bool)]:
+            errors.setdefault(index, []).append(message)
+    return errors
+
+
+def import_students(df, chunk_size=IMPORT_CHUNK_SIZE, progress=None):
+    """
+    批量导入学生：整列校验后分批按身份证号查出已有学生，
+    在一个事务里分批 bulk_create 新学生、bulk_update 已有学生。
+    返回新建数量和逐行错误（行号与 Excel 行号一致）。
+    progress(done, total) 在每批写入后回调，后台任务用来汇报进度。
+    """
+    data = normalize(df)
+    row_errors = validate(data)
+    errors = [
+        f"第{index + 2}行错误: {'；'.join(messages)}"
+        for index, messages in sorted(row_errors.items())
+    ]
+
+    valid = data.drop(index=list(row_errors))
+    # 同一身份证出现多次时以最后一行为准
+    valid = valid.drop_duplicates(subset='id_card', keep='last')
+
+    existing = {}
+    id_cards = valid['id_card'].tolist()
+    for start in range(0, len(id_cards), chunk_size):
+        existing.update(
+            StudentInfo.objects.filter(id_card__in=id_cards[start:start + chunk_size]).values_list('id_card', 'pk')
+        )
+    fields = [field for field in IMPORT_COLUMNS.values() if field != 'id_card']
+    now = timezone.now()
+
+    to_create, to_update = [], []
+    for record in valid.to_dict('records'):
+        pk = existing.get(record['id_card'])
+        if pk is None:
+            to_create.append(StudentInfo(**record))
+        else:
+            to_update.append(StudentInfo(pk=pk, updated_time=now, **record))
+
+    total = len(to_create) + len(to_update)
+    done = 0
+    with transaction.atomic():
+        for start in range(0, len(to_create), chunk_size):
+            batch = to_create[start:start + chunk_size]
+            StudentInfo.objects.bulk_create(batch)
+            done += len(batch)
+            if progress:
+                progress(done, total)
+        for start in range(0, len(to_update), chunk_size):
+            batch = to_update[start:start + chunk_size]
+            StudentInfo.objects.bulk_update(batch, fields + ['updated_time'])
+            done += len(batch)
+            if progress:
+                progress(done, total)
+        # bulk_create/bulk_update 不触发信号，按身份证号更新搜索索引，并让学生缓存失效
+        id_cards = [student.id_card for student in to_create + to_update]
+        for start in range(0, len(id_cards), chunk_size):
+            STUDENT_INDEX.index_queryset(StudentInfo.objects.filter(id_card__in=id_cards[start:start + chunk_size]))
+        bump_namespace('student')
+
+    return {
+        'imported_count': len(to_create),
+        'updated_count': len(to_update),
+        'errors': errors,
+    }
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .student_models import StudentInfo, EducationHistory, Certificate
 from django.contrib.auth.models import User
+from .sparse_fields import SparseFieldsMixin
 
 class EducationHistorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -12,7 +13,7 @@ class CertificateSerializer(serializers.ModelSerializer):
         model = Certificate
         fields = '__all__'
 
-class StudentInfoSerializer(serializers.ModelSerializer):
+class StudentInfoSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     education_histories = EducationHistorySerializer(many=True, read_only=True)
     certificate_list = CertificateSerializer(many=True, read_only=True)
     age = serializers.ReadOnlyField()
@@ -29,6 +30,17 @@ class StudentInfoSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("身份证号码长度不正确")
         return value
 
+class StudentInfoListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """列表用的精简字段：不带教育经历和证书，也不读方法和属性，查询可以只取这些列"""
+
+    class Meta:
+        model = StudentInfo
+        fields = [
+            'id', 'name', 'id_card', 'phone', 'education_level',
+            'graduation_date', 'school_name', 'major', 'education_status',
+            'marketing_department', 'created_time', 'updated_time'
+        ]
+
 class StudentInfoCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = StudentInfo
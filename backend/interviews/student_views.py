@@ -1,49 +1,77 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.http import HttpResponse
+from django.http import FileResponse, StreamingHttpResponse
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
 from .student_models import StudentInfo, EducationHistory, Certificate
 from .student_serializers import (
-    StudentInfoSerializer, StudentInfoCreateSerializer, 
+    StudentInfoSerializer, StudentInfoListSerializer, StudentInfoCreateSerializer, 
     EducationHistorySerializer, CertificateSerializer,
     StudentImportSerializer
 )
-import pandas as pd
-from datetime import datetime
+from .student_import import import_students, read_student_file
+from .student_export import XLSX_SYNC_MAX_ROWS, stream_csv, write_xlsx
+from .jobs import enqueue
+from .query_optimizer import optimize_queryset
+from .conditional import ConditionalGetMixin
+from .columnar import ColumnarListMixin
+from .search import STUDENT_INDEX, match_expression, search_available, search_page
+from .job_views import job_accepted_response
 
-class StudentInfoViewSet(viewsets.ModelViewSet):
+def wants_async(request):
+    """async=true 时放到后台任务中执行"""
+    value = request.query_params.get('async') or request.data.get('async') or ''
+    return str(value).lower() in ('1', 'true', 'yes')
+
+def filter_students(queryset, params):
+    """学生列表的搜索和筛选条件，后台导出任务复用同一套规则"""
+    # 搜索过滤：优先走全文索引，不支持 FTS5 的数据库退回到 LIKE
+    search = params.get('search')
+    match = match_expression(search)
+    if match and search_available():
+        queryset = queryset.filter(pk__in=RawSQL(*STUDENT_INDEX.matching_ids_sql(match)))
+    elif search:
+        queryset = queryset.filter(
+            Q(name__icontains=search) |
+            Q(id_card__icontains=search) |
+            Q(phone__icontains=search) |
+            Q(school_name__icontains=search)
+        )
+    
+    # 部门过滤
+    department = params.get('department')
+    if department:
+        queryset = queryset.filter(marketing_department=department)
+    
+    # 学历过滤
+    education = params.get('education')
+    if education:
+        queryset = queryset.filter(education_level=education)
+    
+    return queryset.order_by('-created_time')
+
+class StudentInfoViewSet(ConditionalGetMixin, ColumnarListMixin, viewsets.ModelViewSet):
     queryset = StudentInfo.objects.all().select_related('created_by')
     permission_classes = [permissions.IsAuthenticated]
     
+    # 只读动作按序列化器预取教育经历、证书并裁剪列
+    optimized_actions = ('list', 'retrieve', 'detail_info', 'search')
+    
     def get_serializer_class(self):
         if self.action == 'create':
             return StudentInfoCreateSerializer
+        # 列表默认不带嵌套明细，nested=true 时返回完整信息（已预取）
+        if self.action in ('list', 'search') and self.request.query_params.get('nested') != 'true':
+            return StudentInfoListSerializer
         return StudentInfoSerializer
     
     def get_queryset(self):
-        queryset = StudentInfo.objects.all()
-        
-        # 搜索过滤
-        search = self.request.query_params.get('search')
-        if search:
-            queryset = queryset.filter(
-                models.Q(name__icontains=search) |
-                models.Q(id_card__icontains=search) |
-                models.Q(phone__icontains=search) |
-                models.Q(school_name__icontains=search)
-            )
-        
-        # 部门过滤
-        department = self.request.query_params.get('department')
-        if department:
-            queryset = queryset.filter(marketing_department=department)
-        
-        # 学历过滤
-        education = self.request.query_params.get('education')
-        if education:
-            queryset = queryset.filter(education_level=education)
-        
-        return queryset.order_by('-created_time')
+        queryset = filter_students(StudentInfo.objects.all(), self.request.query_params)
+        if self.action in self.optimized_actions:
+            # 序列化器已按 ?fields= / ?exclude= 裁剪，只读取用到的列
+            queryset = optimize_queryset(queryset, self.get_serializer())
+        return queryset
     
     @action(detail=True, methods=['get'])
     def detail_info(self, request, pk=None):
@@ -51,52 +79,38 @@ class StudentInfoViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(student)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """按相关度排序的学生搜索：q 为搜索词，limit/offset 分页"""
+        match = match_expression(request.query_params.get('q'))
+        if not match:
+            return Response({'error': '请输入搜索内容'}, status=status.HTTP_400_BAD_REQUEST)
+        if not search_available():
+            return Response({'error': '当前数据库不支持全文搜索'}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        limit, offset = search_page(request.query_params)
+        
+        ids = STUDENT_INDEX.ranked_ids(match, limit, offset)
+        students = optimize_queryset(StudentInfo.objects.all(), self.get_serializer()).in_bulk(ids)
+        serializer = self.get_serializer([students[pk] for pk in ids if pk in students], many=True)
+        return Response({'count': STUDENT_INDEX.count(match), 'results': serializer.data})
+    
     @action(detail=False, methods=['post'])
     def import_students(self, request):
         serializer = StudentImportSerializer(data=request.data)
         if serializer.is_valid():
+            if wants_async(request):
+                job = enqueue('student_import', request.user, input_file=request.FILES['file'])
+                return job_accepted_response(request, job)
+            
             try:
-                file = request.FILES['file']
-                df = pd.read_excel(file)
-                
-                imported_count = 0
-                errors = []
-                
-                for index, row in df.iterrows():
-                    try:
-                        student_data = {
-                            'name': row.get('学生姓名', ''),
-                            'id_card': str(row.get('身份证', '')).strip(),
-                            'phone': str(row.get('学生电话', '')),
-                            'father_phone': str(row.get('父亲电话', '')),
-                            'mother_phone': str(row.get('母亲电话', '')),
-                            'home_address': row.get('家庭住址', ''),
-                            'education_level': row.get('当前学历', ''),
-                            'graduation_date': row.get('毕业日期', datetime.now().date()),
-                            'school_name': row.get('毕业院校', ''),
-                            'major': row.get('专业', ''),
-                            'project_manager': row.get('项目经理', ''),
-                            'employment_guide': row.get('就业指导', ''),
-                            'marketing_department': row.get('所属市场部', ''),
-                            'certificates': row.get('所持证书', ''),
-                        }
-                        
-                        # 创建或更新学生信息
-                        student, created = StudentInfo.objects.update_or_create(
-                            id_card=student_data['id_card'],
-                            defaults=student_data
-                        )
-                        
-                        if created:
-                            imported_count += 1
-                            
-                    except Exception as e:
-                        errors.append(f"第{index+2}行错误: {str(e)}")
+                df = read_student_file(request.FILES['file'])
+                result = import_students(df)
                 
                 return Response({
                     'success': True,
-                    'imported_count': imported_count,
-                    'errors': errors
+                    'imported_count': result['imported_count'],
+                    'updated_count': result['updated_count'],
+                    'errors': result['errors']
                 })
                 
             except Exception as e:
@@ -109,34 +123,31 @@ class StudentInfoViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def export_students(self, request):
+        """
+        导出学生信息：export_format=csv 时逐行流式输出；默认导出 xlsx，要整本生成后才能发送，
+        超过 XLSX_SYNC_MAX_ROWS 行时和 async=true 一样放到后台任务中执行，返回 202 和任务地址
+        """
+        export_format = request.query_params.get('export_format', 'xlsx')
         students = self.get_queryset()
-        data = []
-        
-        for student in students:
-            data.append({
-                '学生姓名': student.name,
-                '身份证': student.id_card,
-                '学生电话': student.phone,
-                '父亲电话': student.father_phone,
-                '母亲电话': student.mother_phone,
-                '家庭住址': student.home_address,
-                '当前学历': student.get_education_level_display(),
-                '毕业日期': student.graduation_date,
-                '毕业院校': student.school_name,
-                '专业': student.major,
-                '在读状态': student.get_education_status_display(),
-                '项目经理': student.project_manager,
-                '就业指导': student.employment_guide,
-                '所属市场部': student.marketing_department,
-                '所持证书': student.certificates,
-                '创建时间': student.created_time,
-                '更新时间': student.updated_time,
+        if wants_async(request) or (export_format != 'csv' and students.count() > XLSX_SYNC_MAX_ROWS):
+            filters = {
+                name: request.query_params[name]
+                for name in ('search', 'department', 'education')
+                if name in request.query_params
+            }
+            job = enqueue('student_export', request.user, params={
+                'export_format': export_format,
+                'filters': filters,
             })
+            return job_accepted_response(request, job)
+        
+        if export_format == 'csv':
+            response = StreamingHttpResponse(stream_csv(students), content_type='text/csv; charset=utf-8')
+            response['Content-Disposition'] = 'attachment; filename="学生信息导出.csv"'
+            return response
         
-        df = pd.DataFrame(data)
-        response = HttpResponse(content_type='application/vnd.ms-excel')
+        response = FileResponse(write_xlsx(students), content_type='application/vnd.ms-excel')
         response['Content-Disposition'] = 'attachment; filename="学生信息导出.xlsx"'
-        df.to_excel(response, index=False)
         return response
 
 class EducationHistoryViewSet(viewsets.ModelViewSet):
@@ -0,0 +1,260 @@
+import datetime
+import itertools
+import random
+
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+from django.db import reset_queries, transaction
+from django.utils import timezone
+
+from .caching import bump_namespace
+from .models import Company, Interview, JobPosition, interval_end
+from .resolvers import invalidate_resolvers
+from .rollups import rebuild_daily_stats
+from .search import INTERVIEW_INDEX, STUDENT_INDEX, search_available
+from .student_models import Certificate, EducationHistory, StudentInfo
+
+# 压测数据生成器：bulk_create 分批写入，内存占用与总量无关，可以生成一百万条面试。
+# 同一个 seed 生成的数据相同，基准结果才能互相比较。
+
+GENERATE_BATCH_SIZE = 5000
+SURNAMES = '王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘于蒋蔡余杜叶程苏魏吕丁任沈'
+GIVEN_NAMES = '伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀英华慧巧美玲桂丹萍鑫宇浩然子轩梓涵一诺欣怡博文雨泽思远'
+CITIES = ('北京', '上海', '深圳', '杭州', '广州', '成都', '南京', '武汉', '西安', '苏州')
+INDUSTRIES = ('科技', '网络', '信息', '软件', '数据', '智能', '电子', '金融', '教育', '医疗')
+TITLES = (
+    ('后端开发工程师', '中级', '15-25K'), ('前端开发工程师', '中级', '12-22K'), ('测试工程师', '初级', '8-15K'),
+    ('高级后端开发工程师', '高级', '25-40K'), ('数据分析师', '中级', '12-20K'), ('运维工程师', '中级', '12-20K'),
+    ('产品经理', '高级', '20-35K'), ('Java开发工程师', '初级', '8-14K'), ('算法工程师', '高级', '30-50K'),
+    ('实施工程师', '初级', '6-10K'), ('UI设计师', '中级', '10-18K'), ('移动端开发工程师', '中级', '14-24K'),
+)
+SCHOOLS = ('北京大学', '武汉大学', '郑州大学', '河南理工大学', '华北水利水电大学', '河南大学', '郑州轻工业大学',
+           '洛阳理工学院', '黄河科技学院', '河南工业职业技术学院')
+MAJORS = ('计算机科学与技术', '软件工程', '网络工程', '信息管理与信息系统', '电子信息工程', '数据科学与大数据技术',
+          '通信工程', '自动化', '数学与应用数学', '会计学')
+DEPARTMENTS = ('市场一部', '市场二部', '市场三部', '市场四部', '华东市场部', '华南市场部')
+CERTIFICATES = ('计算机二级', '英语四级', '英语六级', '软考中级', '华为HCIA', '普通话二甲')
+
+# 取值及其权重
+METHODS = (('video', 55), ('onsite', 30), ('phone', 15))
+ROUNDS = (('first', 50), ('second', 25), ('third', 10), ('final', 12), ('other', 3))
+DURATIONS = ((30, 20), (45, 25), (60, 40), (90, 12), (120, 3))
+PAST_STATUSES = (('completed', 82), ('cancelled', 12), ('scheduled', 6))
+RESULTS = (('rejected', 45), ('passed', 30), ('offer', 12), ('pending', 8), ('declined', 5))
+EDUCATION_LEVELS = (('college', 45), ('bachelor', 40), ('secondary', 8), ('master', 6), ('doctor', 1))
+STUDENT_STATUSES = (('graduated', 55), ('studying', 40), ('suspended', 3), ('dropped', 2))
+# 每天 9 点到 18 点，上午 10 点和下午 2、3 点最多
+HOURS = ((9, 8), (10, 16), (11, 12), (13, 8), (14, 16), (15, 16), (16, 12), (17, 8), (18, 4))
+ID_CARD_WEIGHTS = (7, 9, 10, 5, 8, 4, 2, 1, 6, 3, 7, 9, 10, 5, 8, 4, 2)
+
+
+class Picker:
+    """按权重抽取，预先计算累计权重"""
+
+    def __init__(self, rng, choices):
+        self.rng = rng
+        self.values = [value for value, weight in choices]
+        self.cum_weights = list(itertools.accumulate(weight for value, weight in choices))
+
+    def __call__(self):
+        return self.rng.choices(self.values, cum_weights=self.cum_weights)[0]
+
+
+def id_card(rng, number):
+    """合法格式的身份证号（含校验位），地区码后四位和顺序号由 number 决定，一千万以内不重复"""
+    birthday = datetime.date(1995, 1, 1) + datetime.timedelta(days=rng.randrange(3650))
+    body = f'41{number // 1000 % 10000:04d}{birthday:%Y%m%d}{number % 1000:03d}'
+    check = '10X98765432'[sum(int(digit) * weight for digit, weight in zip(body, ID_CARD_WEIGHTS)) % 11]
+    return body + check
+
+
+def phone(rng):
+    return f'1{rng.choice("3456789")}{rng.randrange(10 ** 9):09d}'
+
+
+def person_name(rng):
+    return rng.choice(SURNAMES) + ''.join(rng.choice(GIVEN_NAMES) for _ in range(rng.choice((1, 2, 2))))
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class SyntheticData:
+    """
+    生成面试官、公司、职位、面试和学生。分布模拟真实数据：少数热门公司占大部分面试（Zipf），
+    面试时间集中在工作日白天，过去的面试大多已完成并有结果和评分，将来的面试都是已安排。
+    """
+
+    def __init__(self, seed=42, batch_size=GENERATE_BATCH_SIZE, log=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        # 按本地时间生成，面试集中在本地的工作时间
+        self.now = timezone.localtime().replace(minute=0, second=0, microsecond=0)
+
+    def users(self, count):
+        existing = User.objects.filter(username__startswith='interviewer_').count()
+        password = make_password(None)
+        User.objects.bulk_create([
+            User(username=f'interviewer_{number}', first_name=self.rng.choice(GIVEN_NAMES), last_name=self.rng.choice(SURNAMES),
+                 email=f'interviewer_{number}@example.com', password=password)
+            for number in range(existing, count)
+        ], batch_size=self.batch_size)
+        return list(User.objects.filter(username__startswith='interviewer_').order_by('id')[:count])
+
+    def companies(self, count, max_positions=8):
+        existing = Company.objects.filter(name__startswith='合成').count()
+        companies = []
+        for number in range(existing, count):
+            city, industry = self.rng.choice(CITIES), self.rng.choice(INDUSTRIES)
+            companies.append(Company(
+                name=f'合成{city}{industry}有限公司{number}',
+                description=f'{city}的{industry}企业',
+                website=f'https://company{number}.example.com',
+            ))
+        Company.objects.bulk_create(companies, batch_size=self.batch_size)
+
+        companies = list(Company.objects.filter(name__startswith='合成').order_by('id')[:count])
+        positions = [
+            JobPosition(company=company, title=title, level=level, salary_range=salary,
+                        description=f'负责{title}相关工作', requirements='本科及以上学历，有相关项目经验')
+            for company in companies
+            for title, level, salary in self.rng.sample(TITLES, self.rng.randint(1, max_positions))
+        ]
+        JobPosition.objects.bulk_create(positions, batch_size=self.batch_size, ignore_conflicts=True)
+        by_company = {}
+        for position in JobPosition.objects.filter(company__in=companies).order_by('id').values('id', 'company_id', 'title'):
+            by_company.setdefault(position['company_id'], []).append((position['id'], position['title']))
+        return [(company.id, company.name, by_company[company.id]) for company in companies]
+
+    def interview_rows(self, count, interviewers, companies, past_days, future_days):
+        rng = self.rng
+        method, interview_round, duration = Picker(rng, METHODS), Picker(rng, ROUNDS), Picker(rng, DURATIONS)
+        past_status, result, hour = Picker(rng, PAST_STATUSES), Picker(rng, RESULTS), Picker(rng, HOURS)
+        # Zipf 分布：排在第 k 位的公司被选中的概率与 1/k 成正比
+        company_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(companies) + 1)))
+        # 面试官的工作量也不均匀
+        interviewer_weights = list(itertools.accumulate(rng.uniform(0.3, 1.0) for _ in interviewers))
+        start = self.now - timezone.timedelta(days=past_days)
+        total_days = past_days + future_days
+
+        for number in range(count):
+            company_id, company_name, positions = rng.choices(companies, cum_weights=company_weights)[0]
+            position_id, position_title = rng.choice(positions)
+            day = start + timezone.timedelta(days=rng.randrange(total_days))
+            # 周末的面试只有工作日的五分之一
+            while day.weekday() >= 5 and rng.random() < 0.8:
+                day = start + timezone.timedelta(days=rng.randrange(total_days))
+            scheduled_time = day.replace(hour=hour(), minute=rng.choice((0, 15, 30, 45)))
+            minutes = duration()
+            status = past_status() if scheduled_time < self.now else 'scheduled'
+            row = {
+                'candidate_name': person_name(rng),
+                'candidate_phone': phone(rng),
+                'candidate_email': f'candidate{number}@example.com',
+                'company_name': company_name,
+                'position_title': position_title,
+                'company_id': company_id,
+                'position_id': position_id,
+                'interview_method': method(),
+                'interview_round': interview_round(),
+                'scheduled_time': scheduled_time,
+                'duration': minutes,
+                'end_time': interval_end(scheduled_time, minutes),
+                'interviewer': rng.choices(interviewers, cum_weights=interviewer_weights)[0],
+                'status': status,
+                'result': 'pending',
+            }
+            if status == 'completed':
+                row['result'] = result()
+                row['score'] = max(1, min(100, round(rng.gauss(70, 12))))
+                row['completed_time'] = scheduled_time + timezone.timedelta(minutes=minutes)
+                row['feedback'] = '沟通表达清晰，基础扎实' if row['score'] >= 70 else '基础一般，项目经验不足'
+            yield Interview(**row)
+
+    def interviews(self, count, interviewers, companies, past_days=365, future_days=60):
+        created = 0
+        for batch in batched(self.interview_rows(count, interviewers, companies, past_days, future_days), self.batch_size):
+            # bulk_create 不调用 save() 也不触发信号，end_time 等派生字段已在上面算好
+            Interview.objects.bulk_create(batch)
+            # DEBUG 下每条 SQL 都会留在 connection.queries 中，逐批清掉
+            reset_queries()
+            created += len(batch)
+            self.log(f'面试 {created}/{count}')
+        return created
+
+    def student_rows(self, count, first_number):
+        rng = self.rng
+        education, status = Picker(rng, EDUCATION_LEVELS), Picker(rng, STUDENT_STATUSES)
+        for number in range(first_number, first_number + count):
+            yield StudentInfo(
+                name=person_name(rng),
+                id_card=id_card(rng, number),
+                phone=phone(rng),
+                father_phone=phone(rng) if rng.random() < 0.7 else '',
+                mother_phone=phone(rng) if rng.random() < 0.6 else '',
+                home_address=f'河南省{rng.choice(("郑州", "洛阳", "开封", "新乡", "南阳"))}市第{rng.randint(1, 300)}号',
+                education_level=education(),
+                graduation_date=datetime.date(2020, 6, 30) + datetime.timedelta(days=365 * rng.randrange(8)),
+                school_name=rng.choice(SCHOOLS),
+                major=rng.choice(MAJORS),
+                education_status=status(),
+                project_manager=person_name(rng),
+                employment_guide=person_name(rng),
+                marketing_department=rng.choice(DEPARTMENTS),
+                certificates='、'.join(rng.sample(CERTIFICATES, rng.randrange(3))),
+            )
+
+    def students(self, count):
+        rng = self.rng
+        first_number = StudentInfo.objects.count()
+        created = 0
+        for batch in batched(self.student_rows(count, first_number), self.batch_size):
+            StudentInfo.objects.bulk_create(batch)
+            # SQLite 的 bulk_create 不返回主键，按身份证号取回
+            ids = dict(StudentInfo.objects.filter(id_card__in=[student.id_card for student in batch]).values_list('id_card', 'id'))
+            histories, certificates = [], []
+            for student in batch:
+                student_id = ids[student.id_card]
+                for _ in range(rng.choice((1, 1, 2))):
+                    histories.append(EducationHistory(
+                        student_id=student_id, education_level=student.education_level,
+                        graduation_date=student.graduation_date, school_name=student.school_name, major=student.major,
+                    ))
+                for name in student.certificates.split('、') if student.certificates else ():
+                    certificates.append(Certificate(
+                        student_id=student_id, name=name, issuing_authority='考试中心',
+                        issue_date=student.graduation_date - datetime.timedelta(days=rng.randrange(1, 700)),
+                        certificate_number=f'C{student_id:08d}{len(certificates) % 10}',
+                    ))
+            EducationHistory.objects.bulk_create(histories, batch_size=self.batch_size)
+            Certificate.objects.bulk_create(certificates, batch_size=self.batch_size)
+            reset_queries()
+            created += len(batch)
+            self.log(f'学生 {created}/{count}')
+        return created
+
+    def generate(self, interviews, students, companies, interviewers):
+        # 每批单独提交，中途中断时已写入的批次保留
+        users = self.users(interviewers)
+        company_rows = self.companies(companies)
+        self.interviews(interviews, users, company_rows)
+        self.students(students)
+        self.finish()
+
+    def finish(self):
+        """bulk_create 跳过了信号，补上日汇总、搜索索引和缓存失效"""
+        self.log('重建日汇总和搜索索引')
+        rebuild_daily_stats()
+        if search_available():
+            with transaction.atomic():
+                STUDENT_INDEX.rebuild(StudentInfo.objects.all())
+                INTERVIEW_INDEX.rebuild(Interview.objects.all())
+        invalidate_resolvers()
+        bump_namespace('interview', 'student', 'company')
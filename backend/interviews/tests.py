@@ -2,6 +2,95 @@ from django.test import TestCase
 from django.contrib.auth.models import User
 from .models import Company, JobPosition, Interview
 from django.utils import timezone
+from datetime import timedelta
+from rest_framework.test import APIClient
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import models
+from io import BytesIO, StringIO
+from django.core.cache import cache
+import datetime
+from .models import InterviewDailyStat
+from .student_models import Certificate, EducationHistory, StudentInfo
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.base import ContentFile
+import pandas as pd
+from openpyxl import load_workbook
+import shutil
+import tempfile
+from django.test import Client, override_settings
+import asyncio
+from .job_models import BackgroundJob
+from . import jobs
+from .models import RecordingUpload
+from .recording_uploads import UploadError, finalize_upload, partial_path
+import hashlib
+import re
+import json
+from unittest import mock
+from asgiref.sync import sync_to_async
+import os
+from .rollups import rebuild_daily_stats
+from .resolvers import invalidate_resolvers, upsert_id
+from .caching import bump_namespace, namespace_versions
+from .events import EventStreamApp, event_stream
+from .models import InterviewEvent
+from . import async_views
+from .search import match_expression, ngram_tokens
+from .columnar import ColumnarJSONRenderer
+from django.db import IntegrityError, OperationalError, transaction
+from interview_system.database import SQLITE_PRAGMAS, database_settings
+from . import metrics
+from .synthetic import SyntheticData
+from .date_windows import date_range_window, filter_window, local_midnight, month_window
+
+def create_interviews(count, interviewer=None, scheduled_time=None, **extra):
+    """批量生成测试用面试，每条都关联独立的公司和职位"""
+    scheduled_time = scheduled_time or timezone.now() + timedelta(days=1)
+    start = Interview.objects.count()
+    interviews = []
+    for i in range(start, start + count):
+        data = {
+            'candidate_name': f'候选人{i}',
+            'candidate_phone': '13800138000',
+            'candidate_email': f'c{i}@example.com',
+            'company_name': f'公司{i}',
+            'position_title': f'职位{i}',
+            'interview_method': 'video',
+            'interview_round': 'first',
+            'scheduled_time': scheduled_time,
+            'interviewer': interviewer,
+        }
+        data.update(extra)
+        interviews.append(Interview.objects.create(**data))
+    return interviews
+
+
+class QueryCountAssertionsMixin:
+    """列表接口查询次数回归检查：数据行数增加后查询次数不能随之增长"""
+
+    def assertQueryCountConstant(self, url, add_rows, params=None, small=2, large=10):
+        add_rows(small)
+        with CaptureQueriesContext(connection) as before:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+
+        add_rows(large - small)
+        with CaptureQueriesContext(connection) as after:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(
+            len(after), len(before),
+            '%s 的查询次数随行数增长: %d 行 %d 次, %d 行 %d 次\n%s' % (
+                url, small, len(before), large, len(after),
+                '\n'.join(q['sql'] for q in after.captured_queries)
+            )
+        )
+        return response
+
 
 class InterviewModelTest(TestCase):
     def setUp(self):
@@ -35,3 +124,1676 @@ class InterviewModelTest(TestCase):
         )
         self.assertEqual(interview.status, 'scheduled')
         self.assertFalse(interview.recording_uploaded)
+
+class InterviewPaginationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='pager', password='testpass123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        base = timezone.now() + timedelta(days=1)
+        # 每两条面试共用同一时间，覆盖排序值重复的情况
+        for i in range(25):
+            Interview.objects.create(
+                candidate_name=f'候选人{i}',
+                candidate_phone='13800138000',
+                candidate_email=f'c{i}@example.com',
+                company_name='测试公司',
+                position_title='测试职位',
+                interview_method='video',
+                interview_round='first',
+                scheduled_time=base + timedelta(hours=i // 2),
+                interviewer=self.user
+            )
+
+    def test_page_number_mode(self):
+        response = self.client.get('/api/interviews/', {'page': 2, 'page_size': 10})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_page_number_mode_without_count(self):
+        response = self.client.get('/api/interviews/', {'page': 3, 'page_size': 10, 'count': 'false'})
+        self.assertIsNone(response.data['count'])
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
+
+    def test_cursor_mode_walks_all_rows(self):
+        expected = list(Interview.objects.order_by('-scheduled_time', '-id').values_list('id', flat=True))
+        seen = []
+        url = '/api/interviews/?pagination=cursor&page_size=4'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, expected)
+
+    def test_cursor_mode_previous_link(self):
+        first = self.client.get('/api/interviews/', {'pagination': 'cursor', 'page_size': 4})
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [item['id'] for item in back.data['results']],
+            [item['id'] for item in first.data['results']]
+        )
+        self.assertIsNone(back.data['previous'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/interviews/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_my_interviews_paginated(self):
+        response = self.client.get('/api/interviews/my_interviews/', {'pagination': 'cursor', 'page_size': 5})
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNotNone(response.data['next'])
+
+
+class InterviewQueryCountTest(QueryCountAssertionsMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='counter', password='testpass123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_interviews(self, count):
+        create_interviews(count, interviewer=self.user)
+
+    def test_list(self):
+        response = self.assertQueryCountConstant('/api/interviews/', self.add_interviews, {'page_size': 50})
+        first = response.data['results'][0]
+        self.assertEqual(first['interviewer_info']['username'], 'counter')
+        self.assertTrue(first['company_name'].startswith('公司'))
+
+    def test_my_interviews(self):
+        self.assertQueryCountConstant('/api/interviews/my_interviews/', self.add_interviews, {'page_size': 50})
+
+    def test_upcoming_interviews(self):
+        self.assertQueryCountConstant('/api/interviews/upcoming_interviews/', self.add_interviews)
+
+    def test_positions(self):
+        self.assertQueryCountConstant('/api/positions/', self.add_interviews)
+
+
+class ExplainQueriesCommandTest(TestCase):
+    def test_no_full_scans(self):
+        out = StringIO()
+        call_command('explain_queries', '--fail-on-scan', stdout=out)
+        self.assertIn('共发现 0 个全表扫描', out.getvalue())
+
+    def test_detects_full_scan(self):
+        from interviews.management.commands.explain_queries import find_full_scans
+        plan = '3 0 0 SCAN interviews_interview\n5 0 0 SCAN interviews_interview USING INDEX interview_time_id_idx'
+        self.assertEqual(find_full_scans(plan), ['interviews_interview'])
+        self.assertEqual(find_full_scans('Seq Scan on interviews_interview  (cost=0.00..1.01 rows=1 width=4)'),
+                         ['interviews_interview'])
+
+
+class DashboardStatsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='dash', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        now = timezone.now()
+        create_interviews(2, interviewer=self.user, scheduled_time=now)
+        create_interviews(1, interviewer=self.user, scheduled_time=now - timedelta(days=30), status='completed')
+        create_interviews(1, interviewer=self.user, scheduled_time=now - timedelta(days=40), status='cancelled')
+        create_interviews(3, interviewer=self.other, scheduled_time=now)
+
+    def test_counters_in_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/dashboard/stats/')
+        self.assertEqual(response.data['total_count'], 4)
+        self.assertEqual(response.data['need_recording'], 1)
+        self.assertEqual(
+            {item['status']: item['count'] for item in response.data['status_stats']},
+            {'scheduled': 2, 'completed': 1, 'cancelled': 1}
+        )
+        self.assertGreaterEqual(response.data['today_count'], 1)
+        self.assertGreaterEqual(response.data['week_count'], response.data['today_count'])
+
+    def test_cached_until_interview_saved(self):
+        self.client.get('/api/dashboard/stats/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/dashboard/stats/')
+
+        create_interviews(1, interviewer=self.user)
+        response = self.client.get('/api/dashboard/stats/')
+        self.assertEqual(response.data['total_count'], 5)
+
+    def test_staff_sees_all(self):
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get('/api/dashboard/stats/')
+        self.assertEqual(response.data['total_count'], 7)
+
+
+class DateWindowEquivalenceTest(TestCase):
+    """半开区间过滤必须与原来的 __date / __year / __month 查询结果一致"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='window', password='testpass123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # 围绕本地时区的日界、月界各造几条面试
+        edges = [
+            datetime.date(2025, 1, 31), datetime.date(2025, 2, 1), datetime.date(2025, 2, 28),
+            datetime.date(2025, 3, 1), datetime.date(2024, 12, 31), datetime.date(2025, 12, 31),
+        ]
+        offsets = [
+            timedelta(0), timedelta(microseconds=1), timedelta(hours=7, minutes=59),
+            timedelta(hours=8), timedelta(hours=23, minutes=59, seconds=59), -timedelta(microseconds=1),
+        ]
+        for day in edges:
+            for offset in offsets:
+                create_interviews(1, scheduled_time=local_midnight(day) + offset)
+
+    def assertSameRows(self, new, old):
+        self.assertEqual(
+            sorted(new.values_list('id', flat=True)),
+            sorted(old.values_list('id', flat=True))
+        )
+
+    def test_date_range(self):
+        ranges = [
+            (datetime.date(2025, 2, 1), datetime.date(2025, 2, 1)),
+            (datetime.date(2025, 1, 31), datetime.date(2025, 2, 28)),
+            (datetime.date(2024, 12, 31), datetime.date(2025, 12, 31)),
+        ]
+        for date_from, date_to in ranges:
+            self.assertSameRows(
+                filter_window(Interview.objects.all(), 'scheduled_time', date_range_window(date_from, date_to)),
+                Interview.objects.filter(scheduled_time__date__range=[date_from, date_to])
+            )
+
+    def test_month(self):
+        for year, month in [(2025, 1), (2025, 2), (2025, 3), (2024, 12), (2025, 12)]:
+            self.assertSameRows(
+                filter_window(Interview.objects.all(), 'scheduled_time', month_window(year, month)),
+                Interview.objects.filter(scheduled_time__year=year, scheduled_time__month=month)
+            )
+
+    def test_list_endpoint_date_filter(self):
+        response = self.client.get('/api/interviews/', {
+            'date_from': '2025-02-01', 'date_to': '2025-02-28', 'page_size': 100
+        })
+        expected = Interview.objects.filter(scheduled_time__date__range=['2025-02-01', '2025-02-28'])
+        self.assertEqual(response.data['count'], expected.count())
+
+    def test_calendar_endpoint_month_filter(self):
+        response = self.client.get('/api/interview_calendar/', {'year': 2025, 'month': 2})
+        expected = Interview.objects.filter(scheduled_time__year=2025, scheduled_time__month=2)
+        self.assertEqual(sum(day['count'] for day in response.data), expected.count())
+
+    def test_invalid_date(self):
+        response = self.client.get('/api/interviews/', {'date_from': '2025-13-01'})
+        self.assertEqual(response.status_code, 400)
+
+
+class RollupAssertionsMixin:
+    def snapshot(self):
+        return sorted(
+            InterviewDailyStat.objects.filter(total_count__gt=0).values_list(
+                'day', 'interviewer_id', 'total_count', 'scheduled_count', 'in_progress_count',
+                'completed_count', 'cancelled_count', 'need_recording_count'
+            ),
+            key=lambda row: (row[0], row[1] or 0)
+        )
+
+    def assertMatchesRebuild(self):
+        incremental = self.snapshot()
+        rebuild_daily_stats()
+        self.assertEqual(incremental, self.snapshot())
+
+
+class InterviewDailyStatTest(RollupAssertionsMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='rollup', password='testpass123')
+        self.other = User.objects.create_user(username='rollup2', password='testpass123')
+
+    def test_incremental_matches_rebuild(self):
+        interviews = create_interviews(5, interviewer=self.user)
+        create_interviews(3, interviewer=self.other, scheduled_time=timezone.now() + timedelta(days=3))
+        create_interviews(2, interviewer=None)
+
+        moved = interviews[0]
+        moved.scheduled_time = moved.scheduled_time + timedelta(days=2)
+        moved.save()
+
+        reassigned = Interview.objects.get(pk=interviews[1].pk)
+        reassigned.interviewer = self.other
+        reassigned.status = 'completed'
+        reassigned.save()
+
+        # 延迟加载的实例也要能正确调整汇总
+        deferred = Interview.objects.only('id', 'status').get(pk=interviews[2].pk)
+        deferred.status = 'cancelled'
+        deferred.save()
+
+        Interview.objects.get(pk=interviews[3].pk).delete()
+        self.assertMatchesRebuild()
+
+    def test_delete_interviewer_keeps_totals(self):
+        create_interviews(3, interviewer=self.user)
+        create_interviews(2, interviewer=self.user, status='completed')
+        create_interviews(1, interviewer=None)
+        # 用户删除时面试的外键被批量置空，不触发面试的信号
+        self.user.delete()
+        self.assertEqual(Interview.objects.filter(interviewer=None).count(), 6)
+        self.assertEqual(InterviewDailyStat.objects.filter(interviewer=None).count(), 1)
+        self.assertMatchesRebuild()
+
+    def test_unassigned_rows_unique(self):
+        day = timezone.localdate()
+        InterviewDailyStat.objects.create(day=day, interviewer=None, total_count=1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            InterviewDailyStat.objects.create(day=day, interviewer=None, total_count=1)
+
+    def test_calendar_reads_rollup(self):
+        create_interviews(3, interviewer=self.user)
+        completed = create_interviews(1, interviewer=self.user, status='completed')[0]
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.assertNumQueries(1):
+            response = client.get('/api/interview_calendar/')
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['count'], 4)
+        self.assertEqual(response.data[0]['completed'], 1)
+        self.assertEqual(response.data[0]['scheduled'], 3)
+        self.assertEqual(response.data[0]['scheduled_time__date'], timezone.localtime(completed.scheduled_time).date())
+
+
+def student_row(index, **overrides):
+    row = {
+        '学生姓名': f'学生{index}',
+        '身份证': f'1101011990010{index:05d}',
+        '学生电话': f'138{index:08d}',
+        '父亲电话': '',
+        '母亲电话': '13900000000',
+        '家庭住址': '北京市',
+        '当前学历': '本科',
+        '毕业日期': '2020-06-30',
+        '毕业院校': '测试大学',
+        '专业': '计算机',
+        '项目经理': '王经理',
+        '就业指导': '李老师',
+        '所属市场部': '华北',
+        '所持证书': '',
+    }
+    row.update(overrides)
+    return row
+
+
+def excel_upload(rows, name='students.xlsx'):
+    buffer = BytesIO()
+    pd.DataFrame(rows).to_excel(buffer, index=False)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class StudentImportTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='importer', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        StudentInfo.objects.create(
+            name='旧名字', id_card='110101199001000001', phone='13800000001', home_address='旧地址',
+            education_level='college', graduation_date=datetime.date(2019, 6, 30), school_name='旧学校',
+            major='旧专业', project_manager='p', employment_guide='g', marketing_department='m'
+        )
+
+    def post(self, rows):
+        return self.client.post('/api/students/import_students/', {'file': excel_upload(rows)}, format='multipart')
+
+    def test_bulk_import_creates_and_updates(self):
+        rows = [student_row(i) for i in range(1, 6)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(rows)
+        self.assertTrue(response.data['success'])
+        self.assertEqual(response.data['imported_count'], 4)
+        self.assertEqual(response.data['updated_count'], 1)
+        self.assertEqual(response.data['errors'], [])
+        self.assertLess(len(queries), 10)
+
+        updated = StudentInfo.objects.get(id_card='110101199001000001')
+        self.assertEqual(updated.name, '学生1')
+        self.assertEqual(updated.education_level, 'bachelor')
+        self.assertEqual(updated.graduation_date, datetime.date(2020, 6, 30))
+        self.assertEqual(StudentInfo.objects.count(), 5)
+
+    def test_row_errors_reported_with_excel_line_numbers(self):
+        rows = [
+            student_row(11),
+            student_row(12, **{'身份证': '123'}),
+            student_row(13, **{'学生电话': '12345', '当前学历': '幼儿园'}),
+            student_row(14, **{'毕业日期': '不是日期'}),
+        ]
+        response = self.post(rows)
+        self.assertEqual(response.data['imported_count'], 1)
+        self.assertEqual(response.data['errors'], [
+            '第3行错误: 身份证号码格式不正确',
+            '第4行错误: 学生电话格式不正确；当前学历不在可选范围内',
+            '第5行错误: 毕业日期格式不正确',
+        ])
+        self.assertTrue(StudentInfo.objects.filter(id_card=student_row(11)['身份证']).exists())
+
+    def test_mixed_date_formats(self):
+        # Excel 日期单元格按文本读出来是 '2020-06-30 00:00:00'，要和手填的文本日期一起逐个解析
+        rows = [
+            student_row(21, **{'毕业日期': datetime.datetime(2020, 6, 30)}),
+            student_row(22, **{'毕业日期': '2020-06-30'}),
+            student_row(23, **{'毕业日期': '2020/6/30'}),
+        ]
+        response = self.post(rows)
+        self.assertEqual(response.data['errors'], [])
+        self.assertEqual(response.data['imported_count'], 3)
+        self.assertEqual(
+            set(StudentInfo.objects.filter(name__in=['学生21', '学生22', '学生23']).values_list('graduation_date', flat=True)),
+            {datetime.date(2020, 6, 30)}
+        )
+
+    def test_over_long_values_reported_per_row(self):
+        rows = [student_row(31), student_row(32, **{'项目经理': '王' * 51})]
+        response = self.post(rows)
+        self.assertEqual(response.data['imported_count'], 1)
+        self.assertEqual(response.data['errors'], ['第3行错误: 项目经理不能超过50个字符'])
+
+
+class StudentExportTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='exporter', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for i in range(1, 4):
+            StudentInfo.objects.create(
+                name=f'学生{i}', id_card=f'1101011990010{i:05d}', phone=f'138{i:08d}', home_address='北京市',
+                education_level='bachelor', graduation_date=datetime.date(2020, 6, 30), school_name='测试大学',
+                major='计算机', project_manager='p', employment_guide='g', marketing_department='华北'
+            )
+
+    def test_csv_streaming(self):
+        response = self.client.get('/api/students/export_students/', {'export_format': 'csv'})
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        lines = content.strip().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[0].startswith('学生姓名,身份证'))
+        self.assertIn('本科', lines[1])
+        self.assertIn('在读', lines[1])
+
+    def test_xlsx_export(self):
+        response = self.client.get('/api/students/export_students/')
+        workbook = load_workbook(BytesIO(b''.join(response.streaming_content)))
+        rows = list(workbook.active.values)
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0][0], '学生姓名')
+        self.assertEqual({row[6] for row in rows[1:]}, {'本科'})
+
+    def test_large_xlsx_export_queued(self):
+        # xlsx 不能流式输出，行数多时转为后台任务；csv 仍然直接流式返回
+        with mock.patch('interviews.student_views.XLSX_SYNC_MAX_ROWS', 2):
+            response = self.client.get('/api/students/export_students/', {'department': '华北'})
+            self.assertEqual(response.status_code, 202)
+            self.assertIn('status_url', response.data)
+            self.assertEqual(BackgroundJob.objects.get().params['filters'], {'department': '华北'})
+            response = self.client.get('/api/students/export_students/', {'export_format': 'csv'})
+            self.assertTrue(response.streaming)
+
+
+class BackgroundJobTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username='jobs', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def run_worker(self):
+        call_command('run_job_worker', '--once', stdout=StringIO())
+
+    def test_async_import(self):
+        rows = [student_row(i) for i in range(1, 4)] + [student_row(4, **{'身份证': 'bad'})]
+        response = self.client.post(
+            '/api/students/import_students/', {'file': excel_upload(rows), 'async': 'true'}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertEqual(StudentInfo.objects.count(), 0)
+
+        self.run_worker()
+        job = self.client.get(response.data['status_url']).data
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['progress'], 100)
+        self.assertEqual(job['result']['imported_count'], 3)
+        self.assertEqual(job['result']['errors'], ['第5行错误: 身份证号码格式不正确'])
+        self.assertIsNone(job['download_url'])
+        # 上传的文件在任务结束后删除
+        self.assertFalse(BackgroundJob.objects.get().input_file)
+        self.assertEqual([files for _, _, files in os.walk(os.path.join(self.media_root, 'job_files'))
+                          if files], [])
+
+    def test_worker_survives_database_errors(self):
+        with mock.patch('interviews.management.commands.run_job_worker.requeue_stale_jobs',
+                        side_effect=OperationalError('database is locked')), \
+                self.assertLogs('interviews.jobs', 'ERROR'):
+            self.run_worker()
+
+    def test_async_export_and_download(self):
+        for i in range(1, 3):
+            StudentInfo.objects.create(
+                name=f'学生{i}', id_card=f'1101011990010{i:05d}', phone=f'138{i:08d}', home_address='北京市',
+                education_level='bachelor', graduation_date=datetime.date(2020, 6, 30), school_name='测试大学',
+                major='计算机', project_manager='p', employment_guide='g', marketing_department='华北' if i == 1 else '华南'
+            )
+        response = self.client.get('/api/students/export_students/', {
+            'async': 'true', 'export_format': 'csv', 'department': '华北'
+        })
+        self.assertEqual(response.status_code, 202)
+
+        self.run_worker()
+        job = self.client.get(response.data['status_url']).data
+        self.assertEqual(job['status'], 'succeeded')
+        download = self.client.get(job['download_url'])
+        lines = b''.join(download.streaming_content).decode('utf-8-sig').strip().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn('华北', lines[1])
+
+    def test_failed_job_records_error(self):
+        job = BackgroundJob.objects.create(kind='unknown', created_by=self.user)
+        with self.assertLogs('interviews.jobs', 'ERROR'):
+            self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('未知的任务类型', job.error)
+
+    def test_heartbeat_without_progress_change(self):
+        BackgroundJob.objects.create(kind='student_export', created_by=self.user)
+        job = jobs.claim_next_job('w1')
+        BackgroundJob.objects.filter(pk=job.pk).update(updated_time=timezone.now() - timedelta(minutes=5))
+        job.refresh_from_db()
+        jobs.report_progress(job, 0, 1000)
+        self.assertGreater(BackgroundJob.objects.get(pk=job.pk).updated_time, timezone.now() - timedelta(minutes=1))
+
+        # 心跳超时被重新排队、由其他进程领取后，原进程停止执行
+        BackgroundJob.objects.filter(pk=job.pk).update(updated_time=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.requeue_stale_jobs(), 1)
+        jobs.claim_next_job('w2')
+        with self.assertRaises(jobs.JobLost):
+            jobs.report_progress(job, 500, 1000)
+
+    def test_requeued_job_result_discarded(self):
+        BackgroundJob.objects.create(kind='requeued', created_by=self.user)
+        job = jobs.claim_next_job('w1')
+
+        def handler(job, progress):
+            BackgroundJob.objects.filter(pk=job.pk).update(status='running', worker='w2')
+            return {'done': True}
+
+        with mock.patch.dict(jobs.JOB_HANDLERS, {'requeued': handler}), \
+                self.assertLogs('interviews.jobs', 'WARNING'):
+            jobs.run_job(job)
+        stored = BackgroundJob.objects.get(pk=job.pk)
+        self.assertEqual((stored.status, stored.worker, stored.result), ('running', 'w2', None))
+
+    def test_list_query_count(self):
+        for count in (3, 10):
+            BackgroundJob.objects.bulk_create([
+                BackgroundJob(kind='student_export', created_by=self.user, error='失败原因') for _ in range(count)
+            ])
+            with self.assertNumQueries(1):
+                response = self.client.get('/api/jobs/')
+            self.assertEqual(response.data[0]['error'], '失败原因')
+
+    def test_jobs_are_private(self):
+        other = User.objects.create_user(username='jobs2', password='testpass123')
+        job = BackgroundJob.objects.create(kind='student_export', created_by=other)
+        response = self.client.get(f'/api/jobs/{job.pk}/')
+        self.assertEqual(response.status_code, 404)
+
+
+class ChunkedRecordingUploadTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username='uploader', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.interview = create_interviews(1, interviewer=self.user, status='completed')[0]
+        self.content = os.urandom(150 * 1024)
+        self.checksum = hashlib.sha256(self.content).hexdigest()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def init_upload(self, checksum=None):
+        response = self.client.post(f'/api/interviews/{self.interview.pk}/recording_upload/', {
+            'filename': '面试录音.mp3', 'size': len(self.content), 'checksum': checksum or self.checksum
+        })
+        self.assertEqual(response.status_code, 201)
+        return f'/api/interviews/{self.interview.pk}/recording_upload/{response.data["upload_id"]}/'
+
+    def put_chunk(self, url, start, end):
+        return self.client.put(
+            url, data=self.content[start:end], content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end - 1}/{len(self.content)}'
+        )
+
+    def test_resumable_upload(self):
+        url = self.init_upload()
+        self.assertEqual(self.put_chunk(url, 0, 64 * 1024).data['offset'], 64 * 1024)
+
+        # 跳过部分数据的分片被拒绝，客户端按返回的 offset 续传
+        response = self.put_chunk(url, 100 * 1024, len(self.content))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.client.get(url).data['offset'], 64 * 1024)
+
+        self.put_chunk(url, 64 * 1024, len(self.content))
+        self.interview.refresh_from_db()
+        self.assertFalse(self.interview.recording_uploaded)
+
+        response = self.client.post(url + 'finalize/')
+        self.assertEqual(response.status_code, 200)
+        self.interview.refresh_from_db()
+        self.assertTrue(self.interview.recording_uploaded)
+        self.assertTrue(self.interview.recording.name.startswith('interview_recordings/'))
+        with self.interview.recording.open('rb') as file:
+            self.assertEqual(file.read(), self.content)
+        self.assertEqual(InterviewDailyStat.objects.get().need_recording_count, 0)
+
+    def test_incomplete_upload_cannot_finalize(self):
+        url = self.init_upload()
+        self.put_chunk(url, 0, 1024)
+        response = self.client.post(url + 'finalize/')
+        self.assertEqual(response.status_code, 409)
+
+    def test_concurrent_finalize(self):
+        url = self.init_upload()
+        self.put_chunk(url, 0, len(self.content))
+        upload = RecordingUpload.objects.select_related('interview').get()
+        stale = RecordingUpload.objects.select_related('interview').get()
+
+        def checksum_then_lose_file(path):
+            # 另一个请求在校验之后抢先移走了临时文件
+            os.remove(path)
+            return self.checksum
+
+        with mock.patch('interviews.recording_uploads.file_checksum', checksum_then_lose_file), \
+                self.assertRaises(UploadError) as raised:
+            finalize_upload(upload)
+        self.assertEqual(raised.exception.status, 404)
+        # 事务回滚，状态和面试都没有改变
+        self.assertEqual(RecordingUpload.objects.get().status, 'uploading')
+        self.assertFalse(Interview.objects.get(pk=self.interview.pk).recording_uploaded)
+
+        self.put_chunk(url, 0, len(self.content))
+        finalize_upload(RecordingUpload.objects.select_related('interview').get())
+        # 读取时仍是 uploading 的请求，由状态条件更新保证只完成一次
+        with open(partial_path(stale), 'wb') as file:
+            file.write(self.content)
+        with self.assertRaises(UploadError) as raised:
+            finalize_upload(stale)
+        self.assertEqual(raised.exception.status, 409)
+        self.assertEqual(InterviewEvent.objects.filter(kind='recording_uploaded').count(), 1)
+
+    def test_checksum_mismatch_resets_upload(self):
+        url = self.init_upload(checksum='0' * 64)
+        self.put_chunk(url, 0, len(self.content))
+        response = self.client.post(url + 'finalize/')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['offset'], 0)
+        self.interview.refresh_from_db()
+        self.assertFalse(self.interview.recording_uploaded)
+
+    def test_other_interviewer_cannot_upload(self):
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(username='intruder', password='testpass123'))
+        response = other.post(f'/api/interviews/{self.interview.pk}/recording_upload/', {
+            'filename': 'a.mp3', 'size': 10
+        })
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(RecordingUpload.objects.exists())
+
+
+class RecordingStreamTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username='listener', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.interview = create_interviews(1, interviewer=self.user, status='completed')[0]
+        self.content = os.urandom(100 * 1024)
+        self.interview.recording.save('面试录音.mp3', ContentFile(self.content))
+        self.url = f'/api/interviews/{self.interview.pk}/recording_stream/'
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_full_file(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='audio/*')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Type'], 'audio/mpeg')
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+    def test_range_request(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=1000-1999')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 1000-1999/{len(self.content)}')
+        self.assertEqual(response['Content-Length'], '1000')
+        self.assertEqual(b''.join(response.streaming_content), self.content[1000:2000])
+
+        # 只给起点或只给末尾长度
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-100')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-100:])
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content) - 10}-')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-10:])
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_other_interviewer_cannot_stream(self):
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(username='intruder', password='testpass123'))
+        self.assertEqual(other.get(self.url).status_code, 404)
+
+        staff = APIClient()
+        staff.force_authenticate(User.objects.create_user(username='boss', password='testpass123', is_staff=True))
+        self.assertEqual(staff.get(self.url, HTTP_RANGE='bytes=0-9').status_code, 206)
+
+    @override_settings(RECORDING_SERVE_MODE='x-accel', RECORDING_ACCEL_PREFIX='/protected-media/')
+    def test_accel_redirect(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['X-Accel-Redirect'].startswith('/protected-media/'))
+        self.assertEqual(response.content, b'')
+
+
+class CompanyResolverTest(TestCase):
+    def setUp(self):
+        invalidate_resolvers()
+        self.user = User.objects.create_user(username='resolver', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        # 测试结束会回滚数据，缓存的 id 不能带到下一个测试
+        invalidate_resolvers()
+
+    def create_interview(self, **extra):
+        data = {
+            'candidate_name': '候选人', 'candidate_phone': '13800138000', 'candidate_email': 'c@example.com',
+            'company_name': '缓存公司', 'position_title': '后端工程师',
+            'interview_method': 'video', 'interview_round': 'first',
+            'scheduled_time': (timezone.now() + timedelta(days=1)).isoformat(),
+        }
+        data.update(extra)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/interviews/', data)
+        self.assertEqual(response.status_code, 201)
+        return Interview.objects.latest('id')
+
+    def test_cached_names_skip_company_queries(self):
+        first = self.create_interview()
+        with CaptureQueriesContext(connection) as queries:
+            second = self.create_interview(candidate_name='候选人2')
+        self.assertEqual((second.company_id, second.position_id), (first.company_id, first.position_id))
+        self.assertEqual(second.company_name, '缓存公司')
+        lookups = [
+            q['sql'] for q in queries
+            if re.search(r'(FROM|INTO) "interviews_(company|jobposition)"', q['sql'])
+        ]
+        self.assertEqual(lookups, [])
+        self.assertEqual(Company.objects.count(), 1)
+        self.assertEqual(JobPosition.objects.count(), 1)
+
+    def test_rename_invalidates_cache(self):
+        first = self.create_interview()
+        Company.objects.filter(pk=first.company_id).update(name='旧名称')
+        Company.objects.get(pk=first.company_id).save()
+        second = self.create_interview(candidate_name='候选人2')
+        self.assertNotEqual(second.company_id, first.company_id)
+        self.assertEqual(Company.objects.get(pk=second.company_id).name, '缓存公司')
+
+    def test_upsert_returns_existing_row(self):
+        company = Company.objects.create(name='已存在')
+        self.assertEqual(upsert_id(Company, {'name': '已存在'}, {}), company.pk)
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Company.objects.create(name='已存在')
+
+
+class BulkScheduleTest(RollupAssertionsMixin, TestCase):
+    def setUp(self):
+        invalidate_resolvers()
+        self.user = User.objects.create_user(username='recruiter', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.base_time = local_midnight(timezone.localdate() + timedelta(days=1)) + timedelta(hours=8)
+
+    def tearDown(self):
+        invalidate_resolvers()
+
+    def item(self, index, **overrides):
+        data = {
+            'candidate_name': f'批量候选人{index}', 'candidate_phone': '13800138000',
+            'candidate_email': f'b{index}@example.com',
+            'company_name': f'批量公司{index % 3}', 'position_title': f'职位{index % 2}',
+            'interview_method': 'video', 'interview_round': 'first',
+            # 每条错开 1 分钟、时长 1 分钟，同一面试官不会冲突；都落在明天起的 4 个自然日内
+            'scheduled_time': (self.base_time + timedelta(days=index % 4, minutes=index)).isoformat(),
+            'duration': 1,
+            'interviewer': self.user.pk,
+        }
+        data.update(overrides)
+        return data
+
+    def post(self, items):
+        return self.client.post('/api/interviews/bulk_create/', {'interviews': items}, format='json')
+
+    def test_bulk_create_with_item_errors(self):
+        Company.objects.create(name='批量公司0')
+        items = [self.item(i) for i in range(6)]
+        items[2]['scheduled_time'] = (timezone.now() - timedelta(days=1)).isoformat()
+        items[4]['interview_method'] = 'letter'
+        items.append(self.item(6, interviewer=User.objects.create_user(username='someone').pk))
+
+        response = self.post(items)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created_count'], 4)
+        self.assertEqual([error['index'] for error in response.data['errors']], [2, 4, 6])
+        self.assertIn('interview_method', response.data['errors'][1]['errors'])
+
+        self.assertEqual(Company.objects.filter(name__startswith='批量公司').count(), 3)
+        self.assertEqual(JobPosition.objects.count(), 4)
+        interview = Interview.objects.get(candidate_name='批量候选人5')
+        self.assertEqual((interview.company.name, interview.position.title), ('批量公司2', '职位1'))
+        self.assertEqual(interview.interviewer, self.user)
+        self.assertMatchesRebuild()
+
+    def test_query_count_independent_of_batch_size(self):
+        # 先建好日汇总行，之后两批都只是累加
+        self.post([self.item(i) for i in range(4)])
+        with CaptureQueriesContext(connection) as small:
+            self.post([self.item(i, company_name=f'小批公司{i % 3}') for i in range(4, 9)])
+        with CaptureQueriesContext(connection) as large:
+            self.post([self.item(i, company_name=f'大批公司{i % 3}') for i in range(9, 209)])
+        # SQLite 的参数个数上限会让 bulk_create（面试和事件日志）拆成多条 INSERT，其余查询数量应当相同
+        def other_queries(queries):
+            return [q for q in queries if not re.match(r'INSERT INTO "interviews_interview(event)?"', q['sql'])]
+        self.assertEqual(len(other_queries(small)), len(other_queries(large)))
+        self.assertEqual(Interview.objects.count(), 209)
+
+    def test_all_invalid_returns_400(self):
+        response = self.post([self.item(0, candidate_email='bad')])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Interview.objects.count(), 0)
+
+
+class InterviewConflictTest(TestCase):
+    def setUp(self):
+        invalidate_resolvers()
+        self.user = User.objects.create_user(username='busy', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.day = timezone.localdate() + timedelta(days=2)
+        self.ten = local_midnight(self.day) + timedelta(hours=10)
+        self.existing = create_interviews(1, interviewer=self.user, scheduled_time=self.ten)[0]
+
+    def tearDown(self):
+        invalidate_resolvers()
+
+    def payload(self, scheduled_time, **extra):
+        data = {
+            'candidate_name': '新候选人', 'candidate_phone': '13800138000', 'candidate_email': 'n@example.com',
+            'company_name': '冲突公司', 'position_title': '工程师',
+            'interview_method': 'video', 'interview_round': 'first',
+            'scheduled_time': scheduled_time.isoformat(), 'interviewer': self.user.pk,
+        }
+        data.update(extra)
+        return data
+
+    def test_end_time_follows_duration(self):
+        self.assertEqual(self.existing.end_time, self.ten + timedelta(hours=1))
+        self.existing.duration = 90
+        self.existing.save()
+        self.assertEqual(self.existing.end_time, self.ten + timedelta(minutes=90))
+
+    def test_create_rejects_overlap(self):
+        response = self.client.post('/api/interviews/', self.payload(self.ten + timedelta(minutes=30)))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('已有面试', str(response.data))
+
+        # 首尾相接不算冲突，已取消的面试不占用时间
+        response = self.client.post('/api/interviews/', self.payload(self.ten + timedelta(hours=1)))
+        self.assertEqual(response.status_code, 201)
+        Interview.objects.filter(pk=self.existing.pk).update(status='cancelled')
+        response = self.client.post('/api/interviews/', self.payload(self.ten + timedelta(minutes=30), duration=10))
+        self.assertEqual(response.status_code, 201)
+
+    def test_interviewer_can_only_schedule_self(self):
+        other = User.objects.create_user(username='other', password='testpass123')
+        tomorrow = self.ten + timedelta(days=1)
+        response = self.client.post('/api/interviews/', self.payload(tomorrow, interviewer=other.pk))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('interviewer', response.data)
+
+        # 修改面试不能改派面试官
+        self.client.patch(f'/api/interviews/{self.existing.pk}/', {'interviewer': other.pk}, format='json')
+        self.assertEqual(Interview.objects.get(pk=self.existing.pk).interviewer, self.user)
+
+        staff = User.objects.create_user(username='boss', password='testpass123', is_staff=True)
+        self.client.force_authenticate(staff)
+        response = self.client.post('/api/interviews/', self.payload(tomorrow, interviewer=other.pk))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Interview.objects.get(candidate_name='新候选人').interviewer, other)
+
+    def test_reactivating_cancelled_interview_checks_conflict(self):
+        self.existing.status = 'cancelled'
+        self.existing.save()
+        create_interviews(1, interviewer=self.user, scheduled_time=self.ten)
+        response = self.client.patch(f'/api/interviews/{self.existing.pk}/', {'status': 'scheduled'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_conflicts(self):
+        items = [
+            self.payload(self.ten + timedelta(minutes=30), candidate_email='a@example.com'),
+            self.payload(self.ten + timedelta(hours=2), candidate_email='b@example.com'),
+            self.payload(self.ten + timedelta(hours=2, minutes=59), candidate_email='c@example.com'),
+            self.payload(self.ten + timedelta(hours=3), candidate_email='d@example.com'),
+        ]
+        response = self.client.post('/api/interviews/bulk_create/', items, format='json')
+        self.assertEqual(response.data['created_count'], 2)
+        self.assertEqual([error['index'] for error in response.data['errors']], [0, 2])
+        self.assertIn('第 2 条', str(response.data['errors'][1]))
+
+    def test_free_slots(self):
+        create_interviews(1, interviewer=self.user, scheduled_time=self.ten + timedelta(minutes=30), duration=90)
+        create_interviews(1, interviewer=self.user, scheduled_time=self.ten + timedelta(hours=5), duration=20)
+        create_interviews(1, interviewer=self.user, scheduled_time=self.ten + timedelta(hours=3), status='cancelled')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/interviews/free_slots/', {
+                'date_from': self.day.isoformat(), 'date_to': self.day.isoformat(), 'min_duration': 30
+            })
+        self.assertEqual(response.status_code, 200)
+        hours = [(slot['start'][11:16], slot['end'][11:16]) for slot in response.data]
+        # 15:00-15:20 之后到 18:00；10:00-12:00 两场重叠合并
+        self.assertEqual(hours, [('09:00', '10:00'), ('12:00', '15:00'), ('15:20', '18:00')])
+        self.assertEqual(len([q for q in queries if 'interviews_interview' in q['sql']]), 1)
+
+    def test_free_slots_of_other_interviewer_forbidden(self):
+        other = User.objects.create_user(username='other')
+        response = self.client.get('/api/interviews/free_slots/', {'interviewer': other.pk})
+        self.assertEqual(response.status_code, 403)
+
+
+class SearchIndexTest(TestCase):
+    def setUp(self):
+        invalidate_resolvers()
+        self.user = User.objects.create_user(username='searcher', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        invalidate_resolvers()
+
+    def test_ngram_tokens(self):
+        self.assertEqual(ngram_tokens('张三丰'), '张三 三丰 丰')
+        self.assertEqual(match_expression('张三 0013'), '"张三" AND "00 01 13"')
+        self.assertEqual(match_expression('张'), '"张"*')
+        self.assertIsNone(match_expression(' - '))
+
+    def test_imported_students_are_searchable(self):
+        rows = [student_row(1, 学生姓名='欧阳修'), student_row(2, 学生姓名='欧阳锋', 毕业院校='欧阳大学'), student_row(3)]
+        self.client.post('/api/students/import_students/', {'file': excel_upload(rows)}, format='multipart')
+
+        response = self.client.get('/api/students/search/', {'q': '欧阳'})
+        self.assertEqual(response.data['count'], 2)
+        # 姓名和学校都命中的排在前面
+        self.assertEqual([student['name'] for student in response.data['results']], ['欧阳锋', '欧阳修'])
+
+        # 列表的 search 参数使用同一个索引，电话号码按任意片段匹配
+        response = self.client.get('/api/students/', {'search': '00000003'})
+        self.assertEqual([student['name'] for student in response.data], ['学生3'])
+
+    def test_student_index_follows_updates_and_deletes(self):
+        self.client.post('/api/students/import_students/', {'file': excel_upload([student_row(1)])}, format='multipart')
+        student = StudentInfo.objects.get()
+        student.name = '司马光'
+        student.save()
+        self.assertEqual(self.client.get('/api/students/search/', {'q': '司马'}).data['count'], 1)
+        self.assertEqual(self.client.get('/api/students/search/', {'q': '学生1'}).data['count'], 0)
+        student.delete()
+        self.assertEqual(self.client.get('/api/students/search/', {'q': '司马'}).data['count'], 0)
+
+    def test_interview_search_respects_permissions(self):
+        other = User.objects.create_user(username='other-searcher')
+        mine = create_interviews(1, interviewer=self.user, candidate_name='诸葛亮')[0]
+        create_interviews(1, interviewer=other, candidate_name='诸葛瑾')
+
+        response = self.client.get('/api/interviews/search/', {'q': '诸葛'})
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual([row['id'] for row in response.data['results']], [mine.pk])
+
+        response = self.client.get('/api/interviews/', {'search': mine.company.name})
+        self.assertEqual([row['id'] for row in response.data['results']], [mine.pk])
+
+    def test_company_rename_and_bulk_schedule_reindex(self):
+        interview = create_interviews(1, interviewer=self.user)[0]
+        company = interview.company
+        company.name = '改名后的公司'
+        company.save()
+        self.assertEqual(self.client.get('/api/interviews/search/', {'q': '改名后'}).data['count'], 1)
+
+        self.client.post('/api/interviews/bulk_create/', [{
+            'candidate_name': '曹操', 'candidate_phone': '13800138000', 'candidate_email': 'cc@example.com',
+            'company_name': '魏国', 'position_title': '丞相', 'interview_method': 'video', 'interview_round': 'first',
+            'scheduled_time': (timezone.now() + timedelta(days=3)).isoformat(), 'interviewer': self.user.pk,
+        }], format='json')
+        self.assertEqual(self.client.get('/api/interviews/search/', {'q': '魏国 丞相'}).data['count'], 1)
+
+    def test_empty_query_rejected(self):
+        self.assertEqual(self.client.get('/api/interviews/search/', {'q': ''}).status_code, 400)
+
+
+class StudentQueryCountTest(QueryCountAssertionsMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='counter', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_students(self, count):
+        start = StudentInfo.objects.count()
+        for i in range(start, start + count):
+            student = StudentInfo.objects.create(
+                name=f'学生{i}', id_card=f'1101011990010{i:05d}', phone=f'138{i:08d}',
+                education_level='bachelor', graduation_date=datetime.date(2020, 6, 30),
+                school_name='测试大学', major='计算机', education_status='graduated',
+                project_manager='王经理', employment_guide='李老师', marketing_department='华北'
+            )
+            EducationHistory.objects.create(
+                student=student, education_level='bachelor', graduation_date=datetime.date(2020, 6, 30),
+                school_name='测试大学', major='计算机'
+            )
+            Certificate.objects.create(
+                student=student, name='软考', issue_date=datetime.date(2021, 1, 1), issuing_authority='工信部'
+            )
+
+    def test_list_is_lightweight(self):
+        response = self.assertQueryCountConstant('/api/students/', self.add_students)
+        self.assertNotIn('education_histories', response.data[0])
+
+    def test_nested_list_prefetches(self):
+        response = self.assertQueryCountConstant('/api/students/', self.add_students, {'nested': 'true'})
+        self.assertEqual(len(response.data[0]['education_histories']), 1)
+        self.assertEqual(len(response.data[0]['certificate_list']), 1)
+
+    def test_retrieve_and_detail_info(self):
+        self.add_students(1)
+        student = StudentInfo.objects.get()
+        # 学生本身 + 教育经历 + 证书；retrieve 另有一次条件请求的校验查询
+        for url, queries in ((f'/api/students/{student.pk}/', 4), (f'/api/students/{student.pk}/detail_info/', 3)):
+            with self.assertNumQueries(queries):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['certificate_list'][0]['name'], '软考')
+            self.assertEqual(response.data['age'], student.age())
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='etag', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.interviews = create_interviews(3, interviewer=self.user)
+
+    def assertNotModified(self, url, response, params=None):
+        with self.assertNumQueries(1 if url.startswith('/api/interviews/') else 0):
+            again = self.client.get(url, params, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], response['ETag'])
+        self.assertEqual(again.content, b'')
+
+    def test_interview_list_and_retrieve(self):
+        for url in ('/api/interviews/', f'/api/interviews/{self.interviews[0].pk}/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('no-cache', response['Cache-Control'])
+            self.assertIn('Last-Modified', response)
+            self.assertNotModified(url, response)
+
+    def test_invalid_pk_not_found(self):
+        for url in ('/api/interviews/abc/', '/api/students/abc/'):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_changes_invalidate_etag(self):
+        response = self.client.get('/api/interviews/')
+        etag = response['ETag']
+
+        self.interviews[0].feedback = '表现不错'
+        self.interviews[0].save()
+        response = self.client.get('/api/interviews/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        # 删除不会产生更新时间，由行数变化发现
+        etag = response['ETag']
+        self.interviews[1].delete()
+        self.assertEqual(self.client.get('/api/interviews/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        # 公司改名会刷新关联面试的更新时间
+        etag = self.client.get('/api/interviews/').get('ETag')
+        company = self.interviews[0].company
+        company.name = '新名字'
+        company.save()
+        self.assertEqual(self.client.get('/api/interviews/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_depends_on_query_and_user(self):
+        first = self.client.get('/api/interviews/')['ETag']
+        self.assertNotEqual(first, self.client.get('/api/interviews/', {'status': 'completed'})['ETag'])
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(username='etag2'))
+        self.assertEqual(other.get('/api/interviews/', HTTP_IF_NONE_MATCH=first).status_code, 200)
+
+    def test_dashboard_and_calendar(self):
+        # 看板和日历都命中接口缓存，304 不需要任何查询
+        for url in ('/api/dashboard/stats/', '/api/interview_calendar/'):
+            response = self.client.get(url)
+            self.assertNotModified(url, response)
+
+        etag = self.client.get('/api/dashboard/stats/')['ETag']
+        create_interviews(1, interviewer=self.user)
+        self.assertEqual(self.client.get('/api/dashboard/stats/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_student_detail_changes_with_certificates(self):
+        student = StudentInfo.objects.create(
+            name='学生', id_card='110101199001010000', phone='13800000000', education_level='bachelor',
+            graduation_date=datetime.date(2020, 6, 30), school_name='大学', major='计算机',
+            project_manager='王', employment_guide='李', marketing_department='华北'
+        )
+        url = f'/api/students/{student.pk}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Certificate.objects.create(student=student, name='软考', issue_date=datetime.date(2021, 1, 1), issuing_authority='工信部')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ViewCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_resolvers()
+        self.user = User.objects.create_user(username='cached', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        create_interviews(2, interviewer=self.user)
+
+    def tearDown(self):
+        invalidate_resolvers()
+
+    def test_company_lists_cached_until_changed(self):
+        for url in ('/api/companies/', '/api/positions/'):
+            count = len(self.client.get(url).data)
+            with self.assertNumQueries(0):
+                self.assertEqual(len(self.client.get(url).data), count)
+        Company.objects.create(name='新公司')
+        self.assertEqual(len(self.client.get('/api/companies/').data), count + 1)
+
+        # 参数不同的请求分别缓存
+        company_id = JobPosition.objects.first().company_id
+        self.assertEqual(len(self.client.get('/api/positions/', {'company_id': company_id}).data), 1)
+
+    def test_upcoming_invalidated_by_interview_and_company_changes(self):
+        url = '/api/interviews/upcoming_interviews/'
+        self.assertEqual(len(self.client.get(url).data), 2)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        interview = create_interviews(1, interviewer=self.user)[0]
+        self.assertEqual(len(self.client.get(url).data), 3)
+
+        interview.company.name = '改名公司'
+        interview.company.save()
+        names = {item['company_name'] for item in self.client.get(url).data}
+        self.assertIn('改名公司', names)
+
+    def test_cache_is_per_user(self):
+        url = '/api/interview_calendar/'
+        self.assertEqual(self.client.get(url).data[0]['count'], 2)
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(username='cached2'))
+        self.assertEqual(other.get(url).data, [])
+
+    def test_errors_not_cached(self):
+        with mock.patch('interviews.caching.cache.set') as cache_set:
+            response = self.client.get('/api/interview_calendar/', {'year': 'x', 'month': '1'})
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('ETag', response)
+        cache_set.assert_not_called()
+
+    def test_bump_inside_transaction_repeats_after_commit(self):
+        before = namespace_versions(['student'])
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                bump_namespace('student')
+                during = namespace_versions(['student'])
+        self.assertNotEqual(before, during)
+        self.assertNotEqual(during, namespace_versions(['student']))
+
+    def test_student_changes_bump_namespace(self):
+        before = namespace_versions(['student', 'interview'])
+        StudentInfo.objects.create(
+            name='学生', id_card='110101199001010001', phone='13800000001', education_level='bachelor',
+            graduation_date=datetime.date(2020, 6, 30), school_name='大学', major='计算机',
+            project_manager='王', employment_guide='李', marketing_department='华北'
+        )
+        after = namespace_versions(['student', 'interview'])
+        self.assertNotEqual(before[0], after[0])
+        self.assertEqual(before[1], after[1])
+
+    def test_file_backend_shared_cache(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        backend = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}}
+        with override_settings(CACHES=backend):
+            self.client.get('/api/companies/')
+            with self.assertNumQueries(0):
+                self.client.get('/api/companies/')
+            Company.objects.create(name='文件缓存公司')
+            self.assertIn('文件缓存公司', [item['name'] for item in self.client.get('/api/companies/').data])
+
+
+class AsyncViewTest(TestCase):
+    """只读接口是协程视图，通过 ASGI 客户端访问"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='async', password='testpass123')
+        self.async_client.force_login(self.user)
+        create_interviews(2, interviewer=self.user)
+
+    def test_views_are_coroutines(self):
+        for view in (async_views.dashboard_stats, async_views.interview_calendar,
+                     async_views.upcoming_interviews, async_views.current_user):
+            self.assertTrue(asyncio.iscoroutinefunction(view))
+
+    async def test_read_endpoints(self):
+        response = await self.async_client.get('/api/dashboard/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_count'], 2)
+        self.assertIn('ETag', response)
+
+        response = await self.async_client.get('/api/interview_calendar/')
+        self.assertEqual(response.json()[0]['count'], 2)
+
+        response = await self.async_client.get('/api/interviews/upcoming_interviews/')
+        self.assertEqual(len(response.json()), 2)
+
+        response = await self.async_client.get('/api/auth/user/')
+        self.assertEqual(response.json()['username'], 'async')
+
+    async def test_errors_use_drf_handling(self):
+        response = await self.async_client.get('/api/interview_calendar/?year=x&month=1')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('month', response.json())
+        response = await self.async_client.post('/api/dashboard/stats/')
+        self.assertEqual(response.status_code, 405)
+
+    def test_anonymous(self):
+        client = APIClient()
+        self.assertEqual(client.get('/api/dashboard/stats/').status_code, 403)
+        self.assertEqual(client.get('/api/auth/user/').status_code, 401)
+
+    def test_asgi_application(self):
+        from interview_system.asgi import application
+        self.assertTrue(callable(application))
+
+
+class InterviewEventTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='events', password='testpass123')
+        self.other = User.objects.create_user(username='events2', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def kinds(self, **filters):
+        return list(InterviewEvent.objects.filter(**filters).order_by('id').values_list('kind', flat=True))
+
+    def test_signals_record_changes(self):
+        interview = create_interviews(1, interviewer=self.user)[0]
+        interview.feedback = '只改反馈不产生事件'
+        interview.save()
+        interview.status = 'completed'
+        interview.result = 'pass'
+        interview.save()
+
+        # 延迟加载的字段从数据库读取保存前的状态
+        loaded = Interview.objects.only('id', 'recording').get(pk=interview.pk)
+        loaded.recording.name = 'interview_recordings/events.mp3'
+        loaded.save(update_fields=['recording', 'recording_uploaded'])
+        Interview.objects.get(pk=interview.pk).delete()
+
+        self.assertEqual(
+            self.kinds(interview_id=interview.pk),
+            ['created', 'status_changed', 'result_changed', 'recording_uploaded', 'deleted']
+        )
+        event = InterviewEvent.objects.get(kind='result_changed')
+        self.assertEqual((event.interviewer_id, event.data['status'], event.data['result']), (self.user.pk, 'completed', 'pass'))
+
+    def test_bulk_schedule_records_created(self):
+        base = timezone.localtime().replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=2)
+        items = [{
+            'candidate_name': f'事件候选人{i}', 'candidate_phone': '13800138000', 'candidate_email': f'e{i}@example.com',
+            'company_name': '事件公司', 'position_title': '职位', 'interview_method': 'video',
+            'interview_round': 'first', 'scheduled_time': (base + timedelta(hours=i)).isoformat(),
+            'interviewer': self.user.pk,
+        } for i in range(3)]
+        self.assertEqual(self.client.post('/api/interviews/bulk_create/', items, format='json').status_code, 201)
+        self.assertEqual(self.kinds(interviewer=self.user), ['created'] * 3)
+
+    def test_bulk_schedule_ignores_concurrent_inserts(self):
+        base = timezone.localtime().replace(hour=10, minute=0, second=0, microsecond=0) + timedelta(days=2)
+        items = [{
+            'candidate_name': '事件候选人', 'candidate_phone': '13800138000', 'candidate_email': 'e@example.com',
+            'company_name': '事件公司', 'position_title': '职位', 'interview_method': 'video',
+            'interview_round': 'first', 'scheduled_time': base.isoformat(), 'interviewer': self.user.pk,
+        }]
+        bulk_create = Interview.objects.bulk_create
+        concurrent = []
+
+        def bulk_create_with_concurrent_insert(*args, **kwargs):
+            # 模拟另一个请求在本批插入后、补写事件前新建了面试
+            result = bulk_create(*args, **kwargs)
+            concurrent.extend(create_interviews(1, interviewer=self.other))
+            return result
+
+        with mock.patch.object(Interview.objects, 'bulk_create', bulk_create_with_concurrent_insert):
+            self.assertEqual(self.client.post('/api/interviews/bulk_create/', items, format='json').status_code, 201)
+        self.assertEqual(self.kinds(interviewer=self.user), ['created'])
+        self.assertEqual(self.kinds(interview_id=concurrent[0].pk), ['created'])
+
+    def read_stream(self, **kwargs):
+        return ''.join(event_stream(max_duration=0, **kwargs))
+
+    def test_stream_filters_by_interviewer_and_resumes(self):
+        mine = create_interviews(1, interviewer=self.user)[0]
+        create_interviews(1, interviewer=self.other)
+        first_id = InterviewEvent.objects.get(interview_id=mine.pk).pk
+
+        body = self.read_stream(user=self.user, last_event_id=0)
+        self.assertIn('retry: ', body)
+        self.assertEqual(re.findall(r'^id: (\d+)$', body, re.M), [str(first_id)])
+        self.assertIn(f'"interview_id": {mine.pk}', body)
+
+        self.user.is_staff = True
+        self.assertEqual(len(re.findall(r'^event: created$', self.read_stream(user=self.user, last_event_id=0), re.M)), 2)
+
+        # 续传只返回之后的事件；没有 Last-Event-ID 时从最新位置开始
+        mine.status = 'cancelled'
+        mine.save()
+        self.assertEqual(re.findall(r'^event: (\w+)$', self.read_stream(user=self.user, last_event_id=first_id), re.M),
+                         ['created', 'status_changed'])
+        self.assertNotIn('event:', self.read_stream(user=self.user))
+
+    def test_reset_when_events_pruned(self):
+        create_interviews(2, interviewer=self.user)
+        InterviewEvent.objects.filter(pk=InterviewEvent.objects.order_by('id').first().pk).delete()
+        self.assertIn('event: reset', self.read_stream(user=self.user, last_event_id=0))
+        self.assertIn('event: reset', self.read_stream(user=self.user, last_event_id=10 ** 9))
+
+    def test_wsgi_endpoint_disabled_by_default(self):
+        response = self.client.get('/api/interviews/events/', HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(response.streaming)
+
+    @override_settings(SSE_SYNC_ENABLED=True)
+    def test_wsgi_endpoint(self):
+        interview = create_interviews(1, interviewer=self.user)[0]
+        response = self.client.get('/api/interviews/events/', HTTP_ACCEPT='text/event-stream', HTTP_LAST_EVENT_ID='0')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/event-stream'))
+        chunks = iter(response.streaming_content)
+        self.assertTrue(next(chunks).startswith(b'retry:'))
+        self.assertIn(f'"interview_id": {interview.pk}'.encode(), next(chunks))
+        response.close()
+        self.assertEqual(APIClient().get('/api/interviews/events/').status_code, 403)
+
+    async def call_asgi(self, headers, query_string=b''):
+        messages = []
+
+        async def receive():
+            await asyncio.sleep(0.05)
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            messages.append(message)
+
+        async def django_app(scope, receive, send):
+            raise AssertionError('事件流请求不应交给 Django')
+
+        scope = {'type': 'http', 'method': 'GET', 'path': '/api/interviews/events/',
+                 'headers': headers, 'query_string': query_string}
+        with mock.patch('interviews.events.SSE_POLL_INTERVAL', 0.01):
+            await EventStreamApp(django_app)(scope, receive, send)
+        return messages
+
+    async def test_asgi_stream(self):
+        interview = await sync_to_async(create_interviews)(1, interviewer=self.user)
+        await sync_to_async(self.client.force_login)(self.user)
+        cookie = f'sessionid={self.client.cookies["sessionid"].value}'.encode()
+
+        messages = await self.call_asgi([(b'cookie', cookie), (b'origin', b'http://localhost:3000')], b'last_event_id=0')
+        self.assertEqual(messages[0]['status'], 200)
+        self.assertIn((b'access-control-allow-credentials', b'true'), messages[0]['headers'])
+        body = b''.join(message.get('body', b'') for message in messages[1:]).decode()
+        self.assertIn(f'"interview_id": {interview[0].pk}', body)
+
+        messages = await self.call_asgi([])
+        self.assertEqual(messages[0]['status'], 403)
+
+
+class DatabaseProfileTest(TestCase):
+    def test_profiles(self):
+        config = database_settings('/srv', {})
+        self.assertEqual(config['ENGINE'], 'interview_system.db_backends.sqlite3')
+        self.assertEqual(config['NAME'], os.path.join('/srv', 'db.sqlite3'))
+        self.assertEqual(config['CONN_MAX_AGE'], 600)
+        # WAL 会改动数据库文件，默认不开启
+        self.assertNotIn('journal_mode', config['PRAGMAS'])
+        config = database_settings('/srv', {'DB_SQLITE_WAL': '1'})
+        self.assertEqual(config['PRAGMAS']['journal_mode'], 'WAL')
+
+        config = database_settings('/srv', {'DB_PROFILE': 'sqlite-basic', 'DB_PATH': '/tmp/x.sqlite3'})
+        self.assertEqual(config, {'ENGINE': 'django.db.backends.sqlite3', 'NAME': '/tmp/x.sqlite3'})
+
+        config = database_settings('/srv', {'DB_PROFILE': 'postgresql', 'DB_NAME': 'interviews', 'DB_PGBOUNCER': '1'})
+        self.assertEqual(config['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(config['NAME'], 'interviews')
+        self.assertTrue(config['DISABLE_SERVER_SIDE_CURSORS'])
+
+        with self.assertRaises(ValueError):
+            database_settings('/srv', {'DB_PROFILE': 'mysql'})
+
+    def test_pragmas_applied(self):
+        if 'PRAGMAS' not in connection.settings_dict:
+            self.skipTest('当前不是调优后的 SQLite 配置档')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], SQLITE_PRAGMAS['busy_timeout'])
+            cursor.execute('PRAGMA temp_store')
+            # MEMORY
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+
+
+class RequestMetricsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='metrics', password='testpass123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        create_interviews(3, interviewer=self.user)
+
+    def test_request_log_and_histograms(self):
+        with self.assertLogs('interviews.requests', 'INFO') as logs, \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/interviews/')
+        self.assertEqual(response.status_code, 200)
+        entry = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(entry['view'], 'interview-list')
+        self.assertEqual(entry['status'], 200)
+        self.assertEqual(entry['db_queries'], len(queries))
+        self.assertGreater(entry['serializer_ms'], 0)
+        self.assertEqual(entry['response_bytes'], len(response.content))
+
+        staff = Client()
+        staff.force_login(self.user)
+        body = staff.get('/metrics').content.decode()
+        self.assertRegex(body, r'http_requests_total\{view="interview-list",method="GET",status="200"\} \d+')
+        self.assertIn('http_request_db_queries_bucket{view="interview-list",le="+Inf"}', body)
+        self.assertIn('http_request_serializer_duration_seconds_sum{view="interview-list"}', body)
+
+    async def test_async_views_counted(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        with self.assertLogs('interviews.requests', 'INFO') as logs:
+            response = await self.async_client.get('/api/dashboard/stats/')
+        self.assertEqual(response.status_code, 200)
+        entry = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(entry['view'], 'dashboard-stats')
+        # 查询在 sync_to_async 的线程中执行，也要计入
+        self.assertGreater(entry['db_queries'], 0)
+
+    def test_slow_query_log(self):
+        with mock.patch('interviews.metrics.SLOW_QUERY_MS', 0), \
+                self.assertLogs('interviews.slow_queries', 'WARNING') as logs:
+            self.client.get('/api/companies/')
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry['view'], 'company-list')
+        self.assertIn('SELECT', entry['sql'])
+
+    def test_metrics_access(self):
+        # 反向代理转发的请求都来自本机，默认不能按地址放行
+        self.assertEqual(Client().get('/metrics').status_code, 403)
+        self.assertEqual(Client(REMOTE_ADDR='10.0.0.1').get('/metrics').status_code, 403)
+        with mock.patch('interviews.metrics.METRICS_TOKEN', 'secret'):
+            self.assertEqual(Client().get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+            self.assertEqual(Client().get('/metrics', HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
+        with mock.patch('interviews.metrics.METRICS_ALLOWED_IPS', ['10.0.0.1']):
+            self.assertEqual(Client(REMOTE_ADDR='10.0.0.1').get('/metrics').status_code, 200)
+        staff = Client(REMOTE_ADDR='10.0.0.1')
+        staff.force_login(self.user)
+        response = staff.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+    def test_label_escaping(self):
+        self.assertEqual(metrics.format_labels(('view',), ('a"b\\',)), '{view="a\\"b\\\\"}')
+
+
+class SyntheticDataTest(TestCase):
+    def test_generate(self):
+        call_command('generate_data', interviews=300, students=40, companies=10, interviewers=3, stdout=StringIO())
+        self.assertEqual(Interview.objects.count(), 300)
+        self.assertEqual(StudentInfo.objects.count(), 40)
+        self.assertEqual(Company.objects.count(), 10)
+        self.assertTrue(EducationHistory.objects.exists())
+
+        now = timezone.now()
+        self.assertFalse(Interview.objects.filter(scheduled_time__gt=now).exclude(status='scheduled').exists())
+        self.assertFalse(Interview.objects.filter(status='completed', score=None).exists())
+        self.assertFalse(Interview.objects.filter(end_time=None).exists())
+        # 热门公司的面试明显多于冷门公司
+        counts = sorted(Interview.objects.order_by().values('company').annotate(total=models.Count('id')).values_list('total', flat=True))
+        self.assertGreater(counts[-1], counts[0] * 3)
+        # 身份证号、电话都能通过导入的校验
+        for student in StudentInfo.objects.all():
+            student.full_clean()
+        # bulk_create 之后补建了日汇总
+        self.assertEqual(sum(InterviewDailyStat.objects.values_list('total_count', flat=True)), 300)
+
+    def test_same_seed_same_data(self):
+        rows = [(row.candidate_name, row.scheduled_time) for row in SyntheticData(7).interview_rows(
+            20, [None], [(1, '公司', [(1, '职位')])], 30, 30)]
+        again = [(row.candidate_name, row.scheduled_time) for row in SyntheticData(7).interview_rows(
+            20, [None], [(1, '公司', [(1, '职位')])], 30, 30)]
+        self.assertEqual(rows, again)
+
+
+class BenchmarkCommandTest(TestCase):
+    def setUp(self):
+        call_command('generate_data', interviews=100, students=10, stdout=StringIO())
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_baseline_and_compare(self):
+        path = os.path.join(self.directory, 'baseline.json')
+        options = {'iterations': 1, 'warmup': 0, 'import_rows': 5, 'stdout': StringIO(),
+                   'only': ['interview_list', 'dashboard_stats', 'student_import']}
+        call_command('benchmark', save_baseline=path, **options)
+        with open(path, encoding='utf-8') as file:
+            baseline = json.load(file)
+        self.assertEqual(set(baseline['results']), set(options['only']))
+        self.assertEqual(baseline['meta']['interviews'], 100)
+        # 导入在事务中回滚，不改变数据
+        self.assertEqual(StudentInfo.objects.count(), 10)
+
+        # 基准的查询数偏少时视为退化
+        baseline['results']['interview_list']['queries'] -= 1
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(baseline, file)
+        with self.assertRaisesMessage(CommandError, 'interview_list'):
+            call_command('benchmark', compare=path, **options)
+
+
+class SparseFieldsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='sparse', password='testpass123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        create_interviews(3, interviewer=self.user, feedback='很长的反馈' * 100)
+
+    def list_sql(self, url, table):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        selects = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith(f'SELECT "{table}"."id"') and 'COUNT(' not in query['sql']
+        ]
+        return response, selects[0]
+
+    def test_interview_fields(self):
+        response, sql = self.list_sql('/api/interviews/?fields=id,candidate_name,interviewer_info', 'interviews_interview')
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'candidate_name', 'interviewer_info'})
+        self.assertEqual(response.json()['results'][0]['interviewer_info']['username'], 'sparse')
+        self.assertNotIn('"feedback"', sql)
+        self.assertNotIn('"candidate_email"', sql)
+        self.assertIn('"auth_user"."username"', sql)
+
+        response, sql = self.list_sql('/api/interviews/?exclude=feedback,interviewer_notes', 'interviews_interview')
+        result = response.json()['results'][0]
+        self.assertNotIn('feedback', result)
+        self.assertIn('candidate_email', result)
+        self.assertNotIn('"feedback"', sql)
+
+    def test_cursor_pagination_without_ordering_field(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/interviews/?pagination=cursor&page_size=2&fields=id')
+        self.assertIsNotNone(response.json()['next'])
+        self.assertEqual(set(response.json()['results'][0]), {'id'})
+
+    def test_unknown_field(self):
+        response = self.client.get('/api/interviews/?fields=id,nope')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('nope', response.json()['fields'])
+        response = self.client.get('/api/students/?exclude=nope')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('exclude', response.json())
+
+    def test_student_fields(self):
+        student = StudentInfo.objects.create(
+            name='张三', id_card='110101199001011234', phone='13800138000', home_address='北京市' * 50,
+            education_level='bachelor', graduation_date=datetime.date(2020, 6, 30),
+            school_name='测试大学', major='计算机', project_manager='王经理', employment_guide='李老师',
+            marketing_department='市场部'
+        )
+        Certificate.objects.create(student=student, name='英语四级', issue_date=datetime.date(2019, 6, 1), issuing_authority='教育部')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/students/?nested=true&exclude=home_address,certificate_list,education_histories')
+        result = response.json()[0]
+        self.assertNotIn('home_address', result)
+        self.assertNotIn('certificate_list', result)
+        self.assertIn('age', result)
+        # 没有嵌套明细，不再预取
+        self.assertFalse(any('interviews_certificate' in query['sql'] for query in queries.captured_queries))
+
+        response, sql = self.list_sql('/api/students/?fields=id,name', 'interviews_studentinfo')
+        self.assertEqual(response.json(), [{'id': student.pk, 'name': '张三'}])
+        self.assertNotIn('"home_address"', sql)
+
+
+class ColumnarResponseTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='columnar', password='testpass123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.interviews = create_interviews(3, interviewer=self.user, score=80)
+        Interview.objects.filter(pk=self.interviews[0].pk).update(recording='recordings/a.mp3', score=None)
+
+    def get_columnar(self, url):
+        response = self.client.get(url, HTTP_ACCEPT=ColumnarJSONRenderer.media_type)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], ColumnarJSONRenderer.media_type)
+        return json.loads(response.content)
+
+    def test_same_values_as_json(self):
+        rows = self.client.get('/api/interviews/').json()['results']
+        columns = self.get_columnar('/api/interviews/')['results']
+        # 嵌套的面试官信息不能按列读取，其余字段与 JSON 一致（时间、文件地址、空值）
+        self.assertEqual(set(rows[0]) - set(columns), {'interviewer_info'})
+        for name, values in columns.items():
+            self.assertEqual(values, [row[name] for row in rows], name)
+        self.assertIn('http://testserver/media/recordings/a.mp3', columns['recording'])
+        self.assertIn(None, columns['score'])
+
+        # ?format=columnar 与 Accept 等价
+        response = self.client.get('/api/interviews/?format=columnar')
+        self.assertEqual(response['Content-Type'], ColumnarJSONRenderer.media_type)
+
+    def test_skips_per_object_work(self):
+        create_interviews(20, interviewer=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get_columnar('/api/interviews/?fields=id,company_name,scheduled_time&page_size=100')
+        self.assertEqual(list(data['results']), ['id', 'company_name', 'scheduled_time'])
+        self.assertEqual(len(data['results']['id']), 23)
+        select = [query['sql'] for query in queries.captured_queries if '"interviews_company"."name"' in query['sql']]
+        self.assertEqual(len(select), 1)
+        self.assertNotIn('"feedback"', select[0])
+
+    def test_pagination(self):
+        first = self.get_columnar('/api/interviews/?pagination=cursor&page_size=2&fields=id')
+        second = self.get_columnar(first['next'])
+        self.assertEqual(
+            first['results']['id'] + second['results']['id'],
+            sorted((interview.pk for interview in self.interviews), reverse=True)
+        )
+        self.assertIsNone(second['next'])
+        # 按列返回允许更大的页
+        create_interviews(150, interviewer=self.user)
+        data = self.get_columnar('/api/interviews/?page_size=500&fields=id')
+        self.assertEqual(len(data['results']['id']), 153)
+        self.assertEqual(len(self.client.get('/api/interviews/?page_size=500').json()['results']), 100)
+
+    def test_students(self):
+        StudentInfo.objects.create(
+            name='张三', id_card='110101199001011234', phone='13800138000', home_address='北京市',
+            education_level='bachelor', graduation_date=datetime.date(2020, 6, 30),
+            school_name='测试大学', major='计算机', project_manager='王经理', employment_guide='李老师',
+            marketing_department='市场部'
+        )
+        data = self.get_columnar('/api/students/?nested=true')
+        self.assertEqual(data['graduation_date'], ['2020-06-30'])
+        self.assertNotIn('age', data)
+        self.assertNotIn('education_histories', data)
+        self.assertEqual(self.get_columnar('/api/students/?fields=id,name'), {'id': [data['id'][0]], 'name': ['张三']})
+
+    def test_list_only(self):
+        response = self.client.get(f'/api/interviews/{self.interviews[0].pk}/', HTTP_ACCEPT=ColumnarJSONRenderer.media_type)
+        self.assertEqual(response.status_code, 406)
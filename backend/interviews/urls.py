@@ -1,16 +1,22 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views, student_views, job_views
 
 router = DefaultRouter()
 router.register(r'companies', views.CompanyViewSet)
 router.register(r'positions', views.JobPositionViewSet)
 router.register(r'interviews', views.InterviewViewSet)
+router.register(r'students', student_views.StudentInfoViewSet)
+router.register(r'education_histories', student_views.EducationHistoryViewSet)
+router.register(r'certificates', student_views.CertificateViewSet)
+router.register(r'jobs', job_views.BackgroundJobViewSet)
 
 urlpatterns = [
+    # 只读的高频接口是异步视图，需在路由之前匹配
+    path('interviews/upcoming_interviews/', async_views.upcoming_interviews, name='interview-upcoming-interviews'),
     path('', include(router.urls)),
     path('get_csrf_token/', views.get_csrf_token, name='get-csrf-token'),
-    path('dashboard/stats/', views.dashboard_stats, name='dashboard-stats'),
-    path('interview_calendar/', views.interview_calendar, name='interview-calendar'),
-    path('auth/user/', views.current_user, name='current-user'),
+    path('dashboard/stats/', async_views.dashboard_stats, name='dashboard-stats'),
+    path('interview_calendar/', async_views.interview_calendar, name='interview-calendar'),
+    path('auth/user/', async_views.current_user, name='current-user'),
 ]
@@ -1,14 +1,29 @@
-#from rest_framework.pagination import PageNumberPagination
+import os
+from io import BytesIO
 from rest_framework import viewsets, status, mixins
 from rest_framework.decorators import api_view, action, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.db.models import Count, Q, Case, When, IntegerField
+from django.conf import settings
 from django.utils import timezone
-from django.http import JsonResponse
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.http import JsonResponse, StreamingHttpResponse
 from django.middleware.csrf import get_token
 from django.contrib.auth.models import User
-from .models import Company, JobPosition, Interview
+from .models import Company, JobPosition, Interview, RecordingUpload
+from .recording_uploads import UploadError, discard_partial, finalize_upload, parse_offset, write_chunk
+from .recording_serving import serve_recording
+from .bulk_schedule import BULK_SCHEDULE_MAX_ITEMS, schedule_interviews
+from .conflicts import free_slots, work_windows
+from .conditional import ConditionalGetMixin
+from .columnar import ColumnarListMixin
+from .events import event_stream, parse_last_event_id
+from .search import INTERVIEW_INDEX, match_expression, search_available, search_page
+from .pagination import InterviewPagination
+from .query_optimizer import optimize_queryset
+from .caching import cache_response
+from .date_windows import filter_date_params, parse_date_param, today
 from .serializers import (
     CompanySerializer, JobPositionSerializer, 
     InterviewSerializer, InterviewCreateSerializer, InterviewUpdateSerializer
@@ -19,32 +34,42 @@ class CompanyViewSet(viewsets.ModelViewSet):
     serializer_class = CompanySerializer
     permission_classes = [IsAuthenticated]
 
+    @cache_response(('company',))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
 class JobPositionViewSet(viewsets.ModelViewSet):
     queryset = JobPosition.objects.all()
     serializer_class = JobPositionSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        queryset = JobPosition.objects.all()
+        queryset = JobPosition.objects.select_related('company')
         company_id = self.request.query_params.get('company_id')
         if company_id:
             queryset = queryset.filter(company_id=company_id)
         return queryset
 
-#class StandardPagination(PageNumberPagination):
-#    page_size = 10
-#    page_size_query_param = 'page_size'
-#    max_page_size = 100
+    @cache_response(('company',))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
-class InterviewViewSet(viewsets.ModelViewSet):
+class InterviewViewSet(ConditionalGetMixin, ColumnarListMixin, viewsets.ModelViewSet):
     queryset = Interview.objects.all()
     permission_classes = [IsAuthenticated]
-#    pagination_class = StandardPagination
+    pagination_class = InterviewPagination
+    # 按列返回时游标分页要读取 pk 和排序列
+    columnar_always = ('pk', 'scheduled_time')
+    # 只读动作按序列化器字段裁剪查询；写操作需要完整实例，不能使用 only()
+    optimized_actions = ('list', 'retrieve', 'my_interviews', 'search')
+
+    def optimize(self, queryset):
+        # 序列化器已按 ?fields= / ?exclude= 裁剪；游标分页要读取排序列
+        return optimize_queryset(queryset, self.get_serializer(), always=('scheduled_time',))
 
     def get_queryset(self):
         user = self.request.user
         queryset = Interview.objects.all()
-#        return queryset.order_by('-scheduled_time')
 
         # 如果是面试官，只能看到自己的面试
         if not user.is_staff:
@@ -56,12 +81,31 @@ class InterviewViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(status=status_filter)
         
         # 时间范围筛选
-        date_from = self.request.query_params.get('date_from')
-        date_to = self.request.query_params.get('date_to')
-        if date_from and date_to:
-            queryset = queryset.filter(scheduled_time__date__range=[date_from, date_to])
+        queryset = filter_date_params(queryset, 'scheduled_time', self.request.query_params)
+        
+        # 搜索候选人、联系方式、公司和职位
+        search = self.request.query_params.get('search')
+        match = match_expression(search)
+        if match and search_available():
+            queryset = queryset.filter(pk__in=RawSQL(*INTERVIEW_INDEX.matching_ids_sql(match)))
+        elif search:
+            queryset = queryset.filter(
+                Q(candidate_name__icontains=search) |
+                Q(candidate_phone__icontains=search) |
+                Q(company__name__icontains=search) |
+                Q(position__title__icontains=search)
+            )
         
-        return queryset.order_by('-scheduled_time')
+        if self.action in self.optimized_actions:
+            queryset = self.optimize(queryset)
+        return queryset.order_by('-scheduled_time', '-id')
+    
+    def perform_content_negotiation(self, request, force=False):
+        # 播放器请求录音时 Accept 通常是 audio/*，EventSource 的是 text/event-stream，
+        # 不能因此返回 406；错误信息仍用 JSON 返回
+        if self.action in ('stream_recording', 'events'):
+            force = True
+        return super().perform_content_negotiation(request, force)
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -70,6 +114,22 @@ class InterviewViewSet(viewsets.ModelViewSet):
             return InterviewUpdateSerializer
         return InterviewSerializer
     
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """批量安排面试：请求体为面试列表或 {"interviews": [...]}，返回创建数量和逐条错误"""
+        items = request.data.get('interviews') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({'error': '请提供面试列表'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > BULK_SCHEDULE_MAX_ITEMS:
+            return Response(
+                {'error': f'单次最多安排 {BULK_SCHEDULE_MAX_ITEMS} 场面试'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        result = schedule_interviews(items, request.user)
+        response_status = status.HTTP_201_CREATED if result['created_count'] else status.HTTP_400_BAD_REQUEST
+        return Response(result, status=response_status)
+    
     @action(detail=True, methods=['post'])
     def upload_recording(self, request, pk=None):
         """上传面试录音"""
@@ -83,6 +143,111 @@ class InterviewViewSet(viewsets.ModelViewSet):
         
         return Response({'message': '录音上传成功'}, status=status.HTTP_200_OK)
     
+    @action(detail=True, methods=['get'], url_path='recording_stream')
+    def stream_recording(self, request, pk=None):
+        """播放/下载面试录音，支持 Range 拖动进度；权限与面试列表一致"""
+        interview = self.get_object()
+        
+        if not interview.recording:
+            return Response({'error': '没有录音文件'}, status=status.HTTP_404_NOT_FOUND)
+        if not interview.recording.storage.exists(interview.recording.name):
+            return Response({'error': '录音文件不存在'}, status=status.HTTP_404_NOT_FOUND)
+        
+        return serve_recording(request, interview.recording)
+    
+    @action(detail=False, methods=['get'])
+    def events(self, request):
+        """
+        订阅面试变更事件（text/event-stream），断线重连时按 Last-Event-ID 续传。
+        这是 WSGI 部署下的实现，每个连接占用一个线程直到超时，需要 SSE_SYNC_ENABLED 开启；
+        未开启时返回 204，EventSource 收到后不再重连，看板改为定时刷新。ASGI 部署由 EventStreamApp 处理。
+        """
+        if not getattr(settings, 'SSE_SYNC_ENABLED', False):
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        last_event_id = parse_last_event_id(
+            request.META.get('HTTP_LAST_EVENT_ID') or request.query_params.get('last_event_id')
+        )
+        response = StreamingHttpResponse(
+            event_stream(request.user, last_event_id), content_type='text/event-stream; charset=utf-8'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @action(detail=True, methods=['post'], url_path='recording_upload')
+    def recording_upload_init(self, request, pk=None):
+        """开始分片上传录音，返回 upload_id"""
+        interview = self.get_object()
+        filename = request.data.get('filename')
+        try:
+            total_size = int(request.data.get('size'))
+        except (TypeError, ValueError):
+            total_size = -1
+        if not filename or total_size <= 0:
+            return Response({'error': '请提供文件名和文件大小'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        upload = RecordingUpload.objects.create(
+            interview=interview,
+            filename=os.path.basename(filename),
+            total_size=total_size,
+            checksum=(request.data.get('checksum') or '').lower(),
+            created_by=request.user
+        )
+        return Response(self.upload_state(upload), status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['get', 'put', 'delete'], url_path=r'recording_upload/(?P<upload_id>[0-9a-f-]+)')
+    def recording_upload_chunk(self, request, pk=None, upload_id=None):
+        """GET 查询续传位置，PUT 按 offset 上传分片，DELETE 放弃上传"""
+        upload = self.get_upload(upload_id)
+        if upload is None:
+            return Response({'error': '上传不存在'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if request.method == 'DELETE':
+            discard_partial(upload)
+            upload.delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        
+        if request.method == 'PUT':
+            try:
+                write_chunk(upload, request.stream or BytesIO(), parse_offset(request))
+            except UploadError as e:
+                data = self.upload_state(upload)
+                data['error'] = e.message
+                return Response(data, status=e.status)
+        
+        return Response(self.upload_state(upload))
+    
+    @action(detail=True, methods=['post'], url_path=r'recording_upload/(?P<upload_id>[0-9a-f-]+)/finalize')
+    def recording_upload_finalize(self, request, pk=None, upload_id=None):
+        """所有分片上传完成后校验 SHA-256 并关联录音"""
+        upload = self.get_upload(upload_id)
+        if upload is None:
+            return Response({'error': '上传不存在'}, status=status.HTTP_404_NOT_FOUND)
+        
+        try:
+            finalize_upload(upload, request.data.get('checksum', ''))
+        except UploadError as e:
+            data = self.upload_state(upload)
+            data['error'] = e.message
+            return Response(data, status=e.status)
+        
+        return Response({'message': '录音上传成功', 'recording': upload.interview.recording.url})
+    
+    def get_upload(self, upload_id):
+        interview = self.get_object()
+        upload = RecordingUpload.objects.filter(pk=upload_id, interview=interview).first()
+        if upload is not None:
+            upload.interview = interview
+        return upload
+    
+    def upload_state(self, upload):
+        return {
+            'upload_id': str(upload.pk),
+            'offset': upload.received_size,
+            'size': upload.total_size,
+            'status': upload.status,
+        }
+    
     @action(detail=True, methods=['post'])
     def complete_interview(self, request, pk=None):
         """完成面试（必须已上传录音）"""
@@ -100,27 +265,71 @@ class InterviewViewSet(viewsets.ModelViewSet):
         return Response({'message': '面试已完成'}, status=status.HTTP_200_OK)
     
     @action(detail=False, methods=['get'])
-    def upcoming_interviews(self, request):
-        """获取即将到来的面试"""
-        now = timezone.now()
-        upcoming = Interview.objects.filter(
-            scheduled_time__gte=now,
-            status__in=['scheduled', 'in_progress']
-        ).order_by('scheduled_time')[:10]
-        
-        serializer = self.get_serializer(upcoming, many=True)
-        return Response(serializer.data)
+    def search(self, request):
+        """按相关度排序的面试搜索：q 为搜索词，limit/offset 分页；面试官只能搜到自己的面试"""
+        match = match_expression(request.query_params.get('q'))
+        if not match:
+            return Response({'error': '请输入搜索内容'}, status=status.HTTP_400_BAD_REQUEST)
+        if not search_available():
+            return Response({'error': '当前数据库不支持全文搜索'}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        limit, offset = search_page(request.query_params)
+        
+        interviewer_id = None if request.user.is_staff else request.user.pk
+        ids = INTERVIEW_INDEX.ranked_ids(match, limit, offset, interviewer_id=interviewer_id)
+        interviews = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer([interviews[pk] for pk in ids if pk in interviews], many=True)
+        return Response({
+            'count': INTERVIEW_INDEX.count(match, interviewer_id=interviewer_id),
+            'results': serializer.data,
+        })
+    
+    @action(detail=False, methods=['get'])
+    def free_slots(self, request):
+        """面试官在 date_from~date_to 工作时间内的空闲时段（默认本人、未来 7 天）"""
+        user = request.user
+        try:
+            interviewer_id = int(request.query_params.get('interviewer', user.pk))
+            min_duration = int(request.query_params.get('min_duration', 30))
+        except ValueError:
+            return Response({'error': 'interviewer 和 min_duration 必须是整数'}, status=status.HTTP_400_BAD_REQUEST)
+        if interviewer_id != user.pk and not user.is_staff:
+            return Response({'error': '只能查看自己的空闲时段'}, status=status.HTTP_403_FORBIDDEN)
+        
+        date_from = parse_date_param(request.query_params, 'date_from') or today()
+        date_to = parse_date_param(request.query_params, 'date_to') or date_from + timezone.timedelta(days=6)
+        if date_to < date_from or (date_to - date_from).days > 31:
+            return Response({'error': '日期范围需在 1~31 天之间'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        slots = free_slots(
+            interviewer_id, work_windows(date_from, date_to),
+            min_duration=timezone.timedelta(minutes=max(min_duration, 1))
+        )
+        return Response([
+            {
+                'start': timezone.localtime(start).isoformat(),
+                'end': timezone.localtime(end).isoformat(),
+                'minutes': int((end - start).total_seconds() // 60),
+            }
+            for start, end in slots
+        ])
     
     @action(detail=False, methods=['get'])
     def my_interviews(self, request):
         """获取当前用户的面试"""
         user = request.user
-        interviews = Interview.objects.filter(interviewer=user).order_by('-scheduled_time')
+        interviews = self.optimize(
+            Interview.objects.filter(interviewer=user)
+        ).order_by('-scheduled_time', '-id')
         
         status_filter = request.query_params.get('status')
         if status_filter:
             interviews = interviews.filter(status=status_filter)
         
+        page = self.paginate_queryset(interviews)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
         serializer = self.get_serializer(interviews, many=True)
         return Response(serializer.data)
 
@@ -129,89 +338,3 @@ class InterviewViewSet(viewsets.ModelViewSet):
 def get_csrf_token(request):
     """获取CSRF token"""
     return Response({'csrfToken': get_token(request)})
-
-@api_view(['GET'])
-def current_user(request):
-    """获取当前用户信息"""
-    if request.user.is_authenticated:
-        return Response({
-            'id': request.user.id,
-            'username': request.user.username,
-            'email': request.user.email,
-            'first_name': request.user.first_name,
-            'last_name': request.user.last_name,
-            'is_staff': request.user.is_staff
-        })
-    return Response({'error': '未登录'}, status=status.HTTP_401_UNAUTHORIZED)
-
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def dashboard_stats(request):
-    """获取看板统计数据"""
-    user = request.user
-    
-    # 基础查询
-    if user.is_staff:
-        interviews = Interview.objects.all()
-    else:
-        interviews = Interview.objects.filter(interviewer=user)
-    
-    # 今日面试
-    today_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    today_end = today_start + timezone.timedelta(days=1)
-    today_count = interviews.filter(
-        scheduled_time__range=[today_start, today_end]
-    ).count()
-    
-    # 本周面试
-    week_start = today_start - timezone.timedelta(days=today_start.weekday())
-    week_end = week_start + timezone.timedelta(days=7)
-    week_count = interviews.filter(
-        scheduled_time__range=[week_start, week_end]
-    ).count()
-    
-    # 状态统计
-    status_stats = interviews.values('status').annotate(count=Count('id'))
-    
-    # 需要录音的面试（已完成但未上传录音）
-    need_recording = interviews.filter(
-        status='completed', 
-        recording_uploaded=False
-    ).count()
-    
-    return Response({
-        'today_count': today_count,
-        'week_count': week_count,
-        'status_stats': list(status_stats),
-        'need_recording': need_recording,
-        'total_count': interviews.count()
-    })
-
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def interview_calendar(request):
-    """获取面试日历数据"""
-    user = request.user
-    month = request.GET.get('month')
-    year = request.GET.get('year')
-    
-    if user.is_staff:
-        interviews = Interview.objects.all()
-    else:
-        interviews = Interview.objects.filter(interviewer=user)
-    
-    if month and year:
-        interviews = interviews.filter(
-            scheduled_time__year=year,
-            scheduled_time__month=month
-        )
-    
-    calendar_data = interviews.values(
-        'scheduled_time__date'
-    ).annotate(
-        count=Count('id'),
-        completed=Count(Case(When(status='completed', then=1), output_field=IntegerField())),
-        scheduled=Count(Case(When(status='scheduled', then=1), output_field=IntegerField()))
-    ).order_by('scheduled_time__date')
-    
-    return Response(list(calendar_data))
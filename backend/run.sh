@@ -1,5 +1,9 @@
 #!/bin/bash
 # run.sh
 > nohup.out
+# 使用数据库缓存（CACHE_BACKEND=db）时需要缓存表，其他缓存后端下该命令不做任何事
+python3 manage.py createcachetable
 echo "启动Django服务器在 0.0.0.0:8000..."
 nohup python3 manage.py runserver 0.0.0.0:8000 &
+echo "启动后台任务执行进程..."
+nohup python3 manage.py run_job_worker > worker.out 2>&1 &
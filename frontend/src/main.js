@@ -11,6 +11,12 @@ const api = axios.create({
     }
 });
 
+// 服务端未开启事件流时，看板定时刷新的间隔（毫秒）
+const DASHBOARD_POLL_INTERVAL = 30000;
+
+// 看板表格只用到这些字段，列表接口按需返回，减少响应大小
+const DASHBOARD_INTERVIEW_FIELDS = 'id,candidate_name,company_name,position_title,scheduled_time,status,result,recording_uploaded';
+
 // 添加CSRF token处理
 function getCookie(name) {
     let cookieValue = null;
@@ -124,8 +130,58 @@ const App = {
             this.userInfo = JSON.parse(userInfoStr);
         }
         this.loadDashboardData();
+        this.subscribeEvents();
+    },
+    beforeUnmount() {
+        if (this.eventSource) {
+            this.eventSource.close();
+        }
+        clearInterval(this.pollTimer);
     },
     methods: {
+        // 订阅面试变更事件，有变化时刷新看板；断线后浏览器会带着 Last-Event-ID 自动重连并补发错过的事件。
+        // 服务端没有开启事件流时返回 204（或其他非事件流响应），EventSource 不再重连，改为定时刷新
+        subscribeEvents() {
+            if (!window.EventSource) {
+                this.startPolling();
+                return;
+            }
+            this.eventSource = new EventSource(`${api.defaults.baseURL}interviews/events/`, { withCredentials: true });
+            const kinds = ['created', 'status_changed', 'result_changed', 'recording_uploaded', 'deleted', 'reset'];
+            kinds.forEach(kind => this.eventSource.addEventListener(kind, () => this.scheduleRefresh()));
+            this.eventSource.addEventListener('error', () => {
+                if (this.eventSource.readyState === EventSource.CLOSED) {
+                    this.eventSource = null;
+                    this.startPolling();
+                }
+            });
+        },
+
+        startPolling() {
+            clearInterval(this.pollTimer);
+            this.pollTimer = setInterval(() => this.refreshDashboard(), DASHBOARD_POLL_INTERVAL);
+        },
+
+        // 批量变更会连续收到多条事件，合并成一次刷新
+        scheduleRefresh() {
+            clearTimeout(this.refreshTimer);
+            this.refreshTimer = setTimeout(() => this.refreshDashboard(), 500);
+        },
+
+        async refreshDashboard() {
+            try {
+                const [statsRes, interviewsRes] = await Promise.all([
+                    api.get('dashboard/stats/'),
+                    api.get('interviews/', { params: { fields: DASHBOARD_INTERVIEW_FIELDS } })
+                ]);
+                this.stats = statsRes.data;
+                this.interviews = interviewsRes.data.results;
+                this.statusStats = statsRes.data.status_stats || [];
+            } catch (error) {
+                console.error('Error refreshing data:', error);
+            }
+        },
+
         async loadDashboardData() {
             try {
                 const loading = ElLoading.service({ fullscreen: true });
@@ -133,11 +189,11 @@ const App = {
                 // 并行加载所有数据
                 const [statsRes, interviewsRes] = await Promise.all([
                     api.get('dashboard/stats/'),
-                    api.get('interviews/')
+                    api.get('interviews/', { params: { fields: DASHBOARD_INTERVIEW_FIELDS } })
                 ]);
 
                 this.stats = statsRes.data;
-                this.interviews = interviewsRes.data;
+                this.interviews = interviewsRes.data.results;
                 this.statusStats = statsRes.data.status_stats || [];
 
                 loading.close();
@@ -187,8 +243,8 @@ const App = {
                 }
 
                 const response = await api.get('interviews/', { params });
-                this.interviewManagement.interviews = response.data;
-                this.interviewManagement.pagination.total = response.data.length;
+                this.interviewManagement.interviews = response.data.results;
+                this.interviewManagement.pagination.total = response.data.count;
                 
             } catch (error) {
                 ElMessage.error('加载面试数据失败');
@@ -260,7 +316,8 @@ const App = {
 
         async downloadRecording(interview) {
             if (interview.recording) {
-                window.open(interview.recording, '_blank');
+                // 通过接口播放，带权限校验并支持拖动进度
+                window.open(`${api.defaults.baseURL}interviews/${interview.id}/recording_stream/`, '_blank');
             } else {
                 ElMessage.warning('没有录音文件');
             }